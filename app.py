@@ -5,6 +5,7 @@ Archivo principal para despliegue en Streamlit Community Cloud
 
 import streamlit as st
 import sys
+import logging
 from pathlib import Path
 
 # Agregar el directorio src al path para importar módulos
@@ -17,6 +18,9 @@ from config import get_app_config, STREAMLIT_CONFIG
 # Configurar Streamlit al inicio (debe ser lo primero)
 st.set_page_config(**STREAMLIT_CONFIG)
 
+# Configurar logging una sola vez, en el punto de entrada
+logging.basicConfig(level=logging.INFO)
+
 # CSS minimalista y elegante
 st.markdown("""
 <style>
@@ -180,6 +184,10 @@ def main():
     if pages[selected_page] != st.session_state.page:
         st.session_state.page = pages[selected_page]
         st.rerun()
+    
+    # Tienda activa (solo se muestra si hay varias configuradas)
+    from ui.components.stores import store_selector
+    store_selector()
 
     # Mostrar la página seleccionada
     if st.session_state.page == "dashboard":
@@ -199,8 +207,8 @@ def main():
         show_reports_page()
     
     elif st.session_state.page == "settings":
-        st.header("⚙️ Configuración del Sistema")
-        st.info("🚧 Esta sección está en desarrollo. Próximamente podrás configurar el sistema.")
+        from ui.pages.settings import show_settings_page
+        show_settings_page()
 
     # Footer
     st.divider()
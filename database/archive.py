@@ -0,0 +1,230 @@
+"""
+Archivo por año de ventas y movimientos de inventario
+Mueve los años cerrados a archive_YYYY.db para que la base activa se mantenga pequeña
+"""
+
+import re
+import sqlite3
+from pathlib import Path
+from typing import Dict, List, Union
+import logging
+
+from database.migrations.v007_money_cents import MONEY_COLUMNS, convert_schema
+
+logger = logging.getLogger(__name__)
+
+# Columnas de cada tabla archivada, en el orden de las vistas
+ARCHIVE_TABLES = {
+    "sales": (
+        "id", "total_amount", "payment_method", "customer_name", "customer_phone",
+        "discount", "tax", "sale_date", "notes", "sale_day"
+    ),
+    "sale_items": ("id", "sale_id", "book_id", "quantity", "unit_price", "subtotal"),
+    "inventory_movements": (
+        "id", "book_id", "movement_type", "quantity", "reason", "reference_id", "movement_date"
+    )
+}
+
+# Vista TEMP que une cada tabla activa con la misma tabla de todos los archivos
+ARCHIVE_VIEWS = {table: f"all_{table}" for table in ARCHIVE_TABLES}
+
+# Esquema de un archivo; {schema} es el alias con que se adjunta. Importes en centavos
+ARCHIVE_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS {schema}.sales (
+        id INTEGER PRIMARY KEY,
+        total_amount INTEGER NOT NULL,
+        payment_method TEXT,
+        customer_name TEXT,
+        customer_phone TEXT,
+        discount INTEGER,
+        tax REAL,
+        sale_date TIMESTAMP,
+        notes TEXT,
+        sale_day INTEGER
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS {schema}.sale_items (
+        id INTEGER PRIMARY KEY,
+        sale_id INTEGER NOT NULL,
+        book_id INTEGER NOT NULL,
+        quantity INTEGER NOT NULL,
+        unit_price INTEGER NOT NULL,
+        subtotal INTEGER NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS {schema}.inventory_movements (
+        id INTEGER PRIMARY KEY,
+        book_id INTEGER NOT NULL,
+        movement_type TEXT NOT NULL,
+        quantity INTEGER NOT NULL,
+        reason TEXT,
+        reference_id INTEGER,
+        movement_date TIMESTAMP
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS {schema}.idx_sales_sale_day ON sales (sale_day)",
+    "CREATE INDEX IF NOT EXISTS {schema}.idx_sale_items_sale_id ON sale_items (sale_id)",
+    "CREATE INDEX IF NOT EXISTS {schema}.idx_sale_items_book_id ON sale_items (book_id)",
+    "CREATE INDEX IF NOT EXISTS {schema}.idx_inventory_movements_date ON inventory_movements (movement_date)"
+]
+
+_ARCHIVE_NAME = re.compile(r"^archive_(\d{4})\.db$")
+
+def archive_path(directory: Union[str, Path], year: int) -> Path:
+    """Ruta del archivo de un año"""
+    return Path(directory) / f"archive_{year}.db"
+
+def list_archives(directory: Union[str, Path]) -> Dict[int, Path]:
+    """
+    Lista los archivos existentes
+
+    Args:
+        directory: Carpeta donde se guardan los archivos
+
+    Returns:
+        Dict[int, Path]: Año -> ruta, del más antiguo al más reciente
+    """
+    directory = Path(directory)
+    if not directory.exists():
+        return {}
+    archives = {}
+    for path in directory.iterdir():
+        match = _ARCHIVE_NAME.match(path.name)
+        if match:
+            archives[int(match.group(1))] = path
+    return dict(sorted(archives.items()))
+
+def _attached(conn: sqlite3.Connection) -> List[str]:
+    """Alias de las bases adjuntas a la conexión"""
+    return [row[1] for row in conn.execute("PRAGMA database_list")]
+
+def create_views(conn: sqlite3.Connection, schemas: List[str]):
+    """
+    Crea las vistas TEMP all_* sobre la base activa y los archivos indicados
+
+    Args:
+        conn (sqlite3.Connection): Conexión con los archivos ya adjuntos
+        schemas (List[str]): Alias de los archivos a incluir
+    """
+    for table, columns in ARCHIVE_TABLES.items():
+        select = f"SELECT {', '.join(columns)} FROM {{schema}}.{table}"
+        parts = [select.format(schema=schema) for schema in ["main", *schemas]]
+        conn.execute(f"DROP VIEW IF EXISTS temp.{ARCHIVE_VIEWS[table]}")
+        conn.execute(f"CREATE TEMP VIEW {ARCHIVE_VIEWS[table]} AS {' UNION ALL '.join(parts)}")
+
+def attach_archives(conn: sqlite3.Connection, directory: Union[str, Path],
+                    read_only: bool = False) -> List[str]:
+    """
+    Adjunta todos los archivos a una conexión y crea sus vistas
+
+    SQLite admite 10 bases adjuntas por conexión; si hay más archivos, los
+    que no caben quedan fuera de las vistas y se registra una advertencia.
+
+    Args:
+        conn (sqlite3.Connection): Conexión recién abierta, sin transacción
+        directory: Carpeta de los archivos
+        read_only (bool): Adjuntar en modo solo lectura (la conexión debe aceptar URIs)
+
+    Returns:
+        List[str]: Alias de los archivos adjuntos
+    """
+    attached = _attached(conn)
+    schemas = []
+    for year, path in list_archives(directory).items():
+        schema = f"archive_{year}"
+        if schema not in attached:
+            try:
+                target = f"{path.resolve().as_uri()}?mode=ro" if read_only else str(path)
+                conn.execute(f"ATTACH DATABASE ? AS {schema}", (target,))
+            except sqlite3.OperationalError as e:
+                logger.warning(f"No se pudo adjuntar {path.name}: {e}")
+                break
+        schemas.append(schema)
+
+    create_views(conn, schemas)
+    return schemas
+
+def archive_year(conn: sqlite3.Connection, year: int, path: Union[str, Path]) -> Dict[str, int]:
+    """
+    Mueve las ventas, sus items y los movimientos de inventario de un año a su archivo
+
+    Primero copia las filas al archivo, leyendo la base activa sin bloquear
+    las ventas; luego, en una transacción de escritura corta, las borra de
+    la base activa. Las filas se copian con su id original y solo se borran
+    las que ya están en el archivo, así que si el proceso se interrumpe
+    basta con repetirlo. El resumen diario y los puntos de control de stock
+    no se archivan: se conservan tal como estaban antes de los borrados.
+
+    Args:
+        conn (sqlite3.Connection): Conexión dedicada, sin transacción abierta
+        year (int): Año a archivar
+        path: Ruta del archivo del año (se crea si no existe)
+
+    Returns:
+        Dict[str, int]: Filas movidas por tabla
+    """
+    schema = f"archive_{year}"
+    if schema not in _attached(conn):
+        conn.execute(f"ATTACH DATABASE ? AS {schema}", (str(path),))
+    for statement in ARCHIVE_SCHEMA:
+        conn.execute(statement.format(schema=schema))
+    # Un archivo creado antes de pasar a centavos se convierte antes de agregarle filas
+    convert_schema(conn, {table: MONEY_COLUMNS[table] for table in ("sales", "sale_items")}, schema)
+
+    first_day, next_day = year * 10000 + 101, (year + 1) * 10000 + 101
+    sales_filter = ("sale_day >= ? AND sale_day < ?", (first_day, next_day))
+    filters = {
+        "sales": sales_filter,
+        "sale_items": (f"sale_id IN (SELECT id FROM main.sales WHERE {sales_filter[0]})", sales_filter[1]),
+        "inventory_movements": ("movement_date >= ? AND movement_date < ?",
+                                (f"{year}-01-01", f"{year + 1}-01-01"))
+    }
+
+    # 1. Copiar: solo se escribe en el archivo, la base activa sigue libre
+    conn.execute("BEGIN")
+    try:
+        for table, (where, params) in filters.items():
+            columns = ", ".join(ARCHIVE_TABLES[table])
+            conn.execute(f'''
+                INSERT OR IGNORE INTO {schema}.{table} ({columns})
+                SELECT {columns} FROM main.{table} WHERE {where}
+            ''', params)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    # 2. Borrar de la base activa lo que ya quedó archivado
+    moved = {}
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        # Los triggers restarían las ventas borradas del resumen y borrarían los
+        # puntos de control posteriores; se guardan antes y se restauran después
+        conn.execute('''
+            CREATE TEMP TABLE archived_summary AS
+            SELECT * FROM main.daily_sales_summary WHERE sale_day >= ? AND sale_day < ?
+        ''', (first_day, next_day))
+        conn.execute('''
+            CREATE TEMP TABLE archived_checkpoints AS
+            SELECT * FROM main.stock_checkpoints WHERE checkpoint_day > ?
+        ''', (first_day,))
+
+        for table in ("sale_items", "sales", "inventory_movements"):
+            moved[table] = conn.execute(
+                f"DELETE FROM main.{table} WHERE id IN (SELECT id FROM {schema}.{table})"
+            ).rowcount
+
+        conn.execute("INSERT OR REPLACE INTO main.daily_sales_summary SELECT * FROM temp.archived_summary")
+        conn.execute("INSERT OR REPLACE INTO main.stock_checkpoints SELECT * FROM temp.archived_checkpoints")
+        conn.execute("DROP TABLE temp.archived_summary")
+        conn.execute("DROP TABLE temp.archived_checkpoints")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    logger.info(f"Año {year} archivado en {Path(path).name}: {moved}")
+    return moved
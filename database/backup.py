@@ -0,0 +1,204 @@
+"""
+Copias de seguridad en línea de la base de datos
+Usa la API de backup de SQLite por pasos para no detener las ventas mientras se copia
+"""
+
+import gzip
+import os
+import re
+import shutil
+import sqlite3
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+BACKUP_PREFIX = "bookstore_backup_"
+BACKUP_TIMESTAMP = "%Y%m%d_%H%M%S"
+
+# bookstore_backup_20240131_213000.db[.gz|.zst]
+_BACKUP_NAME = re.compile(rf"^{BACKUP_PREFIX}(\d{{8}}_\d{{6}})\.db(?:\.gz|\.zst)?$")
+
+COMPRESSION_SUFFIXES = {
+    "gzip": ".gz",
+    "zstd": ".zst"
+}
+
+def backup_filename(moment: Optional[datetime] = None) -> str:
+    """Retorna el nombre de archivo de una copia tomada en el momento indicado"""
+    moment = moment or datetime.now()
+    return f"{BACKUP_PREFIX}{moment.strftime(BACKUP_TIMESTAMP)}.db"
+
+def verify_backup(path: str) -> bool:
+    """
+    Verifica la integridad de una copia sin comprimir
+    
+    Args:
+        path (str): Ruta del archivo de base de datos
+    
+    Returns:
+        bool: True si PRAGMA integrity_check responde "ok"
+    """
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        result = conn.execute("PRAGMA integrity_check").fetchone()
+        return result is not None and result[0] == "ok"
+    finally:
+        conn.close()
+
+def compress_file(path: str, method: str) -> str:
+    """
+    Comprime un archivo y elimina el original
+    
+    Args:
+        path (str): Archivo a comprimir
+        method (str): "gzip" o "zstd"
+    
+    Returns:
+        str: Ruta del archivo comprimido
+    """
+    if method not in COMPRESSION_SUFFIXES:
+        raise ValueError(f"Método de compresión no soportado: {method}")
+    
+    target = path + COMPRESSION_SUFFIXES[method]
+    
+    with open(path, "rb") as source:
+        if method == "gzip":
+            with gzip.open(target, "wb") as output:
+                shutil.copyfileobj(source, output)
+        else:
+            try:
+                import zstandard
+            except ImportError:
+                raise RuntimeError("La compresión zstd requiere el paquete 'zstandard'")
+            with open(target, "wb") as output:
+                with zstandard.ZstdCompressor().stream_writer(output) as writer:
+                    shutil.copyfileobj(source, writer)
+    
+    os.remove(path)
+    return target
+
+def create_backup(source_path: str, backup_path: str, pages_per_step: int = 256,
+                  step_sleep: float = 0.05, compression: Optional[str] = None,
+                  verify: bool = True) -> str:
+    """
+    Crea una copia consistente de la base de datos mientras sigue en uso
+    
+    Copia ``pages_per_step`` páginas por paso y hace una pausa entre pasos
+    para que las escrituras de la caja no esperen. La conexión de origen
+    mantiene abierta una transacción de lectura durante toda la copia: con
+    WAL, la copia lee siempre la misma instantánea y las ventas que se
+    confirmen mientras tanto no la reinician (sin esa transacción, cada
+    commit de otra conexión la haría empezar de nuevo y con ventas
+    continuas podría no terminar nunca). La copia se escribe en un archivo
+    temporal y solo se renombra si pasa la verificación.
+    
+    Cada copia es completa; no hay copias incrementales.
+    
+    Args:
+        source_path (str): Base de datos de origen
+        backup_path (str): Ruta final de la copia (sin sufijo de compresión)
+        pages_per_step (int): Páginas copiadas en cada paso
+        step_sleep (float): Segundos de pausa entre pasos
+        compression (str): None, "gzip" o "zstd"
+        verify (bool): Ejecutar PRAGMA integrity_check sobre la copia
+    
+    Returns:
+        str: Ruta del archivo de copia creado
+    """
+    Path(backup_path).parent.mkdir(parents=True, exist_ok=True)
+    temp_path = backup_path + ".tmp"
+    
+    def pause_between_steps(status, remaining, total):
+        if remaining and step_sleep:
+            time.sleep(step_sleep)
+    
+    source = sqlite3.connect(source_path, timeout=30.0)
+    target = sqlite3.connect(temp_path)
+    try:
+        # Fijar la instantánea de lectura antes del primer paso
+        source.execute("BEGIN")
+        source.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+        source.backup(target, pages=pages_per_step, progress=pause_between_steps)
+        source.rollback()
+        # La copia es un archivo independiente, sin WAL
+        target.execute("PRAGMA journal_mode = DELETE")
+    finally:
+        target.close()
+        source.close()
+    
+    if verify and not verify_backup(temp_path):
+        os.remove(temp_path)
+        raise RuntimeError(f"La copia de seguridad no pasó la verificación de integridad: {backup_path}")
+    
+    os.replace(temp_path, backup_path)
+    
+    if compression:
+        backup_path = compress_file(backup_path, compression)
+    
+    return backup_path
+
+def list_backups(directory: str) -> List[Path]:
+    """
+    Lista las copias de seguridad de un directorio, la más reciente primero
+    
+    Args:
+        directory (str): Directorio de copias
+    
+    Returns:
+        List[Path]: Archivos de copia reconocidos
+    """
+    folder = Path(directory)
+    if not folder.exists():
+        return []
+    
+    backups = [path for path in folder.iterdir() if _BACKUP_NAME.match(path.name)]
+    return sorted(backups, key=backup_time, reverse=True)
+
+def backup_time(path: Path) -> datetime:
+    """Retorna el momento en que se tomó una copia según su nombre"""
+    return datetime.strptime(_BACKUP_NAME.match(path.name).group(1), BACKUP_TIMESTAMP)
+
+def rotate_backups(directory: str, keep_daily: int = 7, keep_weekly: int = 4) -> List[str]:
+    """
+    Elimina copias antiguas conservando N diarias y M semanales
+    
+    Se conserva la copia más reciente de cada uno de los últimos
+    ``keep_daily`` días con copia y de cada una de las últimas
+    ``keep_weekly`` semanas ISO con copia.
+    
+    Args:
+        directory (str): Directorio de copias
+        keep_daily (int): Días a conservar
+        keep_weekly (int): Semanas a conservar
+    
+    Returns:
+        List[str]: Rutas de las copias eliminadas
+    """
+    keep = set()
+    days_seen = set()
+    weeks_seen = set()
+    
+    for path in list_backups(directory):
+        moment = backup_time(path)
+        day = moment.date()
+        week = moment.isocalendar()[:2]
+        
+        if day not in days_seen and len(days_seen) < keep_daily:
+            days_seen.add(day)
+            keep.add(path)
+        if week not in weeks_seen and len(weeks_seen) < keep_weekly:
+            weeks_seen.add(week)
+            keep.add(path)
+    
+    removed = []
+    for path in list_backups(directory):
+        if path not in keep:
+            path.unlink()
+            removed.append(str(path))
+            logger.info(f"Backup rotado: {path}")
+    
+    return removed
@@ -0,0 +1,341 @@
+"""
+Importación masiva del catálogo desde CSV
+Lee el archivo por bloques, valida cada fila con Book y escribe con executemany
+"""
+
+import csv
+import re
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, TextIO, Tuple
+import sqlite3
+
+from database.migrations.v004_books_fts import ISBN_DIGITS_SQL
+from src.models import Book
+from utils.money import to_cents
+
+# Encabezados aceptados para cada columna (en minúsculas, sin espacios extremos)
+COLUMN_ALIASES = {
+    'title': ('title', 'titulo', 'título'),
+    'author': ('author', 'autor'),
+    'isbn': ('isbn',),
+    'genre': ('genre', 'genero', 'género'),
+    'publisher': ('publisher', 'editorial'),
+    'publication_year': ('publication_year', 'año', 'anio', 'year'),
+    'purchase_price': ('purchase_price', 'precio_compra', 'costo'),
+    'sale_price': ('sale_price', 'precio_venta', 'precio'),
+    'stock_quantity': ('stock_quantity', 'stock', 'cantidad'),
+    'min_stock': ('min_stock', 'stock_minimo', 'stock_mínimo'),
+    'condition': ('condition', 'condicion', 'condición'),
+    'description': ('description', 'descripcion', 'descripción')
+}
+
+# Límite de parámetros por sentencia en versiones antiguas de SQLite
+_MAX_VARIABLES = 900
+
+IMPORT_REASON = "Importación de catálogo"
+
+# Separador de miles para cada separador decimal
+_THOUSANDS = {'.': ',', ',': '.'}
+_DIGITS = re.compile(r"^\d+$")
+
+# Valores para libros nuevos cuando el archivo no trae costo, stock mínimo o
+# condición; a los libros existentes se les conserva el valor que tenían
+NEW_BOOK_DEFAULTS = {
+    'purchase_price': 0,
+    'min_stock': 5,
+    'condition': "Nuevo"
+}
+
+@dataclass
+class ImportResult:
+    """Resultado acumulado de una importación"""
+    
+    rows: int = 0
+    inserted: int = 0
+    updated: int = 0
+    errors: List[str] = field(default_factory=list)
+    
+    @property
+    def skipped(self) -> int:
+        """Filas descartadas por errores de validación"""
+        return len(self.errors)
+
+def _column_map(fieldnames: List[str]) -> Dict[str, str]:
+    """Relaciona cada columna del modelo con el encabezado del archivo"""
+    headers = {name.strip().lower(): name for name in fieldnames if name}
+    mapping = {}
+    for column, aliases in COLUMN_ALIASES.items():
+        for alias in aliases:
+            if alias in headers:
+                mapping[column] = headers[alias]
+                break
+    return mapping
+
+def _decimal_separator(text: str, decimal: Optional[str]) -> str:
+    """
+    Separador decimal de un número ya sin símbolo de moneda
+    
+    Con los dos separadores presentes, el último es el decimal ("1.200,50",
+    "1,200.50"); uno repetido solo puede ser de miles ("1.200.000"). Si hay
+    un único separador seguido de tres dígitos ("1,200") y el archivo no
+    indica cuál es el decimal, el valor es ambiguo.
+    
+    Raises:
+        ValueError: Si no se puede saber cuál es el separador decimal
+    """
+    commas, dots = text.count(','), text.count('.')
+    if commas and dots:
+        return ',' if text.rfind(',') > text.rfind('.') else '.'
+    if not commas and not dots:
+        return decimal or '.'
+    separator = ',' if commas else '.'
+    if commas + dots > 1:
+        return _THOUSANDS[separator]
+    if decimal is not None:
+        return decimal
+    if len(text.rpartition(separator)[2]) != 3:
+        return separator
+    raise ValueError(f"número ambiguo \"{text}\": no se sabe si '{separator}' separa miles o decimales")
+
+def _parse_number(value: Optional[str], kind=float, decimal: Optional[str] = None):
+    """
+    Convierte un texto numérico del proveedor ("$1,200.50", "29,95", "3") o None si está vacío
+    
+    ``kind`` puede ser int, float o to_cents para los precios.
+    ``decimal`` es el separador decimal del archivo ('.' o ','), o None
+    para deducirlo de cada valor.
+    
+    Raises:
+        ValueError: Si el valor no es un número o su separador decimal es ambiguo
+    """
+    if value is None:
+        return None
+    text = value.strip().replace('$', '').replace(' ', '')
+    if not text:
+        return None
+    
+    separator = _decimal_separator(text, decimal)
+    whole, _, fraction = text.partition(separator)
+    sign = '-' if whole.startswith('-') else ''
+    groups = whole.lstrip('-').split(_THOUSANDS[separator])
+    if groups == [''] and fraction:
+        groups = ['0']
+    # Los miles van en grupos de tres dígitos y nunca después del decimal
+    if (not all(map(_DIGITS.match, groups)) or (fraction and not _DIGITS.match(fraction))
+            or (len(groups) > 1 and (len(groups[0]) > 3 or any(len(group) != 3 for group in groups[1:])))):
+        raise ValueError(f"número no válido: \"{value.strip()}\"")
+    
+    number = sign + "".join(groups) + (f".{fraction}" if fraction else "")
+    return kind(float(number)) if kind is int else kind(number)
+
+def isbn_digits(isbn: Optional[str]) -> Optional[str]:
+    """ISBN sin guiones ni espacios, como ISBN_DIGITS_SQL; None si queda vacío"""
+    if not isbn:
+        return None
+    return isbn.replace('-', '').replace(' ', '') or None
+
+def parse_book(row: Dict[str, str], columns: Dict[str, str], decimal: Optional[str] = None) -> Book:
+    """
+    Construye un Book validado a partir de una fila del CSV
+    
+    Si el archivo no trae costo, stock mínimo o condición (falta la columna
+    o la celda está vacía), esos campos quedan en None: al actualizar un
+    libro existente se conserva su valor y al insertar uno nuevo se usa
+    NEW_BOOK_DEFAULTS.
+    
+    Args:
+        row (Dict[str, str]): Fila leída por csv.DictReader
+        columns (Dict[str, str]): Columna del modelo -> encabezado del archivo
+        decimal (str): Separador decimal del archivo, o None para deducirlo de cada valor
+    
+    Returns:
+        Book: Libro validado
+    
+    Raises:
+        ValueError: Si faltan campos obligatorios o algún valor no es válido
+    """
+    def text(column: str) -> Optional[str]:
+        value = row.get(columns.get(column, ''), None)
+        value = value.strip() if value else ''
+        return value or None
+    
+    def number(column: str, kind=float):
+        return _parse_number(row.get(columns.get(column, ''), None), kind, decimal)
+    
+    title, author, sale_price = text('title'), text('author'), number('sale_price', to_cents)
+    if not title or not author or sale_price is None:
+        raise ValueError("faltan título, autor o precio de venta")
+    
+    optional = {
+        'purchase_price': number('purchase_price', to_cents),
+        'min_stock': number('min_stock', int),
+        'condition': text('condition')
+    }
+    book = Book(
+        title=title,
+        author=author,
+        isbn=text('isbn'),
+        genre=text('genre'),
+        publisher=text('publisher'),
+        publication_year=number('publication_year', int),
+        sale_price=sale_price,
+        stock_quantity=number('stock_quantity', int) or 0,
+        description=text('description'),
+        **{name: NEW_BOOK_DEFAULTS[name] if value is None else value for name, value in optional.items()}
+    )
+    
+    # Ya validado: los campos que no vinieron quedan sin dato
+    for name, value in optional.items():
+        if value is None:
+            setattr(book, name, None)
+    return book
+
+def read_book_chunks(source: TextIO, chunk_size: int = 5000,
+                     delimiter: Optional[str] = None) -> Iterator[Tuple[List[Book], List[str]]]:
+    """
+    Lee el CSV por bloques de filas validadas
+    
+    Args:
+        source (TextIO): Archivo de texto abierto
+        chunk_size (int): Filas por bloque
+        delimiter (str): Separador; se detecta (coma, punto y coma o tabulador) si es None
+    
+    Yields:
+        Tuple[List[Book], List[str]]: Libros válidos del bloque y errores por línea
+    """
+    if delimiter is None:
+        sample = source.read(8192)
+        source.seek(0)
+        try:
+            delimiter = csv.Sniffer().sniff(sample, delimiters=",;\t").delimiter
+        except csv.Error:
+            delimiter = ","
+    
+    # Separados por coma, las comas de un número solo pueden ser de miles
+    decimal = '.' if delimiter == ',' else None
+    reader = csv.DictReader(source, delimiter=delimiter)
+    columns = _column_map(reader.fieldnames or [])
+    missing = [column for column in ('title', 'author', 'sale_price') if column not in columns]
+    if missing:
+        raise ValueError(f"Faltan columnas obligatorias en el CSV: {', '.join(missing)}")
+    
+    while True:
+        books, errors = [], []
+        for row in islice(reader, chunk_size):
+            try:
+                books.append(parse_book(row, columns, decimal))
+            except (ValueError, TypeError) as e:
+                errors.append(f"Línea {reader.line_num}: {e}")
+        
+        if not books and not errors:
+            break
+        yield books, errors
+
+def _or_default(book: Book, name: str):
+    """Valor del campo, o el de NEW_BOOK_DEFAULTS si el archivo no lo trajo"""
+    value = getattr(book, name)
+    return NEW_BOOK_DEFAULTS[name] if value is None else value
+
+def write_book_chunk(conn: sqlite3.Connection, books: List[Book],
+                     replace_stock: bool = False) -> Tuple[int, int]:
+    """
+    Inserta o actualiza un bloque de libros por ISBN dentro de la transacción abierta
+    
+    Los libros cuyo ISBN ya existe se actualizan; su stock se suma (o se
+    reemplaza si ``replace_stock``) y la diferencia queda como movimiento de
+    inventario. Los nuevos se insertan con un movimiento de entrada. Los
+    ISBN se comparan sin guiones ni espacios ("978-84-..." = "97884...").
+    
+    Args:
+        conn (sqlite3.Connection): Conexión con la transacción de escritura abierta
+        books (List[Book]): Libros validados
+        replace_stock (bool): Tomar el stock del archivo como stock final
+    
+    Returns:
+        Tuple[int, int]: (insertados, actualizados)
+    """
+    # Dentro del bloque, la última fila de cada ISBN manda y el stock se acumula
+    by_isbn: Dict[str, Book] = {}
+    new_books: List[Book] = []
+    for book in books:
+        isbn = isbn_digits(book.isbn)
+        if not isbn:
+            new_books.append(book)
+        elif isbn in by_isbn:
+            previous = by_isbn[isbn]
+            if not replace_stock:
+                book.stock_quantity += previous.stock_quantity
+            by_isbn[isbn] = book
+        else:
+            by_isbn[isbn] = book
+    
+    existing: Dict[str, Tuple[int, int]] = {}
+    isbns = list(by_isbn)
+    # Usa el índice por expresión idx_books_isbn_digits
+    digits = ISBN_DIGITS_SQL.format(column='isbn')
+    for start in range(0, len(isbns), _MAX_VARIABLES):
+        part = isbns[start:start + _MAX_VARIABLES]
+        placeholders = ", ".join("?" * len(part))
+        for row in conn.execute(
+            f"SELECT id, {digits}, stock_quantity FROM books WHERE {digits} IN ({placeholders})", part
+        ):
+            existing[row[1]] = (row[0], row[2])
+    
+    updates, movements = [], []
+    for isbn, book in by_isbn.items():
+        if isbn not in existing:
+            new_books.append(book)
+            continue
+        book_id, current_stock = existing[isbn]
+        if replace_stock:
+            stock, delta, movement_type = book.stock_quantity, book.stock_quantity - current_stock, 'ADJUSTMENT'
+        else:
+            stock, delta, movement_type = current_stock + book.stock_quantity, book.stock_quantity, 'IN'
+        updates.append((
+            book.title, book.author, book.genre, book.publisher, book.publication_year,
+            book.purchase_price, book.sale_price, stock, book.min_stock, book.condition,
+            book.description, book_id
+        ))
+        if delta:
+            movements.append((book_id, movement_type, delta, IMPORT_REASON))
+    
+    cursor = conn.cursor()
+    cursor.executemany('''
+        UPDATE books SET title = ?, author = ?, genre = COALESCE(?, genre),
+                         publisher = COALESCE(?, publisher),
+                         publication_year = COALESCE(?, publication_year),
+                         purchase_price = COALESCE(?, purchase_price),
+                         sale_price = ?, stock_quantity = ?,
+                         min_stock = COALESCE(?, min_stock),
+                         condition = COALESCE(?, condition),
+                         description = COALESCE(?, description),
+                         updated_at = CURRENT_TIMESTAMP
+        WHERE id = ?
+    ''', updates)
+    
+    cursor.executemany('''
+        INSERT INTO inventory_movements (book_id, movement_type, quantity, reason)
+        VALUES (?, ?, ?, ?)
+    ''', movements)
+    
+    if new_books:
+        # Con el bloqueo de escritura tomado, los IDs nuevos son los mayores a este
+        last_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM books").fetchone()[0]
+        cursor.executemany('''
+            INSERT INTO books (title, author, isbn, genre, publisher, publication_year,
+                               purchase_price, sale_price, stock_quantity, min_stock,
+                               condition, description)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', [(book.title, book.author, book.isbn, book.genre, book.publisher,
+               book.publication_year, _or_default(book, 'purchase_price'), book.sale_price,
+               book.stock_quantity, _or_default(book, 'min_stock'), _or_default(book, 'condition'),
+               book.description)
+              for book in new_books])
+        cursor.execute('''
+            INSERT INTO inventory_movements (book_id, movement_type, quantity, reason)
+            SELECT id, 'IN', stock_quantity, ? FROM books
+            WHERE id > ? AND stock_quantity > 0
+        ''', (IMPORT_REASON, last_id))
+    
+    return len(new_books), len(updates)
@@ -0,0 +1,164 @@
+"""
+Pool de conexiones SQLite reutilizables
+Evita abrir una conexión nueva por cada consulta y aplica los PRAGMAs de rendimiento
+"""
+
+import sqlite3
+import threading
+import queue
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+class ConnectionPool:
+    """Pool acotado de conexiones SQLite compartidas entre hilos"""
+
+    def __init__(self, db_path: str, pool_size: int = 5, timeout: float = 30.0,
+                 check_same_thread: bool = False, pragmas: Optional[Dict] = None,
+                 on_connect: Optional[Callable[[sqlite3.Connection], None]] = None,
+                 uri: bool = False):
+        """
+        Inicializa el pool de conexiones
+
+        Args:
+            db_path (str): Ruta de la base de datos
+            pool_size (int): Número máximo de conexiones abiertas a la vez
+            timeout (float): Segundos de espera por una conexión libre o un bloqueo
+            check_same_thread (bool): Restringir cada conexión al hilo que la creó
+            pragmas (Dict): PRAGMAs a aplicar en cada conexión nueva
+            on_connect (Callable): Se llama con cada conexión nueva tras los PRAGMAs
+            uri (bool): Interpretar db_path como URI ("file:...?mode=ro")
+        """
+        self.db_path = db_path
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.check_same_thread = check_same_thread
+        self.pragmas = pragmas or {}
+        self.on_connect = on_connect
+        self.uri = uri
+
+        # LIFO: la conexión usada más recientemente tiene la caché más caliente
+        self._idle = queue.LifoQueue(maxsize=pool_size)
+        self._slots = threading.BoundedSemaphore(pool_size)
+
+        # Las conexiones de una generación anterior se descartan al volver al pool
+        self._generation = 0
+        self._generations: Dict[sqlite3.Connection, int] = {}
+
+    def _connect(self) -> sqlite3.Connection:
+        """Abre una conexión nueva y le aplica los PRAGMAs configurados"""
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.timeout,
+            check_same_thread=self.check_same_thread,
+            uri=self.uri
+        )
+        conn.row_factory = sqlite3.Row  # Permite acceso por nombre de columna
+
+        for name, value in self.pragmas.items():
+            if value is not None:
+                conn.execute(f"PRAGMA {name} = {value}")
+
+        if self.on_connect is not None:
+            self.on_connect(conn)
+
+        return conn
+
+    def _discard(self, conn: sqlite3.Connection):
+        """Cierra una conexión del pool y olvida su generación"""
+        self._generations.pop(conn, None)
+        conn.close()
+
+    def connect(self) -> sqlite3.Connection:
+        """
+        Abre una conexión dedicada fuera del pool con los mismos PRAGMAs
+
+        Returns:
+            sqlite3.Connection: Conexión que el llamador debe cerrar
+        """
+        return self._connect()
+
+    def acquire(self) -> sqlite3.Connection:
+        """
+        Toma una conexión del pool, creando una nueva si hay cupo
+
+        Returns:
+            sqlite3.Connection: Conexión lista para usarse
+        """
+        if not self._slots.acquire(timeout=self.timeout):
+            raise sqlite3.OperationalError("No hay conexiones disponibles en el pool")
+
+        try:
+            conn = self._idle.get_nowait()
+            if self._generations.get(conn) == self._generation:
+                return conn
+            self._discard(conn)
+        except queue.Empty:
+            pass
+
+        try:
+            conn = self._connect()
+            self._generations[conn] = self._generation
+            return conn
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, conn: sqlite3.Connection):
+        """
+        Devuelve una conexión al pool
+
+        Args:
+            conn (sqlite3.Connection): Conexión obtenida con acquire()
+        """
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            if self._generations.get(conn) != self._generation:
+                self._discard(conn)
+            else:
+                self._idle.put_nowait(conn)
+        except (sqlite3.Error, queue.Full):
+            self._discard(conn)
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """
+        Presta una conexión durante un bloque ``with``
+
+        Hace commit al salir normalmente y rollback si ocurre un error.
+        """
+        conn = self.acquire()
+        try:
+            yield conn
+            if conn.in_transaction:
+                conn.commit()
+        except BaseException:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+        finally:
+            self.release(conn)
+
+    def close_all(self):
+        """Cierra todas las conexiones inactivas del pool"""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(conn)
+
+    def recycle(self):
+        """
+        Renueva las conexiones del pool
+
+        Las inactivas se cierran ya; las prestadas, al devolverse. Las
+        siguientes se abren de nuevo y pasan otra vez por ``on_connect``.
+        """
+        self._generation += 1
+        self.close_all()
@@ -5,28 +5,217 @@ Maneja la creación, conexión y operaciones de la base de datos
 
 import sqlite3
 import os
+import re
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
 from pathlib import Path
-from datetime import datetime
-from typing import List, Dict, Optional, Tuple
+from datetime import date, timedelta
+from typing import Any, Callable, Iterable, Iterator, List, Dict, Optional, TextIO, Tuple, Union
 import logging
 
-# Configurar logging
-logging.basicConfig(level=logging.INFO)
+from src.config import (
+    BACKUP_CONFIG, BUSINESS_CONFIG, BUSINESS_CONFIG_DESCRIPTIONS, DATABASE_CONFIG, DEFAULT_STORE, STORES
+)
+from database import archive, backup
+from database.archive import ARCHIVE_VIEWS
+from database.catalog_import import ImportResult, read_book_chunks, write_book_chunk
+from database.connection_pool import ConnectionPool
+from database.export import DATASETS, dataset_params, export_cursor
+from database.migrations import apply_migrations, get_schema_version, latest_version
+from database.migrations.v005_daily_sales_summary import rebuild_sql
+from database.migrations.v006_stock_checkpoints import SIGNED_QUANTITY_SQL
+from database.profiler import QueryProfiler, format_plan
+from database.writer import WriteQueue
+from database.query_cache import (
+    QueryCache, is_cacheable, is_schema_change, read_tables, written_tables
+)
+from src.models import Book, BookCatalog, Sale
+from src.models.book import BOOK_FIELDS, book_values
+
 logger = logging.getLogger(__name__)
 
+# Tipos por defecto de query_frame() para columnas conocidas del esquema
+FRAME_DTYPES = {
+    'genre': 'category',
+    'condition': 'category',
+    'payment_method': 'category',
+    'movement_type': 'category',
+    'sale_date': 'datetime64[ns]',
+    'created_at': 'datetime64[ns]',
+    'updated_at': 'datetime64[ns]',
+    'movement_date': 'datetime64[ns]',
+    # Importes en centavos; Int64 admite valores nulos
+    'purchase_price': 'Int64',
+    'sale_price': 'Int64',
+    'total_amount': 'Int64',
+    'unit_price': 'Int64',
+    'subtotal': 'Int64',
+    'discount': 'Int64',
+    'tax': 'float64'
+}
+
+# Columnas que se escriben al insertar un libro; id y fechas las pone la base
+BOOK_INSERT_FIELDS = tuple(name for name in BOOK_FIELDS if name not in ('id', 'created_at', 'updated_at'))
+_BOOK_INSERT_POSITIONS = tuple(BOOK_FIELDS.index(name) for name in BOOK_INSERT_FIELDS)
+
+INITIAL_STOCK_REASON = "Stock inicial"
+
+def day_key(value: date) -> int:
+    """
+    Convierte una fecha a la clave de día usada en sales.sale_day
+    
+    Args:
+        value (date): Fecha o fecha y hora
+        
+    Returns:
+        int: Día en formato YYYYMMDD
+    """
+    return value.year * 10000 + value.month * 100 + value.day
+
+def day_range(start: date, end: date) -> Tuple[int, int]:
+    """
+    Convierte un rango de fechas inclusivo en límites semiabiertos de sale_day
+    
+    Se usa como ``sale_day >= ? AND sale_day < ?`` para que SQLite
+    recorra solo el tramo del índice correspondiente al período.
+    
+    Args:
+        start (date): Primer día del período
+        end (date): Último día del período (incluido)
+        
+    Returns:
+        Tuple[int, int]: (desde, hasta) con el límite superior excluido
+    """
+    return day_key(start), day_key(end + timedelta(days=1))
+
+def day_from_key(key: int) -> date:
+    """Convierte una clave YYYYMMDD de vuelta en fecha"""
+    return date(key // 10000, key // 100 % 100, key % 100)
+
+def _next_month(value: date) -> date:
+    """Primer día del mes siguiente"""
+    return (value.replace(day=1) + timedelta(days=32)).replace(day=1)
+
+def _format_config_value(value: Any) -> str:
+    """Texto con que se guarda un valor en system_config"""
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    return str(value)
+
+def _parse_config_value(key: str, value: str) -> Any:
+    """Convierte el texto de system_config al tipo del valor por defecto de la clave"""
+    default = BUSINESS_CONFIG.get(key)
+    if isinstance(default, bool):
+        return value.strip().lower() in ("1", "true", "sí", "si", "yes")
+    if isinstance(default, (int, float)):
+        try:
+            return type(default)(float(value))
+        except ValueError:
+            logger.warning(f"Valor inválido para {key} en system_config: {value!r}")
+            return default
+    return value
+
+# Stock por libro = punto de control + movimientos posteriores hasta una fecha
+_LEDGER_SQL = f'''
+    SELECT book_id, stock_quantity AS qty FROM stock_checkpoints WHERE checkpoint_day = ?
+    UNION ALL
+    SELECT book_id, {SIGNED_QUANTITY_SQL} AS qty FROM {ARCHIVE_VIEWS['inventory_movements']}
+    WHERE movement_date >= ? AND movement_date < ?
+'''
+
+# El resumen se recalcula con las ventas activas y las archivadas
+SUMMARY_REBUILD_SQL = rebuild_sql(ARCHIVE_VIEWS['sales'], ARCHIVE_VIEWS['sale_items'])
+
 class DatabaseManager:
     """Gestor principal de la base de datos SQLite"""
     
-    def __init__(self, db_path: str = "data/bookstore.db"):
+    def __init__(self, db_path: str = "data/bookstore.db", store: Optional[str] = None):
         """
         Inicializa el gestor de base de datos
         
         Args:
             db_path (str): Ruta donde se guardará la base de datos
+            store (str): Clave de la tienda en STORES, si corresponde a una
         """
         self.db_path = db_path
+        self.store = store
+        self.archive_dir = Path(db_path).parent / (DATABASE_CONFIG.get("archive_directory") or "")
         self.ensure_data_directory()
+        self._pool = ConnectionPool(
+            db_path,
+            pool_size=DATABASE_CONFIG.get("pool_size", 5),
+            timeout=DATABASE_CONFIG.get("timeout", 30.0),
+            check_same_thread=DATABASE_CONFIG.get("check_same_thread", False),
+            pragmas={
+                "journal_mode": DATABASE_CONFIG.get("journal_mode"),
+                "synchronous": DATABASE_CONFIG.get("synchronous"),
+                "cache_size": DATABASE_CONFIG.get("cache_size"),
+                "mmap_size": DATABASE_CONFIG.get("mmap_size"),
+                "busy_timeout": DATABASE_CONFIG.get("busy_timeout"),
+            },
+            on_connect=self._attach_archives
+        )
+        
+        # Caché de lecturas; se invalida por tabla o si otro proceso escribe
+        cache_size = DATABASE_CONFIG.get("query_cache_size", 0)
+        self._cache = QueryCache(cache_size) if cache_size else None
+        self._monitor = sqlite3.connect(db_path, check_same_thread=False)
+        self._monitor_lock = threading.Lock()
+        self._data_version = None
+        
+        # Tiempos por sentencia y registro de consultas lentas
+        self._profiler = None
+        self.set_profiling(DATABASE_CONFIG.get("profile_queries", False))
+        
+        self._writer = None
+        self._pending_writes = 0
+        
+        # Mes (YYYYMM01) cuyos puntos de control de stock ya se crearon en este proceso
+        self._checkpoint_month = None
+        self._pending_lock = threading.Lock()
+        
+        # Copia en memoria de system_config, ya convertida a su tipo
+        self._config: Optional[Dict[str, Any]] = None
+        self._config_version = None
+        self._config_checked = 0.0
+        self._config_lock = threading.Lock()
+        self._config_interval = DATABASE_CONFIG.get("system_config_check_interval", 1.0)
         self.init_database()
+        
+        # Modo escritor: un solo hilo hace todas las escrituras con commit agrupado
+        if DATABASE_CONFIG.get("writer_mode", False):
+            self._writer = WriteQueue(
+                self._pool.connect,
+                max_batch=DATABASE_CONFIG.get("writer_batch_size", 64),
+                on_commit=self._after_group_commit
+            )
+        
+        # Conexiones de solo lectura para reportes, sobre la base o sobre una réplica
+        self._analytics = None
+        replica = DATABASE_CONFIG.get("analytics_replica")
+        self._replica_path = str(Path(db_path).parent / replica) if replica else None
+        self._replica_lock = threading.Lock()
+        self._replica_refreshing = False
+        analytics_size = DATABASE_CONFIG.get("analytics_pool_size", 0)
+        if analytics_size:
+            if self._replica_path and not Path(self._replica_path).exists():
+                self.refresh_analytics_replica()
+            source = Path(self._replica_path or db_path).resolve()
+            self._analytics = ConnectionPool(
+                f"{source.as_uri()}?mode=ro",
+                pool_size=analytics_size,
+                timeout=DATABASE_CONFIG.get("timeout", 30.0),
+                check_same_thread=DATABASE_CONFIG.get("check_same_thread", False),
+                pragmas={
+                    "cache_size": DATABASE_CONFIG.get("cache_size"),
+                    "mmap_size": DATABASE_CONFIG.get("mmap_size"),
+                    "busy_timeout": DATABASE_CONFIG.get("busy_timeout"),
+                },
+                on_connect=self._prepare_analytics,
+                uri=True
+            )
         logger.info(f"Base de datos inicializada en: {self.db_path}")
     
     def ensure_data_directory(self):
@@ -35,130 +224,602 @@ class DatabaseManager:
         data_dir.mkdir(parents=True, exist_ok=True)
         logger.info(f"Directorio de datos creado: {data_dir}")
     
-    def get_connection(self) -> sqlite3.Connection:
+    @contextmanager
+    def get_connection(self, analytics: bool = False) -> Iterator[sqlite3.Connection]:
         """
-        Obtiene una conexión a la base de datos
+        Presta una conexión del pool para usarse en un bloque ``with``
+        
+        La conexión se devuelve al pool al salir del bloque, con commit si
+        todo salió bien o rollback si hubo un error.
+        
+        Args:
+            analytics (bool): Usar una conexión de solo lectura para reportes
+                (la del pool principal si no hay pool de análisis)
         
         Returns:
-            sqlite3.Connection: Conexión a la base de datos
+            Iterator[sqlite3.Connection]: Conexión a la base de datos
         """
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row  # Permite acceso por nombre de columna
-        return conn
+        if analytics and self._analytics is not None:
+            self._maybe_refresh_replica()
+            with self._analytics.connection() as conn:
+                yield conn
+            return
+        
+        with self._pool.connection() as conn:
+            yield conn
     
-    def init_database(self):
-        """Inicializa las tablas de la base de datos"""
+    def _attach_archives(self, conn: sqlite3.Connection):
+        """Adjunta los archivos por año y crea las vistas all_* en cada conexión nueva"""
+        archive.attach_archives(conn, self.archive_dir)
+    
+    def _prepare_analytics(self, conn: sqlite3.Connection):
+        """Prepara una conexión de reportes: archivos en solo lectura y baja prioridad"""
+        archive.attach_archives(conn, self.archive_dir, read_only=True)
+        conn.set_progress_handler(self._yield_to_writes, DATABASE_CONFIG.get("analytics_progress_ops", 10000))
+    
+    def _yield_to_writes(self) -> int:
+        """
+        Manejador de progreso de las consultas de reportes
+        
+        Mientras haya una escritura en curso, el reporte hace una pausa
+        breve cada tantas instrucciones para ceder CPU y disco a la caja.
+        """
+        if self._pending_writes:
+            time.sleep(DATABASE_CONFIG.get("analytics_yield_ms", 2) / 1000)
+        return 0
+    
+    def _end_write(self, *_):
+        """Descuenta una escritura en curso"""
+        with self._pending_lock:
+            self._pending_writes -= 1
+    
+    def refresh_analytics_replica(self) -> Optional[str]:
+        """
+        Copia la base principal sobre la réplica de reportes
+        
+        Usa la API de backup por pasos, así la caja sigue escribiendo
+        mientras se copia. Las conexiones de reportes abiertas terminan su
+        consulta sobre la copia anterior; las siguientes usan la nueva.
+        
+        Returns:
+            Optional[str]: Ruta de la réplica, o None si no hay réplica configurada
+        """
+        if not self._replica_path:
+            return None
+        
+        path = backup.create_backup(
+            self.db_path,
+            str(self._replica_path),
+            pages_per_step=BACKUP_CONFIG['pages_per_step'],
+            step_sleep=BACKUP_CONFIG['step_sleep'],
+            verify=False
+        )
+        if self._analytics is not None:
+            self._analytics.recycle()
+        # Los resultados guardados de la réplica anterior ya no corresponden
+        self.clear_cache()
+        logger.info(f"Réplica de reportes actualizada: {path}")
+        return path
+    
+    def _maybe_refresh_replica(self):
+        """Refresca la réplica en segundo plano si es más antigua que analytics_replica_max_age"""
+        if not self._replica_path or self._replica_refreshing:
+            return
+        try:
+            age = time.time() - os.path.getmtime(self._replica_path)
+        except OSError:
+            age = float("inf")
+        if age < DATABASE_CONFIG.get("analytics_replica_max_age", 300):
+            return
+        
+        with self._replica_lock:
+            if self._replica_refreshing:
+                return
+            self._replica_refreshing = True
+        
+        def refresh():
+            try:
+                self.refresh_analytics_replica()
+            except Exception as e:
+                logger.error(f"Error actualizando la réplica de reportes: {e}")
+            finally:
+                self._replica_refreshing = False
+        
+        threading.Thread(target=refresh, name="analytics-replica", daemon=True).start()
+    
+    def close(self):
+        """Cierra las conexiones abiertas del pool"""
+        if self._writer is not None:
+            self._writer.close()
+        if self._analytics is not None:
+            self._analytics.close_all()
+        self._pool.close_all()
+        with self._monitor_lock:
+            self._monitor.close()
+    
+    def _read_data_version(self) -> int:
+        """Lee PRAGMA data_version, que cambia cuando otra conexión hace commit"""
+        with self._monitor_lock:
+            return self._monitor.execute("PRAGMA data_version").fetchone()[0]
+    
+    def _check_external_writes(self):
+        """Vacía la caché si alguien escribió en la base sin pasar por este gestor"""
+        version = self._read_data_version()
+        if version != self._data_version:
+            self._data_version = version
+            self._cache.clear()
+    
+    def _after_write(self, tables):
+        """
+        Invalida la caché tras una escritura propia
+        
+        Args:
+            tables: Tablas modificadas por la escritura
+        """
+        if self._cache is None:
+            return
+        self._cache.invalidate(tables)
+        # La escritura propia también cambia data_version; las externas
+        # anteriores ya se revisaron dentro de la transacción
+        self._data_version = self._read_data_version()
+    
+    def _after_schema_change(self):
+        """Vacía la caché y relee los triggers tras un CREATE, ALTER o DROP"""
+        if self._cache is None:
+            return
+        self._cache.clear()
         with self.get_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Tabla de libros
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS books (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    title TEXT NOT NULL,
-                    author TEXT NOT NULL,
-                    isbn TEXT UNIQUE,
-                    genre TEXT,
-                    publisher TEXT,
-                    publication_year INTEGER,
-                    purchase_price REAL NOT NULL,
-                    sale_price REAL NOT NULL,
-                    stock_quantity INTEGER NOT NULL DEFAULT 0,
-                    min_stock INTEGER DEFAULT 5,
-                    condition TEXT DEFAULT 'Nuevo',
-                    description TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            
-            # Tabla de ventas
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS sales (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    total_amount REAL NOT NULL,
-                    payment_method TEXT DEFAULT 'Efectivo',
-                    customer_name TEXT,
-                    customer_phone TEXT,
-                    discount REAL DEFAULT 0,
-                    tax REAL DEFAULT 0,
-                    sale_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    notes TEXT
-                )
-            ''')
-            
-            # Tabla de items de venta
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS sale_items (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    sale_id INTEGER NOT NULL,
-                    book_id INTEGER NOT NULL,
-                    quantity INTEGER NOT NULL,
-                    unit_price REAL NOT NULL,
-                    subtotal REAL NOT NULL,
-                    FOREIGN KEY (sale_id) REFERENCES sales (id) ON DELETE CASCADE,
-                    FOREIGN KEY (book_id) REFERENCES books (id)
-                )
-            ''')
-            
-            # Tabla de movimientos de inventario
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS inventory_movements (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    book_id INTEGER NOT NULL,
-                    movement_type TEXT NOT NULL, -- 'IN', 'OUT', 'ADJUSTMENT'
-                    quantity INTEGER NOT NULL,
-                    reason TEXT,
-                    reference_id INTEGER, -- ID de venta si aplica
-                    movement_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (book_id) REFERENCES books (id)
-                )
-            ''')
-            
-            # Tabla de configuración del sistema
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS system_config (
-                    key TEXT PRIMARY KEY,
-                    value TEXT NOT NULL,
-                    description TEXT,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
+            self._refresh_cache_dependencies(conn)
+        self._data_version = self._read_data_version()
+    
+    def _after_group_commit(self, tags: List[Optional[Iterable[str]]]):
+        """
+        Invalida la caché tras un commit agrupado del hilo escritor
+        
+        Args:
+            tags: Tablas escritas por cada operación (None si cambió el esquema)
+        """
+        if any(tables is None for tables in tags):
+            self._after_schema_change()
+        elif tags:
+            self._after_write(set().union(*tags))
+    
+    def _write_transaction(self, fn: Callable[[sqlite3.Connection], Any],
+                           tables: Optional[Iterable[str]]) -> Future:
+        """
+        Ejecuta una escritura dentro de una transacción
+        
+        En modo escritor la operación se encola y se confirma junto con las
+        demás del mismo lote; si no (o si el hilo escritor se detuvo por un
+        error), se ejecuta en el hilo actual. ``fn`` recibe la conexión con
+        la transacción ya abierta y no debe hacer commit ni rollback: basta
+        con lanzar una excepción para deshacerla.
+        
+        Args:
+            fn (Callable): Función que escribe y retorna un resultado
+            tables: Tablas modificadas, para invalidar la caché (None si cambia el esquema)
+        
+        Returns:
+            Future: Resultado de fn, disponible tras el commit
+        """
+        if self._cache is not None:
+            write = fn
             
-            # Insertar configuración inicial
-            cursor.execute('''
-                INSERT OR IGNORE INTO system_config (key, value, description) VALUES
-                ('app_name', 'Sistema POS - Librería Callejera', 'Nombre de la aplicación'),
-                ('version', '1.0.0', 'Versión actual del sistema'),
-                ('currency', 'MXN', 'Moneda del sistema'),
-                ('tax_rate', '0.0', 'Tasa de impuestos (IVA) - 0% para comercio informal'),
-                ('min_stock_alert', '5', 'Stock mínimo para alertas')
-            ''')
+            def fn(conn: sqlite3.Connection) -> Any:
+                # Con el bloqueo de escritura tomado nadie más puede confirmar: lo que
+                # cambió data_version hasta aquí es externo y se descarta de la caché
+                # antes de que _after_write tome la versión posterior como propia
+                self._check_external_writes()
+                return write(conn)
+        
+        # Los reportes ceden el paso mientras haya escrituras pendientes
+        with self._pending_lock:
+            self._pending_writes += 1
+        
+        # Si el hilo escritor se detuvo por un error, se escribe aquí mismo
+        if self._writer is not None and self._writer.error is None:
+            try:
+                future = self._writer.submit(fn, tables)
+            except Exception:
+                self._end_write()
+                raise
+            future.add_done_callback(self._end_write)
+            return future
+        
+        future: Future = Future()
+        future.add_done_callback(self._end_write)
+        try:
+            with self.get_connection() as conn:
+                # Tomar el bloqueo de escritura desde el inicio
+                conn.execute("BEGIN IMMEDIATE")
+                result = fn(conn)
+                conn.commit()
+        except Exception as e:
+            future.set_exception(e)
+            return future
+        
+        if tables is None:
+            self._after_schema_change()
+        else:
+            self._after_write(tables)
+        future.set_result(result)
+        return future
+    
+    def _refresh_cache_dependencies(self, conn: sqlite3.Connection):
+        """Registra en la caché qué tablas modifican los triggers de cada tabla"""
+        if self._cache is None:
+            return
+        dependents: Dict[str, set] = {}
+        for row in conn.execute("SELECT tbl_name, sql FROM sqlite_master WHERE type = 'trigger'"):
+            dependents.setdefault(row['tbl_name'].lower(), set()).update(written_tables(row['sql']))
+        # Las vistas de archivo cambian con sus tablas activas
+        for table, view in ARCHIVE_VIEWS.items():
+            dependents.setdefault(table, set()).add(view)
+        self._cache.set_dependencies(dependents)
+    
+    @staticmethod
+    def _cache_key(kind: str, query: str, params, *extra) -> Tuple:
+        """Construye la clave de caché de una consulta y sus parámetros"""
+        if isinstance(params, dict):
+            params = tuple(sorted(params.items()))
+        return (kind, query, tuple(params)) + extra
+    
+    def _read_source(self, analytics: bool) -> str:
+        """Origen de una lectura para la clave de caché: la réplica puede ir atrasada"""
+        return "replica" if analytics and self._analytics is not None and self._replica_path else "primary"
+    
+    def cache_stats(self) -> Dict:
+        """
+        Obtiene los contadores de la caché de consultas
+        
+        Returns:
+            Dict: Aciertos, fallos, entradas e invalidaciones (vacío si está desactivada)
+        """
+        return self._cache.stats() if self._cache is not None else {}
+    
+    def clear_cache(self):
+        """Vacía la caché de consultas"""
+        if self._cache is not None:
+            self._cache.clear()
+    
+    def _profile(self, conn: sqlite3.Connection, query: str, params, started: float, rows: int):
+        """
+        Registra el tiempo de una sentencia en el perfilador
+        
+        Args:
+            conn (sqlite3.Connection): Conexión donde se ejecutó, para EXPLAIN
+            query (str): Sentencia ejecutada
+            params: Parámetros usados
+            started (float): Valor de time.perf_counter() al empezar
+            rows (int): Filas devueltas o afectadas
+        """
+        if self._profiler is None:
+            return
+        elapsed = time.perf_counter() - started
+        plan = None
+        if self._profiler.wants_plan(query, elapsed):
+            try:
+                plan = format_plan(conn.execute(f"EXPLAIN QUERY PLAN {query}", params).fetchall())
+            except sqlite3.Error:
+                plan = []
+        self._profiler.record(query, elapsed, max(rows, 0), params, plan)
+    
+    @property
+    def profiling(self) -> bool:
+        """True si el perfilador de consultas está activo"""
+        return self._profiler is not None
+    
+    def set_profiling(self, enabled: bool):
+        """
+        Activa o desactiva el perfilador de consultas de este gestor
+        
+        Al desactivarlo se descartan sus estadísticas.
+        
+        Args:
+            enabled (bool): Medir cada sentencia y registrar las lentas
+        """
+        if enabled and self._profiler is None:
+            self._profiler = QueryProfiler(
+                DATABASE_CONFIG.get("slow_query_ms", 100),
+                DATABASE_CONFIG.get("slow_query_log_size", 200)
+            )
+        elif not enabled:
+            self._profiler = None
+    
+    def profiler_stats(self) -> List[Dict]:
+        """
+        Obtiene las estadísticas por sentencia del perfilador
+        
+        Returns:
+            List[Dict]: Llamadas, tiempos, filas y plan, de mayor a menor tiempo total
+        """
+        return self._profiler.stats() if self._profiler is not None else []
+    
+    def slow_queries(self) -> List[Dict]:
+        """
+        Obtiene el registro de consultas lentas con su EXPLAIN QUERY PLAN
+        
+        Returns:
+            List[Dict]: Consultas lentas, la más reciente primero
+        """
+        return self._profiler.slow_queries() if self._profiler is not None else []
+    
+    def reset_profiler(self):
+        """Borra las estadísticas del perfilador"""
+        if self._profiler is not None:
+            self._profiler.reset()
+    
+    def _create_schema(self, conn: sqlite3.Connection):
+        """
+        Crea las tablas base y aplica las migraciones pendientes
+        
+        Args:
+            conn (sqlite3.Connection): Conexión del pool
+        """
+        cursor = conn.cursor()
+        
+        # Tabla de libros
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS books (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                title TEXT NOT NULL,
+                author TEXT NOT NULL,
+                isbn TEXT UNIQUE,
+                genre TEXT,
+                publisher TEXT,
+                publication_year INTEGER,
+                purchase_price REAL NOT NULL,
+                sale_price REAL NOT NULL,
+                stock_quantity INTEGER NOT NULL DEFAULT 0,
+                min_stock INTEGER DEFAULT 5,
+                condition TEXT DEFAULT 'Nuevo',
+                description TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        
+        # Tabla de ventas
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS sales (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                total_amount REAL NOT NULL,
+                payment_method TEXT DEFAULT 'Efectivo',
+                customer_name TEXT,
+                customer_phone TEXT,
+                discount REAL DEFAULT 0,
+                tax REAL DEFAULT 0,
+                sale_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                notes TEXT
+            )
+        ''')
+        
+        # Tabla de items de venta
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS sale_items (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                sale_id INTEGER NOT NULL,
+                book_id INTEGER NOT NULL,
+                quantity INTEGER NOT NULL,
+                unit_price REAL NOT NULL,
+                subtotal REAL NOT NULL,
+                FOREIGN KEY (sale_id) REFERENCES sales (id) ON DELETE CASCADE,
+                FOREIGN KEY (book_id) REFERENCES books (id)
+            )
+        ''')
+        
+        # Tabla de movimientos de inventario
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS inventory_movements (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                book_id INTEGER NOT NULL,
+                movement_type TEXT NOT NULL, -- 'IN', 'OUT', 'ADJUSTMENT'
+                quantity INTEGER NOT NULL,
+                reason TEXT,
+                reference_id INTEGER, -- ID de venta si aplica
+                movement_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (book_id) REFERENCES books (id)
+            )
+        ''')
+        
+        # Tabla de configuración del sistema
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS system_config (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                description TEXT,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        
+        # Insertar configuración inicial; los valores ya guardados se conservan
+        cursor.executemany(
+            "INSERT OR IGNORE INTO system_config (key, value, description) VALUES (?, ?, ?)",
+            [(key, _format_config_value(value), BUSINESS_CONFIG_DESCRIPTIONS.get(key))
+             for key, value in BUSINESS_CONFIG.items()]
+        )
+        
+        conn.commit()
+        logger.info("Esquema de base de datos creado exitosamente")
+        
+        # Aplicar migraciones pendientes (índices, columnas nuevas, etc.)
+        applied = apply_migrations(conn)
+        if applied:
+            logger.info(f"{applied} migración(es) de esquema aplicada(s)")
+    
+    def init_database(self):
+        """
+        Inicializa las tablas de la base de datos
+        
+        Si la versión de esquema guardada ya es la última no se ejecuta
+        ningún DDL; solo se lee lo que el gestor necesita del esquema.
+        """
+        with self.get_connection() as conn:
+            if get_schema_version(conn) < latest_version():
+                self._create_schema(conn)
             
-            conn.commit()
-            logger.info("Esquema de base de datos creado exitosamente")
+            self._has_fts = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'books_fts'"
+            ).fetchone() is not None
+            self._refresh_cache_dependencies(conn)
     
-    def execute_query(self, query: str, params: Tuple = ()) -> List[Dict]:
+    def execute_query(self, query: str, params: Tuple = (), analytics: bool = False) -> List[Dict]:
         """
         Ejecuta una consulta SELECT y retorna los resultados
         
+        Los resultados de SELECT se guardan en caché hasta que se escriba en
+        alguna de las tablas que leen. Las filas devueltas son compartidas
+        entre llamadas y no deben modificarse.
+        
         Args:
             query (str): Consulta SQL
             params (Tuple): Parámetros para la consulta
+            analytics (bool): Ejecutar en las conexiones de reportes, de solo lectura
             
         Returns:
             List[Dict]: Lista de diccionarios con los resultados
         """
+        if analytics:
+            # Antes de la caché, para que un acierto no retrase el refresco de la réplica
+            self._maybe_refresh_replica()
+        
+        cache_key = None
+        if self._cache is not None and is_cacheable(query):
+            self._check_external_writes()
+            cache_key = self._cache_key("rows", query, params, self._read_source(analytics))
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                return list(cached)
+            snapshot = self._cache.snapshot(read_tables(query))
+        
         try:
-            with self.get_connection() as conn:
+            started = time.perf_counter()
+            with self.get_connection(analytics) as conn:
                 cursor = conn.cursor()
                 cursor.execute(query, params)
                 columns = [desc[0] for desc in cursor.description]
-                return [dict(zip(columns, row)) for row in cursor.fetchall()]
+                rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+                self._profile(conn, query, params, started, len(rows))
+            
+            if cache_key is not None:
+                self._cache.put(cache_key, snapshot, rows)
+                return list(rows)
+            return rows
         except Exception as e:
             logger.error(f"Error ejecutando consulta: {e}")
             return []
     
+    def fetch_rows(self, query: str, params: Tuple = (), analytics: bool = False) -> List[sqlite3.Row]:
+        """
+        Ejecuta una consulta SELECT y retorna las filas tal como las entrega el cursor
+        
+        No arma un diccionario por fila ni usa la caché; está pensada para
+        pasar las filas a modelos en bloque (ver database.repositories).
+        
+        Args:
+            query (str): Consulta SQL
+            params (Tuple): Parámetros para la consulta
+            analytics (bool): Ejecutar en las conexiones de reportes, de solo lectura
+            
+        Returns:
+            List[sqlite3.Row]: Filas en el orden de las columnas del SELECT
+        """
+        try:
+            started = time.perf_counter()
+            with self.get_connection(analytics) as conn:
+                rows = conn.execute(query, params).fetchall()
+                self._profile(conn, query, params, started, len(rows))
+            return rows
+        except sqlite3.Error as e:
+            logger.error(f"Error ejecutando consulta: {e}")
+            raise
+    
+    def query_frame(self, query: str, params: Tuple = (), dtypes: Optional[Dict] = None,
+                    batch_size: int = 5000, analytics: bool = False):
+        """
+        Ejecuta una consulta SELECT y retorna un DataFrame con columnas tipadas
+        
+        Las columnas se arman directamente desde el cursor, lote por lote, sin
+        pasar por un diccionario por fila. Las columnas conocidas reciben su
+        tipo de FRAME_DTYPES (categorías, fechas, precios) y ``dtypes`` permite
+        agregar o reemplazar tipos. El resultado pasa por la caché de consultas;
+        se entrega una copia para que pueda modificarse libremente.
+        
+        Args:
+            query (str): Consulta SQL
+            params (Tuple): Parámetros para la consulta
+            dtypes (Dict): Tipos por columna adicionales
+            batch_size (int): Filas leídas del cursor en cada paso
+            analytics (bool): Ejecutar en las conexiones de reportes, de solo lectura
+            
+        Returns:
+            pd.DataFrame: Resultados (vacío si hubo un error)
+        """
+        import pandas as pd
+        from pandas.api.types import union_categoricals
+        
+        types = dict(FRAME_DTYPES, **(dtypes or {}))
+        
+        if analytics:
+            # Antes de la caché, para que un acierto no retrase el refresco de la réplica
+            self._maybe_refresh_replica()
+        
+        cache_key = None
+        if self._cache is not None and is_cacheable(query):
+            self._check_external_writes()
+            cache_key = self._cache_key("frame", query, params, tuple(sorted((dtypes or {}).items())),
+                                        self._read_source(analytics))
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                return cached.copy()
+            snapshot = self._cache.snapshot(read_tables(query))
+        
+        def typed_chunk(values, dtype):
+            if dtype == 'category':
+                return pd.Categorical(values)
+            if dtype is not None and str(dtype).startswith('datetime64'):
+                return pd.to_datetime(pd.Series(values, dtype=object),
+                                      errors='coerce', format='ISO8601').astype(dtype)
+            return pd.Series(values, dtype=dtype)
+        
+        try:
+            started = time.perf_counter()
+            with self.get_connection(analytics) as conn:
+                cursor = conn.cursor()
+                cursor.execute(query, params)
+                columns = [desc[0] for desc in cursor.description]
+                chunks = {column: [] for column in columns}
+                count = 0
+                
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    count += len(rows)
+                    for column, values in zip(columns, zip(*rows)):
+                        chunks[column].append(typed_chunk(values, types.get(column)))
+                
+                self._profile(conn, query, params, started, count)
+        except Exception as e:
+            logger.error(f"Error ejecutando consulta: {e}")
+            return pd.DataFrame()
+        
+        data = {}
+        for column in columns:
+            parts = chunks[column]
+            if not parts:
+                data[column] = typed_chunk((), types.get(column))
+            elif types.get(column) == 'category':
+                data[column] = union_categoricals(parts)
+            else:
+                data[column] = pd.concat(parts, ignore_index=True)
+        frame = pd.DataFrame(data, columns=columns)
+        
+        if cache_key is not None:
+            self._cache.put(cache_key, snapshot, frame)
+            return frame.copy()
+        return frame
+    
     def execute_update(self, query: str, params: Tuple = ()) -> int:
         """
         Ejecuta una consulta de actualización (INSERT, UPDATE, DELETE)
@@ -171,70 +832,740 @@ class DatabaseManager:
             int: ID del último registro insertado o número de filas afectadas
         """
         try:
-            with self.get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute(query, params)
-                conn.commit()
-                return cursor.lastrowid if cursor.lastrowid else cursor.rowcount
+            return self.submit_update(query, params).result()
         except Exception as e:
             logger.error(f"Error ejecutando actualización: {e}")
             return 0
     
-    def get_system_config(self, key: str) -> Optional[str]:
+    def submit_update(self, query: str, params: Tuple = ()) -> Future:
+        """
+        Envía una consulta de actualización sin esperar su resultado
+        
+        En modo escritor la escritura se encola y el llamador puede seguir;
+        fuera de ese modo se ejecuta de inmediato y el futuro ya viene resuelto.
+        
+        Args:
+            query (str): Consulta SQL
+            params (Tuple): Parámetros para la consulta
+            
+        Returns:
+            Future: ID del último registro insertado o número de filas afectadas
+        """
+        def run(conn: sqlite3.Connection) -> int:
+            started = time.perf_counter()
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            self._profile(conn, query, params, started, cursor.rowcount)
+            # lastrowid es el último INSERT de la conexión, aunque esta sentencia no lo sea
+            if cursor.lastrowid and query.lstrip().upper().startswith(("INSERT", "REPLACE")):
+                return cursor.lastrowid
+            return cursor.rowcount
+        
+        tables = None if is_schema_change(query) else written_tables(query)
+        return self._write_transaction(run, tables)
+    
+    def record_sale(self, sale: Sale) -> int:
+        """
+        Registra una venta completa en una sola transacción
+        
+        Inserta la venta, sus items y los movimientos de inventario, y
+        descuenta el stock con una actualización condicional que impide
+        vender más unidades de las disponibles. Si algo falla no queda
+        nada registrado.
+        
+        Args:
+            sale (Sale): Venta con sus items
+        
+        Returns:
+            int: ID de la venta registrada
+        
+        Raises:
+            ValueError: Si la venta está vacía, supera max_items_per_sale o
+                algún libro no tiene stock suficiente
+        """
+        sale.validate(self.get_system_config("max_items_per_sale"))
+        items = list(sale.items.values())
+        
+        # Los items ya vienen agrupados por libro
+        quantities = {item.book_id: item.quantity for item in items}
+        
+        def write(conn: sqlite3.Connection) -> int:
+            cursor = conn.cursor()
+            cursor.executemany('''
+                UPDATE books SET stock_quantity = stock_quantity - ?,
+                                 updated_at = CURRENT_TIMESTAMP
+                WHERE id = ? AND stock_quantity >= ?
+            ''', [(qty, book_id, qty) for book_id, qty in quantities.items()])
+            
+            if cursor.rowcount != len(quantities):
+                placeholders = ", ".join("?" * len(quantities))
+                cursor.execute(
+                    f"SELECT id, title, stock_quantity FROM books WHERE id IN ({placeholders})",
+                    tuple(quantities)
+                )
+                available = {row['id']: row for row in cursor.fetchall()}
+                missing = [
+                    f"{available[book_id]['title']} (disponible: {available[book_id]['stock_quantity']})"
+                    if book_id in available else f"libro #{book_id} (no existe)"
+                    for book_id, qty in quantities.items()
+                    if book_id not in available or available[book_id]['stock_quantity'] < qty
+                ]
+                raise ValueError("Stock insuficiente para: " + ", ".join(missing))
+            
+            cursor.execute('''
+                INSERT INTO sales (total_amount, payment_method, customer_name,
+                                   customer_phone, discount, tax, sale_date, notes)
+                VALUES (?, ?, ?, ?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP), ?)
+            ''', (
+                sale.total_amount, sale.payment_method, sale.customer_name,
+                sale.customer_phone, sale.discount, sale.tax, sale.sale_date,
+                sale.notes
+            ))
+            sale_id = cursor.lastrowid
+            
+            cursor.executemany('''
+                INSERT INTO sale_items (sale_id, book_id, quantity, unit_price, subtotal)
+                VALUES (?, ?, ?, ?, ?)
+            ''', [(sale_id, item.book_id, item.quantity, item.unit_price, item.subtotal)
+                  for item in items])
+            
+            cursor.executemany('''
+                INSERT INTO inventory_movements
+                (book_id, movement_type, quantity, reason, reference_id)
+                VALUES (?, 'OUT', ?, ?, ?)
+            ''', [(item.book_id, item.quantity, f'Venta #{sale_id}', sale_id)
+                  for item in items])
+            return sale_id
+        
+        started = time.perf_counter()
+        sale_id = self._write_transaction(
+            write, {'sales', 'sale_items', 'books', 'inventory_movements'}
+        ).result()
+        
+        if self._profiler is not None:
+            # La venta son varias sentencias; se mide la transacción completa
+            self._profiler.record("TRANSACTION record_sale", time.perf_counter() - started,
+                                  len(items), plan=[])
+        
+        sale.id = sale_id
+        logger.info(f"Venta #{sale_id} registrada con {len(items)} items")
+        self._roll_stock_checkpoints()
+        return sale_id
+    
+    def add_book(self, book: Book, initial_movement: bool = False) -> int:
+        """
+        Inserta un libro nuevo y espera el commit
+        
+        Con ``initial_movement`` el stock con que se crea queda también como
+        movimiento de entrada "Stock inicial", en la misma transacción: o se
+        guardan ambos o ninguno.
+        
+        Args:
+            book (Book): Libro validado; su id se ignora
+            initial_movement (bool): Registrar el stock inicial en inventory_movements
+        
+        Returns:
+            int: ID asignado, también guardado en book.id
+        
+        Raises:
+            sqlite3.Error: Si la inserción falla (p. ej. ISBN repetido)
+        """
+        values = book_values(book)
+        
+        def write(conn: sqlite3.Connection) -> int:
+            cursor = conn.cursor()
+            cursor.execute(
+                f"INSERT INTO books ({', '.join(BOOK_INSERT_FIELDS)}) "
+                f"VALUES ({', '.join('?' * len(BOOK_INSERT_FIELDS))})",
+                tuple(values[position] for position in _BOOK_INSERT_POSITIONS)
+            )
+            book_id = cursor.lastrowid
+            if initial_movement and book.stock_quantity > 0:
+                cursor.execute('''
+                    INSERT INTO inventory_movements (book_id, movement_type, quantity, reason)
+                    VALUES (?, 'IN', ?, ?)
+                ''', (book_id, book.stock_quantity, INITIAL_STOCK_REASON))
+            return book_id
+        
+        tables = {'books', 'inventory_movements'} if initial_movement else {'books'}
+        book.id = self._write_transaction(write, tables).result()
+        if initial_movement:
+            self._roll_stock_checkpoints()
+        return book.id
+    
+    def import_books_csv(self, source: Union[str, TextIO], chunk_size: int = 5000,
+                         replace_stock: bool = False,
+                         progress: Optional[Callable[[ImportResult], None]] = None) -> ImportResult:
+        """
+        Importa un catálogo de libros desde un CSV
+        
+        El archivo se lee por bloques de ``chunk_size`` filas; cada bloque se
+        valida con Book y se escribe en una sola transacción con executemany.
+        Los libros se identifican por ISBN: los existentes se actualizan y
+        los nuevos se insertan, con sus movimientos de inventario.
+        
+        Args:
+            source: Ruta del archivo o archivo de texto abierto
+            chunk_size (int): Filas por transacción
+            replace_stock (bool): Tomar el stock del archivo como stock final en
+                lugar de sumarlo al actual
+            progress (Callable): Se llama con el resultado acumulado tras cada bloque
+        
+        Returns:
+            ImportResult: Filas leídas, insertadas, actualizadas y errores
+        
+        Raises:
+            ValueError: Si al CSV le faltan columnas obligatorias
+        """
+        if isinstance(source, str):
+            with open(source, newline='', encoding='utf-8-sig') as handle:
+                return self.import_books_csv(handle, chunk_size, replace_stock, progress)
+        
+        result = ImportResult()
+        for books, errors in read_book_chunks(source, chunk_size):
+            if books:
+                inserted, updated = self._write_transaction(
+                    lambda conn: write_book_chunk(conn, books, replace_stock),
+                    {'books', 'inventory_movements'}
+                ).result()
+                result.inserted += inserted
+                result.updated += updated
+            result.rows += len(books) + len(errors)
+            result.errors.extend(errors)
+            if progress is not None:
+                progress(result)
+        
+        logger.info(
+            f"Catálogo importado: {result.inserted} nuevos, {result.updated} actualizados, "
+            f"{result.skipped} con errores"
+        )
+        if result.inserted or result.updated:
+            self._roll_stock_checkpoints()
+        return result
+    
+    def export_query(self, query: str, params: Tuple, target, fmt: str = "csv",
+                     chunk_size: int = 10000, analytics: bool = False) -> int:
+        """
+        Exporta el resultado de una consulta a CSV o Parquet
+        
+        Las filas se leen del cursor y se escriben por bloques, así el
+        tamaño de la exportación no depende de la memoria disponible.
+        
+        Args:
+            query (str): Consulta SELECT
+            params (Tuple): Parámetros para la consulta
+            target: Ruta o archivo binario de destino
+            fmt (str): "csv" o "parquet"
+            chunk_size (int): Filas por bloque
+            analytics (bool): Leer desde las conexiones de reportes, de solo lectura
+        
+        Returns:
+            int: Filas exportadas
+        """
+        started = time.perf_counter()
+        with self.get_connection(analytics) as conn:
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            rows = export_cursor(cursor, target, fmt, chunk_size)
+            self._profile(conn, query, params, started, rows)
+        
+        logger.info(f"Exportación {fmt} completada: {rows} filas")
+        return rows
+    
+    def export_dataset(self, dataset: str, target, fmt: str = "csv",
+                       start: Optional[date] = None, end: Optional[date] = None,
+                       chunk_size: int = 10000, analytics: bool = False) -> int:
+        """
+        Exporta ventas, detalle de ventas, movimientos o inventario
+        
+        Args:
+            dataset (str): "sales", "sale_items", "movements" o "inventory"
+            target: Ruta o archivo binario de destino
+            fmt (str): "csv" o "parquet"
+            start (date): Primer día incluido (sin límite si es None)
+            end (date): Último día incluido (hoy si es None)
+            chunk_size (int): Filas por bloque
+            analytics (bool): Leer desde las conexiones de reportes, de solo lectura
+        
+        Returns:
+            int: Filas exportadas
+        """
+        if dataset not in DATASETS:
+            raise ValueError(f"Conjunto de exportación desconocido: {dataset}")
+        return self.export_query(DATASETS[dataset]["query"], dataset_params(dataset, start, end),
+                                 target, fmt, chunk_size, analytics)
+    
+    def rebuild_daily_summary(self) -> int:
+        """
+        Recalcula daily_sales_summary desde las ventas, incluidas las archivadas
+        
+        Los triggers mantienen el resumen al día; esto solo hace falta si se
+        modificaron ventas con los triggers desactivados o por otro medio.
+        
+        Returns:
+            int: Número de filas (día, método de pago) del resumen
+        """
+        def rebuild(conn: sqlite3.Connection) -> int:
+            for statement in SUMMARY_REBUILD_SQL:
+                conn.execute(statement)
+            return conn.execute("SELECT COUNT(*) FROM daily_sales_summary").fetchone()[0]
+        
+        rows = self._write_transaction(rebuild, {'daily_sales_summary'}).result()
+        logger.info(f"Resumen diario reconstruido: {rows} filas")
+        return rows
+    
+    def create_stock_checkpoints(self) -> int:
+        """
+        Crea los puntos de control mensuales de stock que falten
+        
+        Cada punto guarda el stock de cada libro al inicio de un mes y se
+        calcula a partir del anterior más los movimientos del mes, así nunca
+        se recorre el historial completo. Si se registra un movimiento con
+        fecha pasada, un trigger borra los puntos posteriores y esta función
+        los vuelve a generar.
+        
+        Returns:
+            int: Número de meses calculados
+        """
+        def create(conn: sqlite3.Connection) -> int:
+            previous = conn.execute("SELECT MAX(checkpoint_day) FROM stock_checkpoints").fetchone()[0]
+            if previous is not None:
+                month = _next_month(day_from_key(previous))
+            else:
+                first = conn.execute(
+                    f"SELECT MIN(movement_date) FROM {ARCHIVE_VIEWS['inventory_movements']}"
+                ).fetchone()[0]
+                if first is None:
+                    return 0
+                month = _next_month(date.fromisoformat(first[:10]))
+            
+            months = 0
+            current = date.today().replace(day=1)
+            while month <= current:
+                since = day_from_key(previous).isoformat() if previous else ''
+                conn.execute(f'''
+                    INSERT OR REPLACE INTO stock_checkpoints (checkpoint_day, book_id, stock_quantity)
+                    SELECT ?, book_id, SUM(qty) FROM ({_LEDGER_SQL})
+                    GROUP BY book_id
+                    HAVING SUM(qty) != 0
+                ''', (day_key(month), previous or 0, since, month.isoformat()))
+                previous = day_key(month)
+                month = _next_month(month)
+                months += 1
+            return months
+        
+        months = self._write_transaction(create, {'stock_checkpoints'}).result()
+        if months:
+            logger.info(f"{months} punto(s) de control de stock creado(s)")
+        return months
+    
+    def _roll_stock_checkpoints(self):
+        """
+        Crea los puntos de control del mes en curso tras la primera escritura de movimientos del mes
+        
+        Se llama después del commit de ventas e ingresos de stock, nunca desde
+        los reportes, que solo leen. Un fallo no deshace la escritura que ya
+        se confirmó: se registra y se vuelve a intentar en la siguiente.
+        """
+        month = day_key(date.today().replace(day=1))
+        if self._checkpoint_month == month:
+            return
+        try:
+            self.create_stock_checkpoints()
+        except sqlite3.Error as e:
+            logger.warning(f"No se pudieron crear los puntos de control de stock: {e}")
+            return
+        self._checkpoint_month = month
+    
+    def inventory_as_of(self, as_of: date, analytics: bool = False) -> List[Dict]:
+        """
+        Obtiene el stock de cada libro al cierre de un día
+        
+        Parte del punto de control más cercano anterior a la fecha y aplica
+        solo los movimientos posteriores. El stock sale del historial de
+        movimientos; los precios son los actuales de cada libro. Solo lee:
+        si aún no existe el punto de control del mes, se aplican los
+        movimientos desde el anterior.
+        
+        Args:
+            as_of (date): Día cuyo cierre se consulta
+            analytics (bool): Leer en las conexiones de reportes, de solo lectura
+        
+        Returns:
+            List[Dict]: Libros con stock distinto de cero y su valor a costo y a precio de venta, en centavos
+        """
+        end = as_of + timedelta(days=1)
+        checkpoint = self.execute_query(
+            "SELECT MAX(checkpoint_day) AS day FROM stock_checkpoints WHERE checkpoint_day <= ?",
+            (day_key(end),), analytics
+        )[0]['day']
+        since = day_from_key(checkpoint).isoformat() if checkpoint else ''
+        
+        return self.execute_query(f'''
+            SELECT b.id AS book_id, b.title, b.author, b.genre,
+                   b.purchase_price, b.sale_price,
+                   SUM(l.qty) AS stock_quantity,
+                   SUM(l.qty) * b.purchase_price AS cost_value,
+                   SUM(l.qty) * b.sale_price AS retail_value
+            FROM ({_LEDGER_SQL}) l
+            JOIN books b ON b.id = l.book_id
+            GROUP BY b.id
+            HAVING SUM(l.qty) != 0
+            ORDER BY b.title
+        ''', (checkpoint or 0, since, end.isoformat()), analytics)
+    
+    def stock_valuation_by_month(self, since: date, analytics: bool = False) -> List[Dict]:
+        """
+        Obtiene el valor del inventario al cierre de cada mes
+        
+        Sale directamente de los puntos de control, sin recorrer movimientos.
+        Los puntos se crean con la primera venta o ingreso de cada mes (o con
+        scripts/create_stock_checkpoints.py); un mes sin movimientos todavía
+        no aparece.
+        
+        Args:
+            since (date): Primer mes a incluir
+            analytics (bool): Leer en las conexiones de reportes, de solo lectura
+        
+        Returns:
+            List[Dict]: Fecha de cierre, unidades y valor a costo y a precio de venta por mes, en centavos
+        """
+        # El punto del día 1 de un mes es el cierre del mes anterior
+        return self.execute_query('''
+            SELECT date(printf('%04d-%02d-%02d', c.checkpoint_day / 10000,
+                               c.checkpoint_day / 100 % 100, c.checkpoint_day % 100),
+                        '-1 day') AS closing_date,
+                   SUM(c.stock_quantity) AS units,
+                   SUM(c.stock_quantity * b.purchase_price) AS cost_value,
+                   SUM(c.stock_quantity * b.sale_price) AS retail_value
+            FROM stock_checkpoints c
+            JOIN books b ON b.id = c.book_id
+            WHERE c.checkpoint_day > ?
+            GROUP BY c.checkpoint_day
+            ORDER BY c.checkpoint_day
+        ''', (day_key(since.replace(day=1)),), analytics)
+    
+    def get_book_catalog(self, analytics: bool = False) -> BookCatalog:
+        """
+        Carga todos los libros en un BookCatalog guardado por columnas
+        
+        Las filas pasan del cursor a las columnas sin crear un diccionario ni
+        un Book por libro. El catálogo queda en caché hasta que se escriba en
+        books y es compartido entre llamadas: no debe modificarse.
+        
+        Args:
+            analytics (bool): Leer en las conexiones de reportes, de solo lectura
+        
+        Returns:
+            BookCatalog: Catálogo completo, ordenado por ID
+        """
+        query = f"SELECT {', '.join(BOOK_FIELDS)} FROM books ORDER BY id"
+        
+        cache_key = None
+        if self._cache is not None:
+            self._check_external_writes()
+            cache_key = self._cache_key("catalog", query, (), self._read_source(analytics))
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                return cached
+            snapshot = self._cache.snapshot(read_tables(query))
+        
+        started = time.perf_counter()
+        with self.get_connection(analytics) as conn:
+            catalog = BookCatalog.from_rows(conn.execute(query))
+            self._profile(conn, query, (), started, len(catalog))
+        
+        if cache_key is not None:
+            self._cache.put(cache_key, snapshot, catalog)
+        return catalog
+    
+    @staticmethod
+    def _build_fts_query(text: str) -> str:
+        """
+        Convierte el texto escrito por el usuario en una consulta FTS5
+        
+        Cada palabra se busca por prefijo y todas deben aparecer. Un texto
+        formado solo por dígitos y guiones se trata como ISBN.
+        
+        Args:
+            text (str): Texto de búsqueda
+            
+        Returns:
+            str: Expresión MATCH (vacía si no hay términos)
+        """
+        if re.fullmatch(r"[\d\s-]+[xX]?", text.strip()):
+            terms = [re.sub(r"[\s-]", "", text.strip())]
+        else:
+            terms = re.findall(r"\w+", text)
+        return " ".join(f'"{term}"*' for term in terms if term)
+    
+    def search_books(self, query: str, limit: int = 50,
+                     in_stock_only: bool = False) -> List[Dict]:
+        """
+        Busca libros por título, autor o ISBN ordenados por relevancia
+        
+        Usa el índice FTS5 con coincidencia por prefijo e ignorando acentos.
+        Si FTS5 no está disponible recurre a una búsqueda con LIKE.
+        
+        Args:
+            query (str): Texto de búsqueda
+            limit (int): Número máximo de resultados
+            in_stock_only (bool): Excluir libros sin stock
+            
+        Returns:
+            List[Dict]: Libros encontrados, los más relevantes primero
+        """
+        stock_filter = "AND b.stock_quantity > 0" if in_stock_only else ""
+        
+        if not self._has_fts:
+            pattern = f"%{query}%"
+            return self.execute_query(f'''
+                SELECT b.* FROM books b
+                WHERE (b.title LIKE ? OR b.author LIKE ? OR b.isbn LIKE ?)
+                {stock_filter}
+                ORDER BY b.title
+                LIMIT ?
+            ''', (pattern, pattern, pattern, limit))
+        
+        match = self._build_fts_query(query)
+        if not match:
+            return []
+        
+        # bm25: una coincidencia en el título pesa más que en el autor o ISBN
+        return self.execute_query(f'''
+            SELECT b.* FROM books_fts
+            JOIN books b ON b.id = books_fts.rowid
+            WHERE books_fts MATCH ?
+            {stock_filter}
+            ORDER BY bm25(books_fts, 10.0, 5.0, 1.0)
+            LIMIT ?
+        ''', (match, limit))
+    
+    def _read_config_version(self) -> int:
+        """Lee el contador de system_config, que solo cambia cuando se escribe la configuración"""
+        with self._monitor_lock:
+            return self._monitor.execute(
+                "SELECT version FROM system_config_version WHERE id = 1"
+            ).fetchone()[0]
+    
+    def _load_system_config(self) -> Dict[str, Any]:
+        """Lee toda la tabla system_config y convierte cada valor al tipo de su default"""
+        with self.get_connection() as conn:
+            # Contador y filas en la misma lectura, para no perder un cambio entre ambos
+            conn.execute("BEGIN")
+            try:
+                version = conn.execute(
+                    "SELECT version FROM system_config_version WHERE id = 1"
+                ).fetchone()[0]
+                rows = conn.execute("SELECT key, value FROM system_config").fetchall()
+            finally:
+                conn.rollback()
+        
+        config = dict(BUSINESS_CONFIG)
+        for key, value in rows:
+            config[key] = _parse_config_value(key, value)
+        self._config, self._config_version = config, version
+        return config
+    
+    def system_config(self) -> Dict[str, Any]:
+        """
+        Retorna la configuración del sistema desde memoria
+        
+        La tabla se lee una sola vez; después solo se revisa el contador de
+        system_config_version cada ``system_config_check_interval`` segundos
+        y se vuelve a leer si alguien cambió la configuración. Las demás
+        escrituras (ventas, inventario) no provocan una recarga.
+        
+        Returns:
+            Dict[str, Any]: Configuración con sus tipos (no modificar)
+        """
+        config = self._config
+        now = time.monotonic()
+        if config is not None and now - self._config_checked < self._config_interval:
+            return config
+        
+        with self._config_lock:
+            if self._config is None or self._read_config_version() != self._config_version:
+                self._load_system_config()
+            self._config_checked = now
+            return self._config
+    
+    def get_system_config(self, key: str, default: Any = None) -> Any:
         """
         Obtiene un valor de configuración del sistema
         
         Args:
             key (str): Clave de configuración
+            default: Valor si la clave no existe
             
         Returns:
-            Optional[str]: Valor de la configuración o None si no existe
+            Any: Valor convertido al tipo de BUSINESS_CONFIG (texto si la clave no está ahí)
         """
-        result = self.execute_query(
-            "SELECT value FROM system_config WHERE key = ?", 
-            (key,)
-        )
-        return result[0]['value'] if result else None
+        return self.system_config().get(key, default)
     
-    def set_system_config(self, key: str, value: str, description: str = None):
+    def set_system_config(self, key: str, value: Any, description: str = None):
         """
         Establece un valor de configuración del sistema
         
+        Espera el commit y solo entonces actualiza la copia en memoria, junto
+        con el contador leído en la misma transacción para que la escritura
+        propia no provoque una recarga.
+        
         Args:
             key (str): Clave de configuración
-            value (str): Valor a establecer
+            value: Valor a establecer
             description (str): Descripción opcional
+        
+        Raises:
+            sqlite3.Error: Si la escritura falla; la copia en memoria no cambia
         """
-        self.execute_update(
-            """INSERT OR REPLACE INTO system_config (key, value, description, updated_at) 
-               VALUES (?, ?, ?, CURRENT_TIMESTAMP)""",
-            (key, value, description)
-        )
+        text = _format_config_value(value)
+        
+        def write(conn: sqlite3.Connection) -> int:
+            conn.execute(
+                """INSERT OR REPLACE INTO system_config (key, value, description, updated_at) 
+                   VALUES (?, ?, ?, CURRENT_TIMESTAMP)""",
+                (key, text, description or BUSINESS_CONFIG_DESCRIPTIONS.get(key))
+            )
+            return conn.execute(
+                "SELECT version FROM system_config_version WHERE id = 1"
+            ).fetchone()[0]
+        
+        version = self._write_transaction(write, {'system_config'}).result()
+        
+        with self._config_lock:
+            if self._config is not None:
+                # Copia nueva: quien ya tiene la anterior la sigue leyendo sin bloqueo
+                self._config = {**self._config, key: _parse_config_value(key, text)}
+                # Si otra escritura pasó entre medio, el contador no coincide y se recarga
+                if self._config_version is not None and version == self._config_version + 1:
+                    self._config_version = version
     
-    def backup_database(self, backup_path: str = None) -> str:
+    def backup_database(self, backup_path: str = None, compression: Optional[str] = None) -> str:
         """
-        Crea una copia de seguridad de la base de datos
+        Crea una copia de seguridad en línea de la base de datos
+        
+        Usa la API de backup de SQLite por pasos, así las ventas pueden
+        seguir registrándose mientras se copia.
         
         Args:
             backup_path (str): Ruta donde guardar el backup
+            compression (str): None, "gzip" o "zstd"; por defecto el de BACKUP_CONFIG
             
         Returns:
             str: Ruta del archivo de backup creado
         """
         if not backup_path:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            backup_path = f"backups/bookstore_backup_{timestamp}.db"
+            backup_path = str(Path(BACKUP_CONFIG['directory']) / backup.backup_filename())
         
-        # Crear directorio de backups si no existe
-        Path(backup_path).parent.mkdir(parents=True, exist_ok=True)
-        
-        # Copiar la base de datos
-        import shutil
-        shutil.copy2(self.db_path, backup_path)
+        backup_path = backup.create_backup(
+            self.db_path,
+            backup_path,
+            pages_per_step=BACKUP_CONFIG['pages_per_step'],
+            step_sleep=BACKUP_CONFIG['step_sleep'],
+            compression=compression or BACKUP_CONFIG['compression'],
+            verify=BACKUP_CONFIG['verify']
+        )
         
         logger.info(f"Backup creado en: {backup_path}")
         return backup_path
     
+    def scheduled_backup(self, force: bool = False, compression: Optional[str] = None) -> Optional[str]:
+        """
+        Crea el backup del día si aún no existe y rota los antiguos
+        
+        Pensado para llamarse al cierre de caja o desde cron.
+        
+        Args:
+            force (bool): Crear el backup aunque ya exista uno de hoy
+            compression (str): None, "gzip" o "zstd"; por defecto el de BACKUP_CONFIG
+        
+        Returns:
+            Optional[str]: Ruta del backup creado, o None si ya había uno hoy
+        """
+        directory = BACKUP_CONFIG['directory']
+        existing = backup.list_backups(directory)
+        
+        created = None
+        if force or not existing or backup.backup_time(existing[0]).date() != date.today():
+            created = self.backup_database(compression=compression)
+        
+        backup.rotate_backups(
+            directory,
+            keep_daily=BACKUP_CONFIG['keep_daily'],
+            keep_weekly=BACKUP_CONFIG['keep_weekly']
+        )
+        return created
+    
+    def archivable_years(self) -> List[int]:
+        """
+        Obtiene los años cerrados que aún tienen ventas o movimientos en la base activa
+        
+        Returns:
+            List[int]: Años anteriores al actual, del más antiguo al más reciente
+        """
+        first_day = day_key(date.today().replace(month=1, day=1))
+        rows = self.execute_query('''
+            SELECT sale_day / 10000 AS year FROM sales WHERE sale_day < ?
+            UNION
+            SELECT CAST(substr(movement_date, 1, 4) AS INTEGER) FROM inventory_movements
+            WHERE movement_date < ?
+            ORDER BY year
+        ''', (first_day, day_from_key(first_day).isoformat()))
+        return [row['year'] for row in rows]
+    
+    def archived_years(self) -> List[Dict]:
+        """
+        Lista los archivos por año existentes
+        
+        Returns:
+            List[Dict]: Año, ruta y tamaño en bytes de cada archivo
+        """
+        return [
+            {'year': year, 'path': str(path), 'size': path.stat().st_size}
+            for year, path in archive.list_archives(self.archive_dir).items()
+        ]
+    
+    def archive_year(self, year: int, vacuum: bool = False) -> Dict[str, int]:
+        """
+        Mueve las ventas y movimientos de un año cerrado a archive_YYYY.db
+        
+        Las vistas all_sales, all_sale_items y all_inventory_movements siguen
+        mostrando el historial completo; las ventas del día a día y el
+        dashboard solo leen la base activa. Los archivos no cambian después
+        de creados, así que no hace falta incluirlos en cada backup.
+        
+        Args:
+            year (int): Año a archivar (anterior al actual)
+            vacuum (bool): Compactar la base activa después (bloquea la escritura mientras dura)
+        
+        Returns:
+            Dict[str, int]: Filas movidas por tabla
+        
+        Raises:
+            ValueError: Si el año no está cerrado
+        """
+        if year >= date.today().year:
+            raise ValueError(f"Solo se pueden archivar años cerrados; {year} sigue en curso")
+        
+        # El punto de control del 1 de enero siguiente evita leer el archivo al consultar el stock
+        self.create_stock_checkpoints()
+        
+        conn = self._pool.connect()
+        try:
+            moved = archive.archive_year(conn, year, archive.archive_path(self.archive_dir, year))
+            if vacuum:
+                conn.execute("VACUUM main")
+        finally:
+            conn.close()
+        
+        # Las conexiones abiertas no tienen el archivo nuevo en sus vistas
+        self._pool.recycle()
+        if self._writer is not None:
+            self._writer.reconnect()
+        self._after_schema_change()
+        return moved
+    
     def get_database_info(self) -> Dict:
         """
         Obtiene información sobre la base de datos
@@ -257,5 +1588,40 @@ class DatabaseManager:
         
         return info
 
-# Instancia global del gestor de base de datos
-db_manager = DatabaseManager()
+# Un gestor por tienda, creado al primer uso
+_db_managers: Dict[str, DatabaseManager] = {}
+_db_manager_lock = threading.Lock()
+
+def get_db(store: Optional[str] = None) -> DatabaseManager:
+    """
+    Obtiene el gestor de base de datos de una tienda, creándolo si hace falta
+    
+    Importar este módulo no abre conexiones ni toca el esquema; eso ocurre
+    una sola vez por tienda, en la primera llamada.
+    
+    Args:
+        store (str): Clave de la tienda en STORES (None = DEFAULT_STORE)
+    
+    Returns:
+        DatabaseManager: Gestor compartido por todo el proceso
+    
+    Raises:
+        KeyError: Si la tienda no está configurada
+    """
+    store = store or DEFAULT_STORE
+    manager = _db_managers.get(store)
+    if manager is None:
+        with _db_manager_lock:
+            manager = _db_managers.get(store)
+            if manager is None:
+                if store not in STORES:
+                    raise KeyError(f"Tienda no configurada: {store}")
+                manager = DatabaseManager(str(STORES[store]["path"]), store=store)
+                _db_managers[store] = manager
+    return manager
+
+def __getattr__(name: str):
+    """Mantiene ``from database.db_manager import db_manager`` funcionando"""
+    if name == "db_manager":
+        return get_db()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,224 @@
+"""
+Exportación de ventas, movimientos e inventario a CSV o Parquet
+Escribe directamente desde el cursor por bloques, sin armar el archivo completo en memoria
+"""
+
+import csv
+import io
+import sqlite3
+from datetime import date, timedelta
+from pathlib import Path
+from typing import BinaryIO, Dict, Optional, Tuple, Union
+
+EXPORT_FORMATS = ("csv", "parquet")
+
+# Importe guardado en centavos, exportado en pesos
+PESOS_SQL = "{column} / 100.0 AS {alias}"
+
+def _pesos(column: str) -> str:
+    """Columna de dinero convertida a pesos con su nombre original"""
+    return PESOS_SQL.format(column=column, alias=column.split(".")[-1])
+
+# Consultas de cada conjunto exportable; las que tienen rango de fechas reciben (desde, hasta).
+# Las vistas all_* incluyen los años archivados. Los importes salen en pesos
+DATASETS: Dict[str, Dict] = {
+    "sales": {
+        "label": "Ventas",
+        "query": f'''
+            SELECT id, sale_date, {_pesos("total_amount")}, payment_method, customer_name,
+                   customer_phone, {_pesos("discount")}, tax, notes
+            FROM all_sales
+            WHERE sale_day >= ? AND sale_day < ?
+            ORDER BY id
+        ''',
+        "range": "day"
+    },
+    "sale_items": {
+        "label": "Detalle de Ventas",
+        "query": f'''
+            SELECT si.id, si.sale_id, s.sale_date, si.book_id, b.isbn, b.title,
+                   si.quantity, {_pesos("si.unit_price")}, {_pesos("si.subtotal")}
+            FROM all_sale_items si
+            JOIN all_sales s ON s.id = si.sale_id
+            LEFT JOIN books b ON b.id = si.book_id
+            WHERE s.sale_day >= ? AND s.sale_day < ?
+            ORDER BY si.id
+        ''',
+        "range": "day"
+    },
+    "movements": {
+        "label": "Movimientos de Inventario",
+        "query": '''
+            SELECT m.id, m.movement_date, m.book_id, b.isbn, b.title,
+                   m.movement_type, m.quantity, m.reason, m.reference_id
+            FROM all_inventory_movements m
+            LEFT JOIN books b ON b.id = m.book_id
+            WHERE m.movement_date >= ? AND m.movement_date < ?
+            ORDER BY m.movement_date, m.id
+        ''',
+        "range": "timestamp"
+    },
+    "inventory": {
+        "label": "Inventario",
+        "query": f'''
+            SELECT id, isbn, title, author, genre, publisher, publication_year,
+                   {_pesos("purchase_price")}, {_pesos("sale_price")}, stock_quantity, min_stock, condition
+            FROM books
+            ORDER BY title
+        ''',
+        "range": None
+    }
+}
+
+# Tipos Parquet de columnas que pueden venir vacías en todo un bloque
+PARQUET_TYPES = {
+    "publication_year": "int64",
+    "reference_id": "int64",
+    "book_id": "int64",
+    "total_amount": "float64",
+    "discount": "float64",
+    "tax": "float64",
+    "purchase_price": "float64",
+    "sale_price": "float64",
+    "unit_price": "float64",
+    "subtotal": "float64"
+}
+
+def dataset_params(dataset: str, start: Optional[date], end: Optional[date]) -> Tuple:
+    """
+    Construye los parámetros del rango de fechas de un conjunto
+
+    Args:
+        dataset (str): Nombre del conjunto (clave de DATASETS)
+        start (date): Primer día incluido (None = desde el inicio)
+        end (date): Último día incluido (None = hasta hoy)
+
+    Returns:
+        Tuple: Parámetros para la consulta del conjunto
+    """
+    kind = DATASETS[dataset]["range"]
+    if kind is None:
+        return ()
+
+    start = start or date(1900, 1, 1)
+    end = (end or date.today()) + timedelta(days=1)
+    if kind == "day":
+        # Misma clave YYYYMMDD que la columna sale_day
+        return int(start.strftime("%Y%m%d")), int(end.strftime("%Y%m%d"))
+    return start.isoformat(), end.isoformat()
+
+def _open_target(target: Union[str, Path, BinaryIO]) -> Tuple[BinaryIO, bool]:
+    """Abre el destino si es una ruta; retorna el archivo y si hay que cerrarlo"""
+    if isinstance(target, (str, Path)):
+        Path(target).parent.mkdir(parents=True, exist_ok=True)
+        return open(target, "wb"), True
+    return target, False
+
+def write_csv(cursor: sqlite3.Cursor, target: BinaryIO, chunk_size: int = 10000) -> int:
+    """
+    Escribe el resultado de un cursor como CSV (UTF-8) por bloques
+
+    Args:
+        cursor (sqlite3.Cursor): Cursor con la consulta ya ejecutada
+        target (BinaryIO): Archivo binario de destino
+        chunk_size (int): Filas leídas del cursor en cada paso
+
+    Returns:
+        int: Filas escritas
+    """
+    text = io.TextIOWrapper(target, encoding="utf-8", newline="")
+    writer = csv.writer(text)
+    writer.writerow([desc[0] for desc in cursor.description])
+
+    total = 0
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            break
+        writer.writerows(rows)
+        total += len(rows)
+
+    # Devolver el archivo sin cerrarlo para que el llamador lo siga usando
+    text.flush()
+    text.detach()
+    return total
+
+def write_parquet(cursor: sqlite3.Cursor, target: BinaryIO, chunk_size: int = 10000) -> int:
+    """
+    Escribe el resultado de un cursor como Parquet, un grupo de filas por bloque
+
+    Args:
+        cursor (sqlite3.Cursor): Cursor con la consulta ya ejecutada
+        target (BinaryIO): Archivo binario de destino
+        chunk_size (int): Filas leídas del cursor en cada paso
+
+    Returns:
+        int: Filas escritas
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("La exportación a Parquet requiere el paquete 'pyarrow'")
+
+    columns = [desc[0] for desc in cursor.description]
+    rows = cursor.fetchmany(chunk_size)
+
+    def to_columns(batch):
+        return {column: list(values) for column, values in zip(columns, zip(*batch))} if batch \
+            else {column: [] for column in columns}
+
+    # El primer bloque fija el esquema; las columnas vacías toman un tipo conocido
+    fields = []
+    for column, values in to_columns(rows).items():
+        inferred = pa.array(values).type
+        if pa.types.is_null(inferred):
+            inferred = pa.type_for_alias(PARQUET_TYPES.get(column, "string"))
+        fields.append(pa.field(column, inferred))
+    schema = pa.schema(fields)
+
+    total = 0
+    writer = pq.ParquetWriter(target, schema)
+    try:
+        while rows:
+            writer.write_table(pa.Table.from_pydict(to_columns(rows), schema=schema))
+            total += len(rows)
+            rows = cursor.fetchmany(chunk_size)
+    finally:
+        writer.close()
+    return total
+
+def export_cursor(cursor: sqlite3.Cursor, target: Union[str, Path, BinaryIO],
+                  fmt: str = "csv", chunk_size: int = 10000) -> int:
+    """
+    Escribe el resultado de un cursor en el formato indicado
+
+    Args:
+        cursor (sqlite3.Cursor): Cursor con la consulta ya ejecutada
+        target: Ruta o archivo binario de destino
+        fmt (str): "csv" o "parquet"
+        chunk_size (int): Filas leídas del cursor en cada paso
+
+    Returns:
+        int: Filas escritas
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Formato de exportación no soportado: {fmt}")
+
+    output, owned = _open_target(target)
+    try:
+        if fmt == "csv":
+            return write_csv(cursor, output, chunk_size)
+        return write_parquet(cursor, output, chunk_size)
+    finally:
+        if owned:
+            output.close()
+
+def export_filename(dataset: str, fmt: str, start: Optional[date] = None,
+                    end: Optional[date] = None) -> str:
+    """Nombre de archivo sugerido para una exportación"""
+    if DATASETS[dataset]["range"] is None:
+        return f"{dataset}_{date.today().strftime('%Y%m%d')}.{fmt}"
+    start_text = start.strftime('%Y%m%d') if start else "inicio"
+    end_text = (end or date.today()).strftime('%Y%m%d')
+    return f"{dataset}_{start_text}_{end_text}.{fmt}"
@@ -0,0 +1,161 @@
+"""
+Reportes consolidados de todas las tiendas
+Ejecuta la misma consulta en la base de cada tienda en paralelo y combina los resultados parciales
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from src.config import FEDERATION_WORKERS, STORES
+from database.db_manager import DatabaseManager, get_db
+
+# Columna que identifica la tienda de cada fila en un DataFrame consolidado
+STORE_COLUMN = "store"
+
+def run_on_stores(fn: Callable[[DatabaseManager], Any],
+                  stores: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    """
+    Ejecuta una función con el gestor de cada tienda, en hilos paralelos
+
+    SQLite libera el GIL mientras ejecuta una consulta, así que las tiendas
+    se consultan a la vez y el tiempo total crece con la tienda más lenta,
+    no con la suma de todas.
+
+    Args:
+        fn (Callable): Recibe el DatabaseManager de una tienda
+        stores (Iterable[str]): Claves de STORES (None = todas)
+
+    Returns:
+        Dict[str, Any]: Resultado de fn por tienda, en el orden de ``stores``
+    """
+    stores = list(stores or STORES)
+    if len(stores) == 1:
+        return {stores[0]: fn(get_db(stores[0]))}
+
+    workers = min(len(stores), FEDERATION_WORKERS)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="federation") as executor:
+        futures = {store: executor.submit(lambda store=store: fn(get_db(store))) for store in stores}
+        return {store: future.result() for store, future in futures.items()}
+
+def federated_rows(query: str, params: Tuple = (), stores: Optional[Iterable[str]] = None,
+                   analytics: bool = True) -> Dict[str, List[Dict]]:
+    """
+    Ejecuta una consulta en todas las tiendas
+
+    Args:
+        query (str): Consulta SQL
+        params (Tuple): Parámetros para la consulta
+        stores (Iterable[str]): Claves de STORES (None = todas)
+        analytics (bool): Usar las conexiones de reportes de cada tienda
+
+    Returns:
+        Dict[str, List[Dict]]: Filas de cada tienda
+    """
+    return run_on_stores(lambda db: db.execute_query(query, params, analytics=analytics), stores)
+
+def federated_totals(query: str, params: Tuple = (), stores: Optional[Iterable[str]] = None,
+                     analytics: bool = True) -> Dict:
+    """
+    Suma columna por columna la única fila de una consulta de totales
+
+    Solo sirve para columnas que se pueden sumar entre tiendas (SUM, COUNT);
+    los promedios deben calcularse después a partir de los totales.
+
+    Args:
+        query (str): Consulta que retorna una fila de totales
+        params (Tuple): Parámetros para la consulta
+        stores (Iterable[str]): Claves de STORES (None = todas)
+        analytics (bool): Usar las conexiones de reportes de cada tienda
+
+    Returns:
+        Dict: Totales de todas las tiendas
+    """
+    totals: Dict = {}
+    for rows in federated_rows(query, params, stores, analytics).values():
+        for column, value in (rows[0] if rows else {}).items():
+            totals[column] = totals.get(column, 0) + (value or 0)
+    return totals
+
+def federated_frame(query: str, params: Tuple = (), stores: Optional[Iterable[str]] = None,
+                    dtypes: Optional[Dict] = None, analytics: bool = True):
+    """
+    Ejecuta una consulta en todas las tiendas y une los resultados
+
+    Args:
+        query (str): Consulta SQL
+        params (Tuple): Parámetros para la consulta
+        stores (Iterable[str]): Claves de STORES (None = todas)
+        dtypes (Dict): Tipos por columna adicionales, como en query_frame()
+        analytics (bool): Usar las conexiones de reportes de cada tienda
+
+    Returns:
+        pd.DataFrame: Filas de todas las tiendas con la columna ``store``
+    """
+    import pandas as pd
+
+    frames = run_on_stores(
+        lambda db: db.query_frame(query, params, dtypes=dtypes, analytics=analytics), stores
+    )
+    parts = [frame.assign(**{STORE_COLUMN: store}) for store, frame in frames.items() if not frame.empty]
+    if not parts:
+        return next(iter(frames.values()), pd.DataFrame())
+    return pd.concat(parts, ignore_index=True)
+
+def merge_partials(frame, by: Sequence[str], sums: Sequence[str] = (), first: Sequence[str] = (),
+                   sort_by: Optional[str] = None, ascending: bool = False,
+                   limit: Optional[int] = None):
+    """
+    Combina los resultados parciales de cada tienda
+
+    Agrupa por ``by`` (por ejemplo título y autor, ya que los IDs de cada
+    base son independientes), suma las columnas de ``sums`` y conserva el
+    primer valor de ``first``. Las columnas quedan en el mismo orden que en
+    la consulta original.
+
+    Args:
+        frame (pd.DataFrame): Resultado de federated_frame()
+        by (Sequence[str]): Columnas que identifican una fila entre tiendas
+        sums (Sequence[str]): Columnas aditivas
+        first (Sequence[str]): Columnas descriptivas (precio, etc.)
+        sort_by (str): Columna de orden del resultado
+        ascending (bool): Orden ascendente
+        limit (int): Filas a conservar después de ordenar
+
+    Returns:
+        pd.DataFrame: Resultado consolidado, sin la columna ``store``
+    """
+    if frame.empty:
+        return frame.drop(columns=[STORE_COLUMN], errors="ignore")
+
+    aggregations = {column: "sum" for column in sums}
+    aggregations.update({column: "first" for column in first})
+    merged = frame.groupby(list(by), as_index=False, dropna=False, observed=True, sort=False).agg(aggregations)
+    merged = merged[[column for column in frame.columns if column in merged.columns]]
+
+    if sort_by:
+        merged = merged.sort_values(sort_by, ascending=ascending)
+    if limit:
+        merged = merged.head(limit)
+    return merged.reset_index(drop=True)
+
+def merge_rows(rows_by_store: Dict[str, List[Dict]], by: Sequence[str], sums: Sequence[str] = (),
+               first: Sequence[str] = (), sort_by: Optional[str] = None,
+               ascending: bool = False) -> List[Dict]:
+    """
+    Combina listas de filas por tienda, como las de run_on_stores()
+
+    Args:
+        rows_by_store (Dict[str, List[Dict]]): Filas de cada tienda
+        by, sums, first, sort_by, ascending: Como en merge_partials()
+
+    Returns:
+        List[Dict]: Filas consolidadas
+    """
+    import pandas as pd
+
+    frame = pd.DataFrame([
+        dict(row, **{STORE_COLUMN: store}) for store, rows in rows_by_store.items() for row in rows
+    ])
+    if frame.empty:
+        return []
+    return merge_partials(frame, by, sums, first, sort_by, ascending).to_dict('records')
@@ -1,3 +1,7 @@
 """
 Migraciones de base de datos
 """
+
+from .runner import apply_migrations, get_schema_version, latest_version
+
+__all__ = ['apply_migrations', 'get_schema_version', 'latest_version']
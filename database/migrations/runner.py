@@ -0,0 +1,97 @@
+"""
+Ejecutor de migraciones versionadas del esquema
+Aplica en orden las migraciones pendientes y guarda la versión en system_config
+"""
+
+import importlib
+import pkgutil
+import re
+import sqlite3
+from types import ModuleType
+from typing import List
+import logging
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION_KEY = "schema_version"
+
+# Los módulos de migración se llaman vNNN_descripcion.py
+_MIGRATION_NAME = re.compile(r"^v(\d+)_\w+$")
+
+def load_migrations() -> List[ModuleType]:
+    """
+    Carga los módulos de migración del paquete ordenados por versión
+    
+    Returns:
+        List[ModuleType]: Módulos con VERSION, DESCRIPTION y upgrade(conn)
+    """
+    from database import migrations as package
+    
+    modules = []
+    for info in pkgutil.iter_modules(package.__path__):
+        if _MIGRATION_NAME.match(info.name):
+            modules.append(importlib.import_module(f"{package.__name__}.{info.name}"))
+    
+    modules.sort(key=lambda module: module.VERSION)
+    return modules
+
+def latest_version() -> int:
+    """Retorna la versión de la migración más reciente disponible"""
+    migrations = load_migrations()
+    return migrations[-1].VERSION if migrations else 0
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    """
+    Obtiene la versión de esquema guardada en la base de datos
+    
+    Args:
+        conn (sqlite3.Connection): Conexión a la base de datos
+        
+    Returns:
+        int: Versión aplicada (0 si nunca se migró)
+    """
+    try:
+        row = conn.execute(
+            "SELECT value FROM system_config WHERE key = ?",
+            (SCHEMA_VERSION_KEY,)
+        ).fetchone()
+    except sqlite3.OperationalError:
+        # La tabla system_config aún no existe
+        return 0
+    return int(row[0]) if row else 0
+
+def apply_migrations(conn: sqlite3.Connection) -> int:
+    """
+    Aplica las migraciones pendientes, cada una en su propia transacción
+    
+    Args:
+        conn (sqlite3.Connection): Conexión a la base de datos
+        
+    Returns:
+        int: Número de migraciones aplicadas
+    """
+    current = get_schema_version(conn)
+    applied = 0
+    
+    for migration in load_migrations():
+        if migration.VERSION <= current:
+            continue
+        
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            migration.upgrade(conn)
+            conn.execute(
+                """INSERT OR REPLACE INTO system_config (key, value, description, updated_at)
+                   VALUES (?, ?, ?, CURRENT_TIMESTAMP)""",
+                (SCHEMA_VERSION_KEY, str(migration.VERSION), "Versión del esquema de base de datos")
+            )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            logger.error(f"Error aplicando migración {migration.VERSION}: {migration.DESCRIPTION}")
+            raise
+        
+        logger.info(f"Migración {migration.VERSION} aplicada: {migration.DESCRIPTION}")
+        applied += 1
+    
+    return applied
@@ -0,0 +1,12 @@
+"""
+Índices para los reportes e historial de ventas
+"""
+
+VERSION = 1
+DESCRIPTION = "Índices de ventas por fecha e items por venta y libro"
+
+def upgrade(conn):
+    """Crea los índices usados por reportes, historial y checkout"""
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_sales_sale_date ON sales (sale_date)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_sale_items_sale_id ON sale_items (sale_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_sale_items_book_id ON sale_items (book_id)")
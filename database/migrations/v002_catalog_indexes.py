@@ -0,0 +1,14 @@
+"""
+Índices para el catálogo y los movimientos de inventario
+"""
+
+VERSION = 2
+DESCRIPTION = "Índices de libros por título y movimientos por libro"
+
+def upgrade(conn):
+    """Crea los índices usados por el listado de libros y el historial de stock"""
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_books_title ON books (title)")
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_inventory_movements_book_id "
+        "ON inventory_movements (book_id, movement_date)"
+    )
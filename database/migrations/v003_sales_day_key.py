@@ -0,0 +1,35 @@
+"""
+Clave de día indexada para las ventas
+"""
+
+VERSION = 3
+DESCRIPTION = "Columna sale_day (YYYYMMDD) indexada y sincronizada por triggers"
+
+# Misma expresión en el backfill y en los triggers
+DAY_KEY_SQL = "CAST(strftime('%Y%m%d', {column}) AS INTEGER)"
+
+def upgrade(conn):
+    """Agrega sale_day, la rellena para las ventas existentes y la indexa"""
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(sales)")]
+    if "sale_day" not in columns:
+        conn.execute("ALTER TABLE sales ADD COLUMN sale_day INTEGER")
+    
+    conn.execute(f"UPDATE sales SET sale_day = {DAY_KEY_SQL.format(column='sale_date')}")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_sales_sale_day ON sales (sale_day)")
+    
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_sales_day_insert
+        AFTER INSERT ON sales
+        BEGIN
+            UPDATE sales SET sale_day = {DAY_KEY_SQL.format(column='NEW.sale_date')}
+            WHERE id = NEW.id;
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_sales_day_update
+        AFTER UPDATE OF sale_date ON sales
+        BEGIN
+            UPDATE sales SET sale_day = {DAY_KEY_SQL.format(column='NEW.sale_date')}
+            WHERE id = NEW.id;
+        END
+    """)
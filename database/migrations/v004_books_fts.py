@@ -0,0 +1,62 @@
+"""
+Índice de texto completo FTS5 para el catálogo de libros
+"""
+
+import sqlite3
+import logging
+
+logger = logging.getLogger(__name__)
+
+VERSION = 4
+DESCRIPTION = "Tabla FTS5 books_fts (título, autor, ISBN) sincronizada por triggers"
+
+# ISBN sin guiones ni espacios para poder buscarlo por prefijo de dígitos
+ISBN_DIGITS_SQL = "replace(replace(COALESCE({column}, ''), '-', ''), ' ', '')"
+
+def upgrade(conn):
+    """Crea books_fts, sus triggers y la llena con el catálogo actual"""
+    try:
+        conn.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS books_fts USING fts5(
+                title, author, isbn,
+                tokenize = 'unicode61 remove_diacritics 2',
+                prefix = '2 3 4'
+            )
+        """)
+    except sqlite3.OperationalError as e:
+        # SQLite compilado sin FTS5: la búsqueda usará LIKE
+        logger.warning(f"FTS5 no disponible, se omite el índice de búsqueda: {e}")
+        return
+    
+    new_isbn = ISBN_DIGITS_SQL.format(column="NEW.isbn")
+    
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_books_fts_insert
+        AFTER INSERT ON books
+        BEGIN
+            INSERT INTO books_fts (rowid, title, author, isbn)
+            VALUES (NEW.id, NEW.title, NEW.author, {new_isbn});
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_books_fts_delete
+        AFTER DELETE ON books
+        BEGIN
+            DELETE FROM books_fts WHERE rowid = OLD.id;
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_books_fts_update
+        AFTER UPDATE OF title, author, isbn ON books
+        BEGIN
+            DELETE FROM books_fts WHERE rowid = OLD.id;
+            INSERT INTO books_fts (rowid, title, author, isbn)
+            VALUES (NEW.id, NEW.title, NEW.author, {new_isbn});
+        END
+    """)
+    
+    conn.execute("DELETE FROM books_fts")
+    conn.execute(f"""
+        INSERT INTO books_fts (rowid, title, author, isbn)
+        SELECT id, title, author, {ISBN_DIGITS_SQL.format(column='isbn')} FROM books
+    """)
@@ -0,0 +1,134 @@
+"""
+Resumen diario de ventas mantenido por triggers
+"""
+
+from typing import List
+
+from database.migrations.v003_sales_day_key import DAY_KEY_SQL
+
+VERSION = 5
+DESCRIPTION = "Tabla daily_sales_summary por día y método de pago, sincronizada por triggers"
+
+# Las ventas sin método de pago se agrupan bajo la cadena vacía
+PAYMENT_SQL = "COALESCE({column}, '')"
+
+def rebuild_sql(sales: str = "sales", sale_items: str = "sale_items") -> List[str]:
+    """Sentencias que recalculan el resumen completo desde las tablas (o vistas) indicadas"""
+    return [
+        "DELETE FROM daily_sales_summary",
+        f"""
+        INSERT INTO daily_sales_summary
+            (sale_day, payment_method, sale_count, revenue, discounts, item_count)
+        SELECT s.sale_day, COALESCE(s.payment_method, ''),
+               COUNT(*), SUM(s.total_amount), SUM(COALESCE(s.discount, 0)),
+               COALESCE(SUM(items.units), 0)
+        FROM {sales} s
+        LEFT JOIN (
+            SELECT sale_id, SUM(quantity) AS units FROM {sale_items} GROUP BY sale_id
+        ) items ON items.sale_id = s.id
+        WHERE s.sale_day IS NOT NULL
+        GROUP BY s.sale_day, COALESCE(s.payment_method, '')
+        """
+    ]
+
+# Recalcula el resumen completo desde sales y sale_items
+REBUILD_SQL = rebuild_sql()
+
+def _add_sale(prefix: str, items_sql: str) -> str:
+    """SQL que suma una venta (NEW u OLD) a su fila del resumen"""
+    day = DAY_KEY_SQL.format(column=f"{prefix}.sale_date")
+    payment = PAYMENT_SQL.format(column=f"{prefix}.payment_method")
+    return f"""
+            INSERT OR IGNORE INTO daily_sales_summary (sale_day, payment_method)
+            VALUES ({day}, {payment});
+            UPDATE daily_sales_summary
+            SET sale_count = sale_count + 1,
+                revenue = revenue + {prefix}.total_amount,
+                discounts = discounts + COALESCE({prefix}.discount, 0),
+                item_count = item_count + {items_sql}
+            WHERE sale_day = {day} AND payment_method = {payment};
+    """
+
+def _remove_sale(prefix: str, items_sql: str) -> str:
+    """SQL que resta una venta (OLD) de su fila del resumen y borra filas vacías"""
+    day = DAY_KEY_SQL.format(column=f"{prefix}.sale_date")
+    payment = PAYMENT_SQL.format(column=f"{prefix}.payment_method")
+    return f"""
+            UPDATE daily_sales_summary
+            SET sale_count = sale_count - 1,
+                revenue = revenue - {prefix}.total_amount,
+                discounts = discounts - COALESCE({prefix}.discount, 0),
+                item_count = item_count - {items_sql}
+            WHERE sale_day = {day} AND payment_method = {payment};
+            DELETE FROM daily_sales_summary
+            WHERE sale_day = {day} AND payment_method = {payment} AND sale_count <= 0;
+    """
+
+def _adjust_items(sale_id: str, delta: str) -> str:
+    """SQL que ajusta las unidades del día de una venta existente"""
+    return f"""
+            UPDATE daily_sales_summary
+            SET item_count = item_count + ({delta})
+            WHERE sale_day = (SELECT sale_day FROM sales WHERE id = {sale_id})
+              AND payment_method = (SELECT COALESCE(payment_method, '') FROM sales WHERE id = {sale_id});
+    """
+
+def _items_of(sale_id: str) -> str:
+    """Subconsulta con las unidades vendidas de una venta"""
+    return f"(SELECT COALESCE(SUM(quantity), 0) FROM sale_items WHERE sale_id = {sale_id})"
+
+def upgrade(conn):
+    """Crea el resumen, sus triggers y lo llena con las ventas existentes"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS daily_sales_summary (
+            sale_day INTEGER NOT NULL,
+            payment_method TEXT NOT NULL,
+            sale_count INTEGER NOT NULL DEFAULT 0,
+            revenue REAL NOT NULL DEFAULT 0,
+            discounts REAL NOT NULL DEFAULT 0,
+            item_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (sale_day, payment_method)
+        )
+    """)
+    
+    # Al insertar la venta aún no tiene items; llegan después por sale_items
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_summary_sale_insert
+        AFTER INSERT ON sales
+        BEGIN {_add_sale('NEW', '0')}
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_summary_sale_delete
+        AFTER DELETE ON sales
+        BEGIN {_remove_sale('OLD', _items_of('OLD.id'))}
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_summary_sale_update
+        AFTER UPDATE OF sale_date, payment_method, total_amount, discount ON sales
+        BEGIN {_remove_sale('OLD', _items_of('OLD.id'))} {_add_sale('NEW', _items_of('NEW.id'))}
+        END
+    """)
+    
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_summary_item_insert
+        AFTER INSERT ON sale_items
+        BEGIN {_adjust_items('NEW.sale_id', 'NEW.quantity')}
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_summary_item_delete
+        AFTER DELETE ON sale_items
+        BEGIN {_adjust_items('OLD.sale_id', '-OLD.quantity')}
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_summary_item_update
+        AFTER UPDATE OF quantity, sale_id ON sale_items
+        BEGIN {_adjust_items('OLD.sale_id', '-OLD.quantity')} {_adjust_items('NEW.sale_id', 'NEW.quantity')}
+        END
+    """)
+    
+    for statement in REBUILD_SQL:
+        conn.execute(statement)
@@ -0,0 +1,47 @@
+"""
+Puntos de control mensuales del stock por libro
+"""
+
+from database.migrations.v003_sales_day_key import DAY_KEY_SQL
+
+VERSION = 6
+DESCRIPTION = "Tabla stock_checkpoints e índice por fecha de movimiento"
+
+# Cambio de stock de un movimiento: OUT resta, IN y ADJUSTMENT suman con su signo
+SIGNED_QUANTITY_SQL = "CASE movement_type WHEN 'OUT' THEN -quantity ELSE quantity END"
+
+def upgrade(conn):
+    """Crea la tabla de puntos de control y el índice para recorrer movimientos por fecha"""
+    # checkpoint_day (YYYYMMDD) guarda el stock al inicio de ese día
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS stock_checkpoints (
+            checkpoint_day INTEGER NOT NULL,
+            book_id INTEGER NOT NULL,
+            stock_quantity INTEGER NOT NULL,
+            PRIMARY KEY (checkpoint_day, book_id)
+        )
+    """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_inventory_movements_date
+        ON inventory_movements (movement_date)
+    """)
+    
+    # Un movimiento con fecha pasada deja obsoletos los puntos de control posteriores
+    for event, row in (("INSERT", "NEW"), ("DELETE", "OLD")):
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_stock_checkpoints_{event.lower()}
+            AFTER {event} ON inventory_movements
+            BEGIN
+                DELETE FROM stock_checkpoints
+                WHERE checkpoint_day > {DAY_KEY_SQL.format(column=f'{row}.movement_date')};
+            END
+        """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_stock_checkpoints_update
+        AFTER UPDATE OF book_id, movement_type, quantity, movement_date ON inventory_movements
+        BEGIN
+            DELETE FROM stock_checkpoints
+            WHERE checkpoint_day > MIN({DAY_KEY_SQL.format(column='OLD.movement_date')},
+                                       {DAY_KEY_SQL.format(column='NEW.movement_date')});
+        END
+    """)
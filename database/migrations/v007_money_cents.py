@@ -0,0 +1,125 @@
+"""
+Importes en centavos enteros
+"""
+
+import re
+import sqlite3
+from typing import Dict, Sequence, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+VERSION = 7
+DESCRIPTION = "Precios, totales y resúmenes en centavos (INTEGER) en lugar de REAL"
+
+# Columnas de dinero por tabla
+MONEY_COLUMNS: Dict[str, Tuple[str, ...]] = {
+    "books": ("purchase_price", "sale_price"),
+    "sales": ("total_amount", "discount"),
+    "sale_items": ("unit_price", "subtotal"),
+    "daily_sales_summary": ("revenue", "discounts")
+}
+
+# Pesos -> centavos, conservando los NULL
+CENTS_SQL = "CAST(ROUND({column} * 100) AS INTEGER)"
+
+def _qualify(sql: str, schema: str) -> str:
+    """Agrega el esquema al nombre de un CREATE INDEX o CREATE TRIGGER guardado en sqlite_master"""
+    return re.sub(r"^(CREATE\s+(?:UNIQUE\s+)?(?:INDEX|TRIGGER)\s+(?:IF\s+NOT\s+EXISTS\s+)?)",
+                  rf"\g<1>{schema}.", sql, count=1, flags=re.IGNORECASE)
+
+def convert_table(conn: sqlite3.Connection, table: str, columns: Sequence[str],
+                  schema: str = "main") -> bool:
+    """
+    Reconstruye una tabla con sus columnas de dinero como INTEGER en centavos
+    
+    SQLite no puede cambiar el tipo de una columna, y una columna REAL
+    vuelve a convertir en real todo entero que se guarde en ella. Por eso
+    se crea la tabla nueva, se copian las filas convirtiendo los importes,
+    se borra la anterior y se renombra; después se recrean sus índices y
+    triggers tal como estaban. Las columnas que ya son INTEGER se dejan
+    igual, así que repetirla no cambia nada.
+    
+    Args:
+        conn (sqlite3.Connection): Conexión dentro de una transacción
+        table (str): Tabla a convertir
+        columns (Sequence[str]): Columnas de dinero de la tabla
+        schema (str): Base donde está la tabla (main o un archivo adjunto)
+    
+    Returns:
+        bool: True si la tabla se reconstruyó
+    """
+    info = conn.execute(f"PRAGMA {schema}.table_info({table})").fetchall()
+    declared = {row[1]: (row[2] or "").upper() for row in info}
+    pending = [column for column in columns if declared.get(column) == "REAL"]
+    if not pending:
+        return False
+    
+    master = f"{schema}.sqlite_master"
+    table_sql = conn.execute(
+        f"SELECT sql FROM {master} WHERE type = 'table' AND name = ?", (table,)
+    ).fetchone()[0]
+    dependents = [row[0] for row in conn.execute(
+        f"SELECT sql FROM {master} WHERE type IN ('index', 'trigger') AND tbl_name = ? AND sql IS NOT NULL",
+        (table,)
+    )]
+    
+    new_table = f"{table}_cents"
+    new_sql = re.sub(rf"^CREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?[\"'`\[]?{table}[\"'`\]]?",
+                     f"CREATE TABLE {schema}.{new_table}", table_sql, count=1, flags=re.IGNORECASE)
+    for column in pending:
+        new_sql = re.sub(rf"\b{column}\s+REAL\b", f"{column} INTEGER", new_sql, flags=re.IGNORECASE)
+    
+    sequence = None
+    if "AUTOINCREMENT" in table_sql.upper():
+        row = conn.execute(f"SELECT seq FROM {schema}.sqlite_sequence WHERE name = ?", (table,)).fetchone()
+        sequence = row[0] if row else None
+    
+    names = [row[1] for row in info]
+    values = [CENTS_SQL.format(column=name) if name in pending else name for name in names]
+    conn.execute(f"DROP TABLE IF EXISTS {schema}.{new_table}")
+    conn.execute(new_sql)
+    conn.execute(f'''
+        INSERT INTO {schema}.{new_table} ({", ".join(names)})
+        SELECT {", ".join(values)} FROM {schema}.{table}
+    ''')
+    conn.execute(f"DROP TABLE {schema}.{table}")
+    conn.execute(f"ALTER TABLE {schema}.{new_table} RENAME TO {table}")
+    for sql in dependents:
+        conn.execute(_qualify(sql, schema))
+    if sequence is not None:
+        conn.execute(f"UPDATE {schema}.sqlite_sequence SET seq = ? WHERE name = ?", (sequence, table))
+    
+    logger.info(f"{schema}.{table}: {', '.join(pending)} convertidas a centavos")
+    return True
+
+def convert_schema(conn: sqlite3.Connection, tables: Dict[str, Sequence[str]], schema: str = "main"):
+    """
+    Convierte las tablas indicadas de una base a centavos
+    
+    Mientras se reconstruyen, los triggers y vistas de otras tablas pueden
+    apuntar a una tabla que aún no existe; legacy_alter_table evita que el
+    RENAME los revise y los deja intactos.
+    
+    Args:
+        conn (sqlite3.Connection): Conexión dentro de una transacción
+        tables (Dict[str, Sequence[str]]): Tabla -> columnas de dinero
+        schema (str): Base donde están las tablas
+    """
+    legacy = conn.execute("PRAGMA legacy_alter_table").fetchone()[0]
+    conn.execute("PRAGMA legacy_alter_table = ON")
+    try:
+        for table, columns in tables.items():
+            convert_table(conn, table, columns, schema)
+    finally:
+        conn.execute(f"PRAGMA legacy_alter_table = {legacy}")
+
+def upgrade(conn):
+    """Convierte a centavos la base activa y los archivos por año adjuntos"""
+    convert_schema(conn, MONEY_COLUMNS)
+    
+    # Los archivos adjuntos a esta conexión comparten la transacción
+    archive_tables = {table: MONEY_COLUMNS[table] for table in ("sales", "sale_items")}
+    for row in conn.execute("PRAGMA database_list").fetchall():
+        if row[1].startswith("archive_"):
+            convert_schema(conn, archive_tables, schema=row[1])
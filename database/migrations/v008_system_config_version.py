@@ -0,0 +1,26 @@
+"""
+Contador de cambios de system_config mantenido por triggers
+"""
+
+VERSION = 8
+DESCRIPTION = "Tabla system_config_version que cuenta las escrituras en system_config"
+
+def upgrade(conn):
+    """Crea el contador y los triggers que lo incrementan con cada cambio de configuración"""
+    # Una sola fila; PRAGMA data_version cambia con cualquier commit, esto solo con la configuración
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS system_config_version (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            version INTEGER NOT NULL
+        )
+    """)
+    conn.execute("INSERT OR IGNORE INTO system_config_version (id, version) VALUES (1, 0)")
+    
+    for event in ("INSERT", "UPDATE", "DELETE"):
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_system_config_version_{event.lower()}
+            AFTER {event} ON system_config
+            BEGIN
+                UPDATE system_config_version SET version = version + 1 WHERE id = 1;
+            END
+        """)
@@ -0,0 +1,16 @@
+"""
+Índice por ISBN normalizado
+"""
+
+from database.migrations.v004_books_fts import ISBN_DIGITS_SQL
+
+VERSION = 9
+DESCRIPTION = "Índice idx_books_isbn_digits sobre el ISBN sin guiones ni espacios"
+
+def upgrade(conn):
+    """Crea el índice que usa la importación para encontrar libros por ISBN"""
+    # La expresión debe coincidir con la de las consultas para que SQLite use el índice
+    conn.execute(f"""
+        CREATE INDEX IF NOT EXISTS idx_books_isbn_digits
+        ON books ({ISBN_DIGITS_SQL.format(column='isbn')})
+    """)
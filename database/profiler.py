@@ -0,0 +1,178 @@
+"""
+Perfilado de consultas y registro de consultas lentas
+Acumula tiempos por sentencia para encontrar los escaneos completos antes que los clientes
+"""
+
+import re
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+
+# Literales que no cambian la forma de la consulta
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)+\s*\)", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+_LINE_COMMENT = re.compile(r"--[^\n]*")
+
+# Paso del plan que recorre una tabla completa ("SCAN books", "SCAN TABLE books AS b")
+_FULL_SCAN = re.compile(r"^SCAN (?:TABLE )?\w+(?: AS \w+)?$")
+
+def normalize_sql(query: str) -> str:
+    """
+    Normaliza una sentencia para agrupar sus ejecuciones
+    
+    Quita comentarios y espacios repetidos y reemplaza los literales por
+    ``?``, de modo que la misma consulta con otros valores cuente junta.
+    
+    Args:
+        query (str): Sentencia SQL
+    
+    Returns:
+        str: Sentencia normalizada
+    """
+    text = _LINE_COMMENT.sub(" ", query)
+    text = _STRING_LITERAL.sub("?", text)
+    text = _NUMBER_LITERAL.sub("?", text)
+    text = _IN_LIST.sub("IN (?)", text)
+    return _WHITESPACE.sub(" ", text).strip()
+
+def format_plan(rows: Sequence) -> List[str]:
+    """
+    Convierte la salida de EXPLAIN QUERY PLAN en líneas indentadas
+    
+    Args:
+        rows (Sequence): Filas (id, parent, notused, detail)
+    
+    Returns:
+        List[str]: Un paso del plan por línea
+    """
+    depth = {0: -1}
+    lines = []
+    for node_id, parent, _, detail in rows:
+        depth[node_id] = depth.get(parent, -1) + 1
+        lines.append("  " * depth[node_id] + detail)
+    return lines
+
+def has_full_scan(plan: Optional[List[str]]) -> bool:
+    """Indica si algún paso del plan recorre una tabla completa"""
+    return any(_FULL_SCAN.match(line.strip()) for line in plan or ())
+
+class QueryProfiler:
+    """Acumula estadísticas por sentencia y guarda las consultas lentas"""
+    
+    def __init__(self, slow_threshold_ms: float = 100.0, slow_log_size: int = 200):
+        """
+        Inicializa el perfilador
+        
+        Args:
+            slow_threshold_ms (float): Milisegundos a partir de los que una sentencia es lenta
+            slow_log_size (int): Número de consultas lentas que se conservan
+        """
+        self.slow_threshold = slow_threshold_ms / 1000.0
+        self._stats: Dict[str, Dict] = {}
+        self._slow_log: deque = deque(maxlen=slow_log_size)
+        self._lock = threading.Lock()
+    
+    def is_slow(self, elapsed: float) -> bool:
+        """Indica si un tiempo (en segundos) supera el umbral de consulta lenta"""
+        return elapsed >= self.slow_threshold
+    
+    def wants_plan(self, query: str, elapsed: float) -> bool:
+        """
+        Indica si conviene capturar el plan de una ejecución
+        
+        Se captura la primera vez que aparece cada sentencia, para detectar
+        escaneos completos aunque todavía sean rápidos, y en cada ejecución lenta.
+        
+        Args:
+            query (str): Sentencia ejecutada
+            elapsed (float): Tiempo de reloj en segundos
+        
+        Returns:
+            bool: True si se debe ejecutar EXPLAIN QUERY PLAN
+        """
+        if self.is_slow(elapsed):
+            return True
+        with self._lock:
+            entry = self._stats.get(normalize_sql(query))
+            return entry is None or entry['plan'] is None
+    
+    def record(self, query: str, elapsed: float, rows: int = 0, params=None,
+               plan: Optional[List[str]] = None):
+        """
+        Registra una ejecución
+        
+        Args:
+            query (str): Sentencia ejecutada
+            elapsed (float): Tiempo de reloj en segundos
+            rows (int): Filas devueltas o afectadas
+            params: Parámetros usados (solo se guardan si la consulta fue lenta)
+            plan (List[str]): Plan de ejecución, si se capturó
+        """
+        key = normalize_sql(query)
+        with self._lock:
+            entry = self._stats.get(key)
+            if entry is None:
+                entry = self._stats[key] = {
+                    'sql': key,
+                    'calls': 0,
+                    'total_time': 0.0,
+                    'max_time': 0.0,
+                    'rows': 0,
+                    'slow_calls': 0,
+                    'plan': None
+                }
+            entry['calls'] += 1
+            entry['total_time'] += elapsed
+            entry['max_time'] = max(entry['max_time'], elapsed)
+            entry['rows'] += rows
+            
+            if plan is not None:
+                entry['plan'] = plan
+            
+            if self.is_slow(elapsed):
+                entry['slow_calls'] += 1
+                self._slow_log.append({
+                    'timestamp': datetime.now(),
+                    'sql': key,
+                    'params': repr(params)[:200] if params else "",
+                    'time_ms': elapsed * 1000,
+                    'rows': rows,
+                    'plan': plan or [],
+                    'full_scan': has_full_scan(plan)
+                })
+    
+    def stats(self) -> List[Dict]:
+        """
+        Obtiene las estadísticas por sentencia, de mayor a menor tiempo total
+        
+        Returns:
+            List[Dict]: Llamadas, tiempos en milisegundos, filas y plan por sentencia
+        """
+        with self._lock:
+            entries = [dict(entry) for entry in self._stats.values()]
+        
+        for entry in entries:
+            entry['total_ms'] = entry.pop('total_time') * 1000
+            entry['max_ms'] = entry.pop('max_time') * 1000
+            entry['avg_ms'] = entry['total_ms'] / entry['calls']
+            entry['full_scan'] = has_full_scan(entry['plan'])
+        return sorted(entries, key=lambda entry: entry['total_ms'], reverse=True)
+    
+    def slow_queries(self) -> List[Dict]:
+        """
+        Obtiene el registro de consultas lentas, la más reciente primero
+        
+        Returns:
+            List[Dict]: Consultas lentas con su plan de ejecución
+        """
+        with self._lock:
+            return list(reversed(self._slow_log))
+    
+    def reset(self):
+        """Borra las estadísticas y el registro de consultas lentas"""
+        with self._lock:
+            self._stats.clear()
+            self._slow_log.clear()
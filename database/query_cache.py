@@ -0,0 +1,187 @@
+"""
+Caché de resultados de consultas con invalidación por tabla
+Evita repetir las mismas lecturas en cada rerun de Streamlit mientras no haya escrituras
+"""
+
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, FrozenSet, Hashable, Iterable, Optional, Set, Tuple
+
+# Tablas leídas por una consulta (FROM x / JOIN x)
+_READ_TABLES = re.compile(r"\b(?:FROM|JOIN)\s+([A-Za-z_]\w*)", re.IGNORECASE)
+
+# Tablas modificadas por una sentencia de escritura
+_WRITTEN_TABLES = re.compile(
+    r"\b(?:INSERT(?:\s+OR\s+\w+)?\s+INTO|REPLACE\s+INTO|UPDATE(?:\s+OR\s+\w+)?|DELETE\s+FROM)"
+    r"\s+([A-Za-z_]\w*)",
+    re.IGNORECASE
+)
+
+# Sentencias que cambian el esquema y obligan a vaciar toda la caché
+_SCHEMA_CHANGE = re.compile(r"^\s*(?:CREATE|ALTER|DROP)\b", re.IGNORECASE)
+
+# Funciones cuyo resultado cambia aunque los datos no cambien
+_VOLATILE = re.compile(r"'now'|\brandom\s*\(|\bCURRENT_(?:DATE|TIME|TIMESTAMP)\b", re.IGNORECASE)
+
+# Clave de versión que cubre todas las tablas
+_ALL_TABLES = "*"
+
+def read_tables(query: str) -> FrozenSet[str]:
+    """Retorna las tablas que lee una consulta"""
+    return frozenset(name.lower() for name in _READ_TABLES.findall(query))
+
+def written_tables(query: str) -> FrozenSet[str]:
+    """Retorna las tablas que modifica una sentencia"""
+    return frozenset(name.lower() for name in _WRITTEN_TABLES.findall(query))
+
+def is_schema_change(query: str) -> bool:
+    """Indica si la sentencia es DDL (CREATE, ALTER o DROP)"""
+    return bool(_SCHEMA_CHANGE.match(query))
+
+def is_cacheable(query: str) -> bool:
+    """Indica si el resultado de una consulta se puede guardar en caché"""
+    head = query.lstrip()[:6].upper()
+    if not (head.startswith("SELECT") or head.startswith("WITH")):
+        return False
+    return not _VOLATILE.search(query)
+
+class QueryCache:
+    """Caché LRU de resultados invalidada por versión de tabla"""
+    
+    def __init__(self, max_entries: int = 256):
+        """
+        Inicializa la caché
+        
+        Args:
+            max_entries (int): Número máximo de consultas guardadas
+        """
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()  # clave -> (snapshot, resultado)
+        self._versions: Dict[str, int] = {}
+        self._dependents: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+        
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+    
+    def snapshot(self, tables: Iterable[str]) -> Tuple[Tuple[str, int], ...]:
+        """
+        Captura la versión actual de las tablas antes de ejecutar una consulta
+        
+        Args:
+            tables (Iterable[str]): Tablas leídas por la consulta
+        
+        Returns:
+            Tuple: Pares (tabla, versión) para pasar a put()
+        """
+        with self._lock:
+            # "*" es la versión global que sube al vaciar toda la caché
+            return tuple(sorted(
+                (table, self._versions.get(table, 0)) for table in {*tables, _ALL_TABLES}
+            ))
+    
+    def _is_current(self, snapshot: Tuple[Tuple[str, int], ...]) -> bool:
+        """Verifica que ninguna tabla del snapshot haya cambiado"""
+        return all(self._versions.get(table, 0) == version for table, version in snapshot)
+    
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Busca un resultado vigente en la caché
+        
+        Devuelve el mismo objeto guardado; quien lo reciba debe copiarlo
+        antes de modificarlo.
+        
+        Args:
+            key (Hashable): Clave de la consulta (SQL y parámetros)
+            
+        Returns:
+            Optional[Any]: Resultado guardado o None si no hay
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._is_current(entry[0]):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+    
+    def put(self, key: Hashable, snapshot: Tuple[Tuple[str, int], ...], result: Any):
+        """
+        Guarda un resultado si sus tablas no cambiaron durante la consulta
+        
+        Args:
+            key (Hashable): Clave de la consulta
+            snapshot (Tuple): Versiones capturadas con snapshot() antes de consultar
+            result (Any): Filas o DataFrame obtenido
+        """
+        with self._lock:
+            if not self._is_current(snapshot):
+                return
+            self._entries[key] = (snapshot, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def set_dependencies(self, dependents: Dict[str, Set[str]]):
+        """
+        Registra qué otras tablas cambian cuando se escribe en una tabla
+        
+        Se usa para los triggers: escribir en ``books`` también modifica
+        ``books_fts``, por ejemplo.
+        
+        Args:
+            dependents (Dict[str, Set[str]]): Tabla -> tablas que escriben sus triggers
+        """
+        with self._lock:
+            self._dependents = {table: set(targets) for table, targets in dependents.items()}
+    
+    def invalidate(self, tables: Iterable[str]):
+        """
+        Invalida los resultados que dependen de las tablas indicadas
+        
+        Args:
+            tables (Iterable[str]): Tablas modificadas
+        """
+        with self._lock:
+            pending = [table.lower() for table in tables]
+            seen: Set[str] = set()
+            while pending:
+                table = pending.pop()
+                if table in seen:
+                    continue
+                seen.add(table)
+                self._versions[table] = self._versions.get(table, 0) + 1
+                pending.extend(self._dependents.get(table, ()))
+            if seen:
+                self.invalidations += 1
+    
+    def clear(self):
+        """Vacía la caché por completo"""
+        with self._lock:
+            self._entries.clear()
+            self._versions[_ALL_TABLES] = self._versions.get(_ALL_TABLES, 0) + 1
+            self.invalidations += 1
+    
+    def stats(self) -> Dict:
+        """
+        Obtiene los contadores de uso de la caché
+        
+        Returns:
+            Dict: Entradas, aciertos, fallos, tasa de acierto e invalidaciones
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+                'invalidations': self.invalidations
+            }
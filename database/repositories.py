@@ -0,0 +1,278 @@
+"""
+Repositorios de libros y ventas
+Pasan las filas del cursor a modelos en bloque y entregan un solo objeto por registro
+"""
+
+from datetime import date
+from operator import itemgetter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import logging
+
+from database.db_manager import DatabaseManager, day_range
+from src.models import Book, Sale
+from src.models.book import BOOK_FIELDS, book_from_row
+from src.models.sale import SALE_FIELDS, SALE_ITEM_FIELDS, sale_from_row, sale_item_from_row
+
+logger = logging.getLogger(__name__)
+
+# Parámetros por consulta IN (...), por debajo del límite de SQLite
+_MAX_VARIABLES = 900
+
+BOOK_COLUMNS = ", ".join(f"b.{name}" for name in BOOK_FIELDS)
+SALE_COLUMNS = ", ".join(f"s.{name}" for name in SALE_FIELDS)
+SALE_ITEM_COLUMNS = ", ".join(f"si.{name}" for name in SALE_ITEM_FIELDS)
+
+# Valores de un diccionario de libro (p. ej. de search_books) en el orden de BOOK_FIELDS
+_dict_values = itemgetter(*BOOK_FIELDS)
+
+def _chunks(values: Sequence, size: int = _MAX_VARIABLES) -> Iterable[Sequence]:
+    """Parte una secuencia en bloques de a lo sumo ``size`` elementos"""
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+def _placeholders(values: Sequence) -> str:
+    return ", ".join("?" * len(values))
+
+class BookRepository:
+    """
+    Acceso a la tabla books como objetos Book
+
+    Las filas se convierten con book_from_row, que no vuelve a validar lo
+    que ya está guardado. Un mapa de identidad asegura que cada libro se
+    materialice una sola vez: si vuelve a aparecer en otra consulta se
+    entrega el mismo objeto, sin construirlo de nuevo. El repositorio está
+    pensado para durar una solicitud (una ejecución de la página); lo que
+    se escriba por fuera de él no se ve hasta llamar a clear() o crear otro.
+    """
+
+    def __init__(self, db: DatabaseManager):
+        """
+        Args:
+            db (DatabaseManager): Gestor de la tienda a consultar
+        """
+        self.db = db
+        self._identity: Dict[int, Book] = {}
+
+    def __len__(self) -> int:
+        """Libros materializados hasta ahora"""
+        return len(self._identity)
+
+    def clear(self):
+        """Olvida los libros cargados; las próximas consultas los leen de nuevo"""
+        self._identity.clear()
+
+    def _map(self, rows: Iterable[Sequence]) -> List[Book]:
+        """Filas en el orden de BOOK_FIELDS -> libros, reutilizando los ya cargados"""
+        identity = self._identity
+        books = []
+        for row in rows:
+            book = identity.get(row[0])
+            if book is None:
+                book = identity[row[0]] = book_from_row(row)
+            books.append(book)
+        return books
+
+    def find(self, where: str = "", params: Tuple = (), order_by: str = "b.id",
+             limit: Optional[int] = None, analytics: bool = False) -> List[Book]:
+        """
+        Libros que cumplen una condición
+
+        ``where`` y ``order_by`` son fragmentos SQL escritos en el código
+        (la tabla se llama ``b``); los valores van siempre en ``params``.
+
+        Args:
+            where (str): Condición sin la palabra WHERE ("" = todos)
+            params (Tuple): Parámetros de la condición
+            order_by (str): Orden sin las palabras ORDER BY
+            limit (int): Máximo de libros (None = sin límite)
+            analytics (bool): Leer en las conexiones de reportes, de solo lectura
+
+        Returns:
+            List[Book]: Libros encontrados
+        """
+        query = f"SELECT {BOOK_COLUMNS} FROM books b"
+        params = tuple(params)
+        if where:
+            query += f" WHERE {where}"
+        query += f" ORDER BY {order_by}"
+        if limit is not None:
+            query += " LIMIT ?"
+            params += (limit,)
+        return self._map(self.db.fetch_rows(query, params, analytics))
+
+    def get(self, book_id: int) -> Optional[Book]:
+        """Libro por su ID, o None si no existe"""
+        book = self._identity.get(book_id)
+        if book is None:
+            found = self.find("b.id = ?", (book_id,))
+            book = found[0] if found else None
+        return book
+
+    def get_many(self, book_ids: Iterable[int]) -> Dict[int, Book]:
+        """
+        Varios libros por ID, leyendo en bloque solo los que no están cargados
+
+        Returns:
+            Dict[int, Book]: ID -> libro, sin los que no existen
+        """
+        ids = list(dict.fromkeys(book_ids))
+        missing = [book_id for book_id in ids if book_id not in self._identity]
+        for part in _chunks(missing):
+            self.find(f"b.id IN ({_placeholders(part)})", tuple(part))
+        return {book_id: self._identity[book_id] for book_id in ids if book_id in self._identity}
+
+    def low_stock(self) -> List[Book]:
+        """Libros con stock en o bajo su mínimo, los más urgentes primero"""
+        return self.find("b.stock_quantity <= b.min_stock", order_by="b.stock_quantity, b.title")
+
+    def search(self, text: str, limit: int = 50, in_stock_only: bool = False) -> List[Book]:
+        """
+        Busca libros igual que DatabaseManager.search_books y los entrega como Book
+
+        Args:
+            text (str): Título, autor o ISBN
+            limit (int): Número máximo de resultados
+            in_stock_only (bool): Excluir libros sin stock
+
+        Returns:
+            List[Book]: Libros encontrados, los más relevantes primero
+        """
+        return self._map(map(_dict_values, self.db.search_books(text, limit, in_stock_only)))
+
+    def add(self, book: Book, initial_movement: bool = False) -> int:
+        """
+        Inserta un libro nuevo con DatabaseManager.add_book y lo agrega al mapa de identidad
+
+        Las fechas de creación y actualización las asigna la base; en el
+        objeto quedan como estaban. Espera el commit, de modo que el libro
+        solo entra al mapa de identidad si quedó guardado.
+
+        Args:
+            book (Book): Libro validado
+            initial_movement (bool): Registrar su stock como movimiento
+                "Stock inicial" en la misma transacción
+        
+        Returns:
+            int: ID asignado, también guardado en book.id
+
+        Raises:
+            sqlite3.Error: Si la inserción falla (p. ej. ISBN repetido)
+        """
+        book_id = self.db.add_book(book, initial_movement)
+        self._identity[book_id] = book
+        return book_id
+
+class SaleRepository:
+    """
+    Acceso a las ventas activas (tabla sales) como objetos Sale con sus items
+
+    Las ventas de una consulta se leen con una sola consulta de cabeceras y
+    otra de items por cada bloque de ventas, y se arman sin revalidar. Igual
+    que BookRepository, cada venta se materializa una sola vez por
+    repositorio. Si se le pasa un BookRepository, los items reciben título
+    y autor de sus libros, cargados también en bloque.
+    """
+
+    def __init__(self, db: DatabaseManager, books: Optional[BookRepository] = None):
+        """
+        Args:
+            db (DatabaseManager): Gestor de la tienda a consultar
+            books (BookRepository): Repositorio para completar título y autor de los items
+        """
+        self.db = db
+        self.books = books
+        self._identity: Dict[int, Sale] = {}
+
+    def __len__(self) -> int:
+        """Ventas materializadas hasta ahora"""
+        return len(self._identity)
+
+    def clear(self):
+        """Olvida las ventas cargadas"""
+        self._identity.clear()
+
+    def _map(self, rows: Iterable[Sequence]) -> List[Sale]:
+        """Filas en el orden de SALE_FIELDS -> ventas con sus items"""
+        identity = self._identity
+        sales, loaded = [], []
+        for row in rows:
+            sale = identity.get(row[0])
+            if sale is None:
+                sale = identity[row[0]] = sale_from_row(row)
+                loaded.append(sale)
+            sales.append(sale)
+        if loaded:
+            self._load_items(loaded)
+        return sales
+
+    def _load_items(self, sales: List[Sale]):
+        """Lee en bloque los items de las ventas recién cargadas"""
+        by_id = {sale.id: sale for sale in sales}
+        items = []
+        for part in _chunks(list(by_id)):
+            # sale_id va después de las columnas del item, que son las que lee el loader
+            rows = self.db.fetch_rows(f'''
+                SELECT {SALE_ITEM_COLUMNS}, si.sale_id FROM sale_items si
+                WHERE si.sale_id IN ({_placeholders(part)})
+                ORDER BY si.id
+            ''', tuple(part))
+            for row in rows:
+                item = sale_item_from_row(row)
+                by_id[row[-1]].attach_item(item)
+                items.append(item)
+
+        if self.books is not None and items:
+            books = self.books.get_many(item.book_id for item in items)
+            for item in items:
+                book = books.get(item.book_id)
+                if book is not None:
+                    item.title = book.title
+                    item.author = book.author
+
+    def find(self, where: str = "", params: Tuple = (), order_by: str = "s.sale_date DESC",
+             limit: Optional[int] = None) -> List[Sale]:
+        """
+        Ventas que cumplen una condición, con sus items
+
+        ``where`` y ``order_by`` son fragmentos SQL escritos en el código
+        (la tabla se llama ``s``); los valores van siempre en ``params``.
+
+        Returns:
+            List[Sale]: Ventas encontradas
+        """
+        query = f"SELECT {SALE_COLUMNS} FROM sales s"
+        params = tuple(params)
+        if where:
+            query += f" WHERE {where}"
+        query += f" ORDER BY {order_by}"
+        if limit is not None:
+            query += " LIMIT ?"
+            params += (limit,)
+        return self._map(self.db.fetch_rows(query, params))
+
+    def get(self, sale_id: int) -> Optional[Sale]:
+        """Venta por su ID con sus items, o None si no existe"""
+        sale = self._identity.get(sale_id)
+        if sale is None:
+            found = self.find("s.id = ?", (sale_id,))
+            sale = found[0] if found else None
+        return sale
+
+    def between(self, start: date, end: date) -> List[Sale]:
+        """Ventas entre dos fechas inclusive, las más recientes primero"""
+        return self.find("s.sale_day >= ? AND s.sale_day < ?", day_range(start, end))
+
+    def recent(self, limit: int = 20) -> List[Sale]:
+        """Últimas ventas registradas"""
+        return self.find(limit=limit)
+
+    def add(self, sale: Sale) -> int:
+        """
+        Registra una venta con DatabaseManager.record_sale y la agrega al mapa de identidad
+
+        Returns:
+            int: ID de la venta registrada
+        """
+        sale_id = self.db.record_sale(sale)
+        self._identity[sale_id] = sale
+        return sale_id
@@ -0,0 +1,228 @@
+"""
+Cola de escritura con un solo hilo escritor y commit agrupado
+Evita que varias sesiones compitan por el bloqueo de escritura de SQLite
+"""
+
+import queue
+import sqlite3
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Hashable, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Marca en la cola: abrir una conexión nueva antes de seguir
+_RECONNECT = object()
+
+class _WriteOperation:
+    """Operación encolada: función a ejecutar, etiqueta y futuro del resultado"""
+    
+    __slots__ = ("fn", "tag", "future")
+    
+    def __init__(self, fn: Callable[[sqlite3.Connection], Any], tag: Hashable):
+        self.fn = fn
+        self.tag = tag
+        self.future: Future = Future()
+
+class WriteQueue:
+    """
+    Serializa las escrituras en un hilo dedicado
+    
+    Las operaciones que llegan mientras se confirma un lote se agrupan en la
+    siguiente transacción, así un solo COMMIT (y un solo fsync) cubre varias
+    escrituras. Cada operación corre dentro de su propio SAVEPOINT: si falla,
+    solo se deshace esa operación y su futuro recibe la excepción.
+    """
+    
+    def __init__(self, connect: Callable[[], sqlite3.Connection], max_batch: int = 64,
+                 on_commit: Optional[Callable[[List[Hashable]], None]] = None):
+        """
+        Inicializa la cola y arranca el hilo escritor
+        
+        Args:
+            connect (Callable): Abre la conexión que usará el hilo escritor
+            max_batch (int): Máximo de operaciones por transacción
+            on_commit (Callable): Recibe las etiquetas de las operaciones confirmadas,
+                antes de resolver sus futuros
+        """
+        self.max_batch = max_batch
+        self._connect = connect
+        self._on_commit = on_commit
+        self._queue: queue.Queue = queue.Queue()
+        self._closed = False
+        self._error: Optional[BaseException] = None
+        self._lock = threading.Lock()
+        
+        self.batches = 0
+        self.operations = 0
+        
+        self._thread = threading.Thread(target=self._run, name="sqlite-writer", daemon=True)
+        self._thread.start()
+    
+    def submit(self, fn: Callable[[sqlite3.Connection], Any], tag: Hashable = None) -> Future:
+        """
+        Encola una operación de escritura
+        
+        ``fn`` recibe la conexión del hilo escritor ya dentro de una
+        transacción; no debe hacer commit ni rollback.
+        
+        Args:
+            fn (Callable): Función que realiza la escritura y retorna su resultado
+            tag (Hashable): Dato libre que se entrega a on_commit
+        
+        Returns:
+            Future: Se resuelve con el resultado de fn tras el COMMIT
+        """
+        operation = _WriteOperation(fn, tag)
+        with self._lock:
+            if self._error is not None:
+                raise RuntimeError(f"La cola de escritura se detuvo por un error: {self._error}") from self._error
+            if self._closed:
+                raise RuntimeError("La cola de escritura está cerrada")
+            self._queue.put(operation)
+        return operation.future
+    
+    def close(self, timeout: Optional[float] = None):
+        """
+        Detiene el hilo escritor después de confirmar lo ya encolado
+        
+        Args:
+            timeout (float): Segundos máximos de espera
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+        self._thread.join(timeout)
+    
+    @property
+    def error(self) -> Optional[BaseException]:
+        """Error que detuvo el hilo escritor, o None si sigue funcionando"""
+        return self._error
+    
+    def reconnect(self):
+        """
+        Hace que el hilo escritor abra una conexión nueva
+        
+        Lo ya encolado se confirma con la conexión actual; lo que se encole
+        después usa la nueva.
+        """
+        with self._lock:
+            if not self._closed:
+                self._queue.put(_RECONNECT)
+    
+    def stats(self) -> dict:
+        """
+        Obtiene los contadores de la cola
+        
+        Returns:
+            dict: Lotes confirmados, operaciones y operaciones por lote
+        """
+        return {
+            'batches': self.batches,
+            'operations': self.operations,
+            'pending': self._queue.qsize(),
+            'ops_per_batch': self.operations / self.batches if self.batches else 0.0
+        }
+    
+    def _run(self):
+        """Bucle del hilo escritor"""
+        conn = None
+        try:
+            conn = self._connect()
+            stop = False
+            while not stop:
+                operation = self._queue.get()
+                if operation is None:
+                    break
+                if operation is _RECONNECT:
+                    conn.close()
+                    conn = None
+                    conn = self._connect()
+                    continue
+                
+                # Todo lo que se acumuló mientras tanto va en la misma transacción
+                batch = [operation]
+                reconnect = False
+                while len(batch) < self.max_batch:
+                    try:
+                        operation = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if operation is None:
+                        stop = True
+                        break
+                    if operation is _RECONNECT:
+                        reconnect = True
+                        break
+                    batch.append(operation)
+                
+                self._commit_batch(conn, [op for op in batch if op.future.set_running_or_notify_cancel()])
+                if reconnect:
+                    conn.close()
+                    conn = None
+                    conn = self._connect()
+        except Exception as e:
+            # Sin conexión no hay quién atienda la cola: nadie debe quedar esperando
+            logger.error(f"El hilo escritor se detuvo: {e}")
+            self._fail_pending(e)
+        finally:
+            if conn is not None:
+                conn.close()
+    
+    def _fail_pending(self, error: BaseException):
+        """Marca la cola como detenida y entrega el error a todas las operaciones encoladas"""
+        with self._lock:
+            self._error = error
+            self._closed = True
+        
+        while True:
+            try:
+                operation = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if isinstance(operation, _WriteOperation) and operation.future.set_running_or_notify_cancel():
+                operation.future.set_exception(error)
+    
+    def _commit_batch(self, conn: sqlite3.Connection, batch: List[_WriteOperation]):
+        """Ejecuta un lote de operaciones en una sola transacción"""
+        if not batch:
+            return
+        
+        outcomes = []
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for operation in batch:
+                conn.execute("SAVEPOINT write_operation")
+                try:
+                    outcomes.append((operation, operation.fn(conn), None))
+                    conn.execute("RELEASE write_operation")
+                except Exception as e:
+                    conn.execute("ROLLBACK TO write_operation")
+                    conn.execute("RELEASE write_operation")
+                    outcomes.append((operation, None, e))
+            conn.commit()
+        except Exception as e:
+            logger.error(f"Error confirmando lote de escritura: {e}")
+            if conn.in_transaction:
+                conn.rollback()
+            for operation in batch:
+                operation.future.set_exception(e)
+            return
+        
+        self.batches += 1
+        self.operations += len(batch)
+        
+        if self._on_commit is not None:
+            try:
+                self._on_commit([op.tag for op, _, error in outcomes if error is None])
+            except Exception as e:
+                logger.error(f"Error tras confirmar lote de escritura: {e}")
+        
+        for operation, result, error in outcomes:
+            if error is None:
+                operation.future.set_result(result)
+            else:
+                operation.future.set_exception(error)
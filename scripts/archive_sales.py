@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Archivo por año de ventas y movimientos de inventario
+Mueve los años cerrados de la base activa a archive_YYYY.db
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+# Agregar la raíz del proyecto al path para importar módulos
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+def main():
+    """Archiva los años indicados, o todos los cerrados"""
+    parser = argparse.ArgumentParser(description="Archivar ventas y movimientos de años cerrados")
+    parser.add_argument("years", nargs="*", type=int,
+                        help="Años a archivar (por defecto, todos los cerrados)")
+    parser.add_argument("--vacuum", action="store_true",
+                        help="Compactar la base activa al terminar")
+    parser.add_argument("--store", help="Tienda (clave de STORES, por defecto la principal)")
+    args = parser.parse_args()
+    
+    from database.db_manager import get_db
+    
+    db_manager = get_db(args.store)
+    years = args.years or db_manager.archivable_years()
+    if not years:
+        print("No hay años cerrados pendientes de archivar")
+        return
+    
+    for i, year in enumerate(years):
+        try:
+            moved = db_manager.archive_year(year, vacuum=args.vacuum and i == len(years) - 1)
+        except ValueError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        print(f"✅ {year}: {moved['sales']} ventas, {moved['sale_items']} items, "
+              f"{moved['inventory_movements']} movimientos archivados")
+
+if __name__ == "__main__":
+    main()
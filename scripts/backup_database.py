@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+Copia de seguridad programada de la base de datos
+Pensado para ejecutarse desde cron al cierre del día
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+# Agregar la raíz del proyecto al path para importar módulos
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+def main():
+    """Crea el backup del día y rota los antiguos"""
+    parser = argparse.ArgumentParser(description="Backup en línea de la base de datos del POS")
+    parser.add_argument("--force", action="store_true",
+                        help="Crear un backup aunque ya exista uno de hoy")
+    parser.add_argument("--compression", choices=["gzip", "zstd"],
+                        help="Comprimir el backup")
+    args = parser.parse_args()
+    
+    from database.db_manager import db_manager
+    
+    path = db_manager.scheduled_backup(force=args.force, compression=args.compression)
+    
+    if path:
+        print(f"✅ Backup creado: {path}")
+    else:
+        print("ℹ️ Ya existe un backup de hoy")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+"""
+Creación de los puntos de control mensuales de stock
+Calcula los meses que falten en stock_checkpoints; conviene programarlo el día 1 de cada mes
+"""
+
+import sys
+from pathlib import Path
+
+# Agregar la raíz del proyecto al path para importar módulos
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+def main():
+    """Crea los puntos de control que falten"""
+    from database.db_manager import get_db
+    
+    months = get_db().create_stock_checkpoints()
+    print(f"✅ Puntos de control de stock creados: {months} mes(es)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Exportación de ventas, movimientos o inventario a CSV o Parquet
+"""
+
+import sys
+import argparse
+from datetime import date
+from pathlib import Path
+
+# Agregar la raíz del proyecto al path para importar módulos
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from database.export import DATASETS, EXPORT_FORMATS, export_filename
+
+def main():
+    """Exporta el conjunto indicado en la línea de comandos"""
+    parser = argparse.ArgumentParser(description="Exportar datos a CSV o Parquet")
+    parser.add_argument("dataset", choices=list(DATASETS), help="Datos a exportar")
+    parser.add_argument("--from", dest="start", type=date.fromisoformat,
+                        help="Primer día incluido (AAAA-MM-DD)")
+    parser.add_argument("--to", dest="end", type=date.fromisoformat,
+                        help="Último día incluido (AAAA-MM-DD, por defecto hoy)")
+    parser.add_argument("--format", dest="fmt", choices=EXPORT_FORMATS, default="csv",
+                        help="Formato del archivo")
+    parser.add_argument("--output", help="Archivo de destino (por defecto en exports/)")
+    parser.add_argument("--chunk-size", type=int, default=10000,
+                        help="Filas leídas por bloque")
+    parser.add_argument("--store", help="Tienda (clave de STORES, por defecto la principal)")
+    args = parser.parse_args()
+    
+    from database.db_manager import get_db
+    
+    output = Path(args.output) if args.output else \
+        PROJECT_ROOT / "exports" / export_filename(args.dataset, args.fmt, args.start, args.end)
+    
+    try:
+        rows = get_db(args.store).export_dataset(args.dataset, output, args.fmt,
+                                                 args.start, args.end, args.chunk_size)
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    
+    print(f"✅ {rows} filas exportadas a {output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Importación masiva de libros desde un CSV de proveedor
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+# Agregar la raíz del proyecto al path para importar módulos
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+def main():
+    """Importa el catálogo indicado en la línea de comandos"""
+    parser = argparse.ArgumentParser(description="Importar libros desde un CSV")
+    parser.add_argument("csv_file", help="Archivo CSV con título, autor, precio de venta, ISBN, stock...")
+    parser.add_argument("--chunk-size", type=int, default=5000,
+                        help="Filas por transacción")
+    parser.add_argument("--replace-stock", action="store_true",
+                        help="Usar el stock del archivo como stock final en lugar de sumarlo")
+    parser.add_argument("--store", help="Tienda (clave de STORES, por defecto la principal)")
+    args = parser.parse_args()
+    
+    from database.db_manager import get_db
+    
+    def report(result):
+        print(f"  {result.rows} filas procesadas...", end="\r", flush=True)
+    
+    result = get_db(args.store).import_books_csv(
+        args.csv_file,
+        chunk_size=args.chunk_size,
+        replace_stock=args.replace_stock,
+        progress=report
+    )
+    
+    print(f"✅ {result.inserted} libros nuevos, {result.updated} actualizados")
+    if result.errors:
+        print(f"⚠️ {result.skipped} filas con errores:")
+        for error in result.errors[:20]:
+            print(f"   {error}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+"""
+Reconstrucción del resumen diario de ventas
+Recalcula daily_sales_summary a partir de las tablas sales y sale_items
+"""
+
+import sys
+from pathlib import Path
+
+# Agregar la raíz del proyecto al path para importar módulos
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+def main():
+    """Reconstruye el resumen diario"""
+    from database.db_manager import get_db
+    
+    rows = get_db().rebuild_daily_summary()
+    print(f"✅ Resumen diario reconstruido: {rows} filas")
+
+if __name__ == "__main__":
+    main()
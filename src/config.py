@@ -27,16 +27,79 @@ STREAMLIT_CONFIG = {
 DATABASE_CONFIG = {
     "path": DATABASE_PATH,
     "timeout": 30.0,
-    "check_same_thread": False
+    "check_same_thread": False,
+    "pool_size": 5,  # Conexiones reutilizables por proceso
+    "journal_mode": "WAL",  # Lectores y escritor no se bloquean entre sí
+    "synchronous": "NORMAL",  # Seguro con WAL, evita un fsync por commit
+    "cache_size": -20000,  # Negativo = KiB (≈20 MB de caché de páginas)
+    "mmap_size": 268435456,  # 256 MB de lectura mapeada en memoria
+    "busy_timeout": 30000,  # ms de espera ante bloqueos antes de fallar
+    "query_cache_size": 256,  # Consultas en caché (0 la desactiva)
+    # Medir tiempo, filas y llamadas por sentencia; se activa con POS_PROFILE_QUERIES=1
+    # o desde Configuración, porque agrega un EXPLAIN QUERY PLAN por sentencia nueva
+    "profile_queries": os.environ.get("POS_PROFILE_QUERIES", "").lower() in ("1", "true", "yes"),
+    "slow_query_ms": 100,  # Umbral del registro de consultas lentas
+    "slow_query_log_size": 200,  # Consultas lentas que se conservan
+    "writer_mode": False,  # Enviar todas las escrituras a un único hilo escritor
+    "writer_batch_size": 64,  # Escrituras máximas por commit agrupado
+    "archive_directory": None,  # Carpeta de archive_YYYY.db relativa a la base (None = la misma)
+    "analytics_pool_size": 2,  # Conexiones de solo lectura para reportes (0 = usar el pool principal)
+    "analytics_replica": None,  # Copia para reportes junto a la base, p. ej. "analytics.db" (None = sin copia)
+    "analytics_replica_max_age": 300,  # Segundos antes de refrescar la copia
+    "analytics_progress_ops": 10000,  # Instrucciones de SQLite entre pausas de un reporte
+    "analytics_yield_ms": 2,  # Pausa del reporte mientras hay escrituras en curso
+    "system_config_check_interval": 1.0  # Segundos entre revisiones de cambios externos a system_config
 }
 
-# Configuración de negocio
+# Tiendas (puestos): cada una tiene su propia base de datos. Conviene una carpeta
+# por tienda, porque los archivos por año y la réplica se guardan junto a la base
+STORES = {
+    "principal": {"name": "Puesto Principal", "path": "data/bookstore.db"},
+    # "centro": {"name": "Puesto Centro", "path": "data/centro/bookstore.db"},
+}
+DEFAULT_STORE = "principal"
+FEDERATION_WORKERS = 8  # Hilos máximos para consultar todas las tiendas a la vez
+
+# Configuración de copias de seguridad
+BACKUP_CONFIG = {
+    "directory": "backups",
+    "pages_per_step": 256,  # Páginas copiadas antes de ceder el turno a las ventas
+    "step_sleep": 0.05,  # Segundos de pausa entre pasos
+    "compression": None,  # None, "gzip" o "zstd" (requiere zstandard)
+    "verify": True,  # PRAGMA integrity_check sobre cada copia
+    "keep_daily": 7,  # Copias diarias a conservar
+    "keep_weekly": 4  # Copias semanales a conservar
+}
+
+# Exportaciones desde la interfaz: el archivo se escribe en disco y solo se
+# ofrece para descargar desde el navegador si no supera el límite
+EXPORT_CONFIG = {
+    "directory": PROJECT_ROOT / "exports",
+    "download_max_mb": 50,  # Más grande: queda en la carpeta y se informa la ruta
+    "max_age_hours": 24  # Las exportaciones más viejas se borran al crear una nueva
+}
+
+# Configuración de negocio: valores iniciales de la tabla system_config.
+# Lo guardado en la tabla tiene prioridad; el tipo de cada valor define cómo
+# se convierte el texto guardado (DatabaseManager.get_system_config)
 BUSINESS_CONFIG = {
+    "app_name": APP_NAME,
+    "version": APP_VERSION,
     "currency": "MXN",
     "currency_symbol": "$",
-    "tax_rate": 0.16,  # IVA México
+    "tax_rate": 0.0,  # IVA en porcentaje (16 = 16%); 0% para comercio informal
     "min_stock_alert": 5,
-    "max_items_per_sale": 50
+    "max_items_per_sale": 500
+}
+
+BUSINESS_CONFIG_DESCRIPTIONS = {
+    "app_name": "Nombre de la aplicación",
+    "version": "Versión actual del sistema",
+    "currency": "Moneda del sistema",
+    "currency_symbol": "Símbolo de la moneda",
+    "tax_rate": "Tasa de impuestos (IVA) - 0% para comercio informal",
+    "min_stock_alert": "Stock mínimo para alertas",
+    "max_items_per_sale": "Libros distintos máximos por venta"
 }
 
 # Configuración de UI
@@ -67,6 +130,8 @@ def get_app_config():
             "author": AUTHOR
         },
         "database": DATABASE_CONFIG,
+        "stores": STORES,
+        "backup": BACKUP_CONFIG,
         "business": BUSINESS_CONFIG,
         "ui": UI_CONFIG,
         "streamlit": STREAMLIT_CONFIG
@@ -3,6 +3,7 @@ Modelos de datos para el Sistema POS
 """
 
 from .book import Book
+from .catalog import BookCatalog
 from .sale import Sale, SaleItem
 
-__all__ = ['Book', 'Sale', 'SaleItem']
\ No newline at end of file
+__all__ = ['Book', 'BookCatalog', 'Sale', 'SaleItem']
\ No newline at end of file
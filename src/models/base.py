@@ -0,0 +1,45 @@
+"""
+Utilidades comunes de los modelos
+"""
+
+import sys
+from dataclasses import MISSING, dataclass, fields
+from functools import partial
+from typing import Any, Callable, Sequence
+
+# Dataclass con __slots__: sin __dict__ por instancia, menos memoria y acceso
+# más rápido a los atributos. Python < 3.10 no admite slots=True y usa la normal
+model = partial(dataclass, slots=True) if sys.version_info >= (3, 10) else dataclass
+
+def row_loader(cls: type, columns: Sequence[str]) -> Callable[[Sequence], Any]:
+    """
+    Crea una función que arma un modelo desde una fila de la base sin pasar por __init__
+    
+    Para filas ya guardadas no hace falta volver a validar ni recalcular:
+    el objeto se crea con object.__new__ y cada atributo se asigna
+    directamente desde su posición en la fila. Los campos que no están en
+    ``columns`` reciben su valor por defecto. Igual que dataclasses con
+    __init__, el cuerpo de la función se genera una sola vez por modelo.
+    
+    Args:
+        cls (type): Clase del modelo (dataclass)
+        columns (Sequence[str]): Campo de cada posición de la fila
+    
+    Returns:
+        Callable[[Sequence], Any]: Recibe una tupla o sqlite3.Row y devuelve el modelo
+    """
+    namespace = {"new": object.__new__, "cls": cls}
+    lines = [f"    obj.{name} = row[{position}]" for position, name in enumerate(columns)]
+    for field in fields(cls):
+        if field.name in columns:
+            continue
+        if field.default is not MISSING:
+            namespace[f"default_{field.name}"] = field.default
+            lines.append(f"    obj.{field.name} = default_{field.name}")
+        elif field.default_factory is not MISSING:
+            namespace[f"factory_{field.name}"] = field.default_factory
+            lines.append(f"    obj.{field.name} = factory_{field.name}()")
+    
+    source = "def load(row):\n    obj = new(cls)\n" + "\n".join(lines) + "\n    return obj\n"
+    exec(source, namespace)
+    return namespace["load"]
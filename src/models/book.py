@@ -2,19 +2,31 @@
 Modelo de datos para libros
 """
 
-from dataclasses import dataclass
+from operator import attrgetter
 from typing import Optional, List
 from datetime import datetime
 
-@dataclass
+from .base import model, row_loader
+
+# Columnas de la tabla books, en el orden de to_dict()
+BOOK_FIELDS = (
+    'id', 'title', 'author', 'isbn', 'genre', 'publisher', 'publication_year',
+    'purchase_price', 'sale_price', 'stock_quantity', 'min_stock', 'condition',
+    'description', 'created_at', 'updated_at'
+)
+
+# Valores de un Book en el orden de BOOK_FIELDS
+book_values = attrgetter(*BOOK_FIELDS)
+
+@model
 class Book:
-    """Modelo de datos para un libro"""
+    """Modelo de datos para un libro (precios en centavos)"""
     
     # Campos obligatorios
     title: str
     author: str
-    purchase_price: float
-    sale_price: float
+    purchase_price: int
+    sale_price: int
     stock_quantity: int
     
     # Campos opcionales
@@ -48,8 +60,8 @@ class Book:
         return ((self.sale_price - self.purchase_price) / self.purchase_price) * 100
     
     @property
-    def total_value(self) -> float:
-        """Calcula el valor total del stock"""
+    def total_value(self) -> int:
+        """Calcula el valor total del stock en centavos"""
         return self.sale_price * self.stock_quantity
     
     @property
@@ -64,44 +76,12 @@ class Book:
     
     def to_dict(self) -> dict:
         """Convierte el objeto a diccionario"""
-        return {
-            'id': self.id,
-            'title': self.title,
-            'author': self.author,
-            'isbn': self.isbn,
-            'genre': self.genre,
-            'publisher': self.publisher,
-            'publication_year': self.publication_year,
-            'purchase_price': self.purchase_price,
-            'sale_price': self.sale_price,
-            'stock_quantity': self.stock_quantity,
-            'min_stock': self.min_stock,
-            'condition': self.condition,
-            'description': self.description,
-            'created_at': self.created_at,
-            'updated_at': self.updated_at
-        }
+        return dict(zip(BOOK_FIELDS, book_values(self)))
     
     @classmethod
     def from_dict(cls, data: dict) -> 'Book':
-        """Crea un objeto Book desde un diccionario"""
-        return cls(
-            id=data.get('id'),
-            title=data['title'],
-            author=data['author'],
-            isbn=data.get('isbn'),
-            genre=data.get('genre'),
-            publisher=data.get('publisher'),
-            publication_year=data.get('publication_year'),
-            purchase_price=data['purchase_price'],
-            sale_price=data['sale_price'],
-            stock_quantity=data['stock_quantity'],
-            min_stock=data.get('min_stock', 5),
-            condition=data.get('condition', 'Nuevo'),
-            description=data.get('description'),
-            created_at=data.get('created_at'),
-            updated_at=data.get('updated_at')
-        )
+        """Crea un objeto Book desde un diccionario (las claves ausentes toman su valor por defecto)"""
+        return cls(**{name: data[name] for name in BOOK_FIELDS if name in data})
     
     def __str__(self) -> str:
         """Representación string del libro"""
@@ -110,3 +90,6 @@ class Book:
     def __repr__(self) -> str:
         """Representación para debugging"""
         return f"Book(id={self.id}, title='{self.title}', author='{self.author}')"
+
+# Book desde una fila de books en el orden de BOOK_FIELDS, sin revalidar
+book_from_row = row_loader(Book, BOOK_FIELDS)
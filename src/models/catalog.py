@@ -0,0 +1,249 @@
+"""
+Catálogo de libros almacenado por columnas
+Guarda todo el inventario en arreglos de NumPy en lugar de un objeto Book por título
+"""
+
+import sys
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .book import BOOK_FIELDS, Book, book_values
+
+# Columnas numéricas y su tipo; publication_year usa 0 para "desconocido"
+NUMERIC_COLUMNS = {
+    'id': np.int64,
+    'purchase_price': np.int64,  # Centavos
+    'sale_price': np.int64,
+    'stock_quantity': np.int32,
+    'min_stock': np.int32,
+    'publication_year': np.int16
+}
+
+# Columnas con pocos valores distintos: se guarda un código por libro
+CATEGORY_COLUMNS = ('genre', 'condition')
+
+# Columnas de texto libre, en listas de Python
+TEXT_COLUMNS = tuple(
+    name for name in BOOK_FIELDS if name not in NUMERIC_COLUMNS and name not in CATEGORY_COLUMNS
+)
+
+class BookCatalog:
+    """
+    Colección de libros guardada columna por columna
+    
+    Precios, stock y stock mínimo viven en arreglos de NumPy, de modo que los
+    cálculos sobre todo el catálogo (margen, valor, stock bajo) se hacen de
+    una vez y sin crear objetos. Género y condición se guardan como códigos
+    sobre una lista de valores internados. Los objetos Book solo se crean al
+    pedir un libro concreto.
+    """
+    
+    __slots__ = ('_columns', '_categories', '_text', '_positions')
+    
+    def __init__(self, columns: Dict[str, np.ndarray], categories: Dict[str, Tuple[np.ndarray, List[Optional[str]]]],
+                 text: Dict[str, List]):
+        """
+        Crea el catálogo a partir de columnas ya construidas
+        
+        Args:
+            columns (Dict[str, np.ndarray]): Columnas de NUMERIC_COLUMNS
+            categories (Dict): Columna -> (códigos, valores) para CATEGORY_COLUMNS
+            text (Dict[str, List]): Columnas de TEXT_COLUMNS
+        """
+        self._columns = columns
+        self._categories = categories
+        self._text = text
+        self._positions = None
+    
+    @classmethod
+    def from_rows(cls, rows: Iterable[Sequence], fields: Sequence[str] = BOOK_FIELDS) -> 'BookCatalog':
+        """
+        Construye el catálogo desde filas (tuplas o sqlite3.Row) en el orden de ``fields``
+        
+        Args:
+            rows (Iterable[Sequence]): Filas de la tabla books
+            fields (Sequence[str]): Nombre de cada posición de la fila
+        
+        Returns:
+            BookCatalog: Catálogo con todas las filas
+        """
+        index = {name: position for position, name in enumerate(fields)}
+        raw: Dict[str, list] = {name: [] for name in BOOK_FIELDS}
+        getters = [(raw[name], index.get(name)) for name in BOOK_FIELDS]
+        for row in rows:
+            for values, position in getters:
+                values.append(row[position] if position is not None else None)
+        return cls._from_lists(raw)
+    
+    @classmethod
+    def from_books(cls, books: Iterable[Book]) -> 'BookCatalog':
+        """Construye el catálogo desde objetos Book"""
+        return cls.from_rows(book_values(book) for book in books)
+    
+    @classmethod
+    def _from_lists(cls, raw: Dict[str, list]) -> 'BookCatalog':
+        """Convierte listas por columna en el almacenamiento compacto"""
+        defaults = {'min_stock': 5, 'publication_year': 0}
+        columns = {}
+        for name, dtype in NUMERIC_COLUMNS.items():
+            default = defaults.get(name, 0)
+            columns[name] = np.fromiter(
+                (default if value is None else value for value in raw[name]),
+                dtype=dtype, count=len(raw[name])
+            )
+        
+        categories = {}
+        for name in CATEGORY_COLUMNS:
+            values: List[Optional[str]] = []
+            codes_by_value: Dict[Optional[str], int] = {}
+            codes = np.empty(len(raw[name]), dtype=np.int16)
+            for position, value in enumerate(raw[name]):
+                code = codes_by_value.get(value)
+                if code is None:
+                    code = codes_by_value[value] = len(values)
+                    values.append(sys.intern(value) if isinstance(value, str) else value)
+                codes[position] = code
+            categories[name] = (codes, values)
+        
+        text = {name: raw[name] for name in TEXT_COLUMNS}
+        return cls(columns, categories, text)
+    
+    def __len__(self) -> int:
+        return len(self._columns['id'])
+    
+    def __iter__(self) -> Iterator[Book]:
+        for position in range(len(self)):
+            yield self[position]
+    
+    def __getitem__(self, position: int) -> Book:
+        """Crea el objeto Book de la posición indicada"""
+        return Book(**{name: self.value(name, position) for name in BOOK_FIELDS})
+    
+    def __repr__(self) -> str:
+        return f"BookCatalog({len(self)} libros)"
+    
+    def value(self, name: str, position: int):
+        """Valor de una columna para un libro, como tipo de Python"""
+        if name in self._columns:
+            value = self._columns[name][position].item()
+            return None if name == 'publication_year' and value == 0 else value
+        if name in self._categories:
+            codes, values = self._categories[name]
+            return values[codes[position]]
+        return self._text[name][position]
+    
+    def column(self, name: str) -> np.ndarray:
+        """
+        Columna completa como arreglo de NumPy
+        
+        Las numéricas se entregan sin copiar (no modificar); género,
+        condición y texto se convierten a un arreglo de objetos.
+        """
+        if name in self._columns:
+            return self._columns[name]
+        if name in self._categories:
+            codes, values = self._categories[name]
+            return np.array(values, dtype=object)[codes]
+        return np.array(self._text[name], dtype=object)
+    
+    def codes(self, name: str) -> Tuple[np.ndarray, List[Optional[str]]]:
+        """Códigos por libro y valores distintos de género o condición (no modificar)"""
+        return self._categories[name]
+    
+    def position(self, book_id: int) -> Optional[int]:
+        """Posición de un libro por su ID, o None si no está"""
+        if self._positions is None:
+            self._positions = {book_id: position for position, book_id in enumerate(self._columns['id'].tolist())}
+        return self._positions.get(book_id)
+    
+    def get(self, book_id: int) -> Optional[Book]:
+        """Libro por su ID, o None si no está en el catálogo"""
+        position = self.position(book_id)
+        return None if position is None else self[position]
+    
+    def take(self, selection) -> 'BookCatalog':
+        """
+        Subconjunto del catálogo
+        
+        Args:
+            selection: Máscara booleana o arreglo de posiciones
+        
+        Returns:
+            BookCatalog: Catálogo con los libros seleccionados, en ese orden
+        """
+        selection = np.asarray(selection)
+        positions = np.flatnonzero(selection) if selection.dtype == bool else selection.astype(np.intp)
+        columns = {name: values[positions] for name, values in self._columns.items()}
+        categories = {name: (codes[positions], values) for name, (codes, values) in self._categories.items()}
+        text = {name: [values[position] for position in positions.tolist()] for name, values in self._text.items()}
+        return BookCatalog(columns, categories, text)
+    
+    def sort_by(self, name: str, ascending: bool = True) -> 'BookCatalog':
+        """
+        Catálogo ordenado por una columna numérica o de texto
+        
+        Las columnas de texto pueden tener None (sin género, sin ISBN): esos
+        libros van siempre al final, en orden ascendente o descendente, y
+        los empates conservan el orden original.
+        """
+        if name in self._columns:
+            positions = np.argsort(self._columns[name], kind='stable')
+            return self.take(positions if ascending else positions[::-1])
+        
+        values = self.column(name).tolist()
+        present = [position for position, value in enumerate(values) if value is not None]
+        missing = [position for position, value in enumerate(values) if value is None]
+        present.sort(key=values.__getitem__, reverse=not ascending)
+        return self.take(np.array(present + missing, dtype=np.intp))
+    
+    # Cálculos vectorizados, equivalentes a las propiedades de Book
+    
+    @property
+    def profit_margin(self) -> np.ndarray:
+        """Margen de ganancia (%) de cada libro; 0 si no hay precio de compra"""
+        purchase = self._columns['purchase_price']
+        sale = self._columns['sale_price']
+        margin = np.zeros(len(self), dtype=np.float64)
+        np.divide((sale - purchase) * 100, purchase, out=margin, where=purchase != 0)
+        return margin
+    
+    @property
+    def total_value(self) -> np.ndarray:
+        """Valor del stock de cada libro en centavos (precio de venta × stock)"""
+        return self._columns['sale_price'] * self._columns['stock_quantity']
+    
+    @property
+    def is_low_stock(self) -> np.ndarray:
+        """Máscara de libros con stock en o bajo su mínimo"""
+        return self._columns['stock_quantity'] <= self._columns['min_stock']
+    
+    @property
+    def is_out_of_stock(self) -> np.ndarray:
+        """Máscara de libros sin stock"""
+        return self._columns['stock_quantity'] == 0
+    
+    def inventory_value(self) -> int:
+        """Valor total del inventario a precio de venta, en centavos"""
+        return int(self.total_value.sum())
+    
+    def total_stock(self) -> int:
+        """Ejemplares en stock de todo el catálogo"""
+        return int(self._columns['stock_quantity'].sum(dtype=np.int64))
+    
+    def value_counts(self, name: str) -> Dict[Optional[str], int]:
+        """
+        Libros por cada valor de género o condición
+        
+        Returns:
+            Dict[Optional[str], int]: Valor -> número de libros, de mayor a menor
+        """
+        codes, values = self._categories[name]
+        counts = np.bincount(codes, minlength=len(values))
+        order = np.argsort(-counts, kind='stable')
+        return {values[code]: int(counts[code]) for code in order if counts[code]}
+    
+    def nbytes(self) -> int:
+        """Memoria aproximada de las columnas numéricas y de códigos"""
+        return sum(values.nbytes for values in self._columns.values()) + \
+            sum(codes.nbytes for codes, _ in self._categories.values())
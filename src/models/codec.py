@@ -0,0 +1,379 @@
+"""
+Codificación binaria por lotes de libros y ventas
+Empaqueta listas de modelos columna por columna para carritos, instantáneas y traspasos entre terminales
+"""
+
+import struct
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+from typing import Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .base import row_loader
+from .book import BOOK_FIELDS, Book, book_from_row, book_values
+from .catalog import CATEGORY_COLUMNS, NUMERIC_COLUMNS, TEXT_COLUMNS, BookCatalog
+from .sale import SALE_FIELDS, SALE_ITEM_FIELDS, Sale, SaleItem, sale_from_row
+
+# Encabezado: firma, versión del formato, tipo de contenido y cantidad de registros
+MAGIC = b"POSB"
+FORMAT_VERSION = 2
+KIND_BOOKS = 1
+KIND_SALES = 2
+
+_HEADER = struct.Struct("<4sBBI")
+_COLUMN = struct.Struct("<cB")  # Ancho de los enteros y si hay máscara de nulos
+_U32 = struct.Struct("<I")
+
+# Enteros con el ancho más chico que alcance para los valores de la columna
+_INT_TYPES = (
+    (b"b", np.dtype("<i1")),
+    (b"h", np.dtype("<i2")),
+    (b"i", np.dtype("<i4")),
+    (b"q", np.dtype("<i8"))
+)
+_INT_DTYPES = dict(_INT_TYPES)
+
+# Tipo de cada columna: int (admite nulos), float, str (admite nulos),
+# datetime (microsegundos desde 1970, admite nulos) o category (texto con
+# pocos valores distintos, guardado como códigos)
+BOOK_COLUMN_TYPES = {
+    'id': 'int', 'title': 'str', 'author': 'str', 'isbn': 'str', 'genre': 'category',
+    'publisher': 'str', 'publication_year': 'int', 'purchase_price': 'int',
+    'sale_price': 'int', 'stock_quantity': 'int', 'min_stock': 'int',
+    'condition': 'category', 'description': 'str', 'created_at': 'datetime', 'updated_at': 'datetime'
+}
+SALE_COLUMN_TYPES = {
+    'id': 'int', 'total_amount': 'int', 'payment_method': 'str', 'customer_name': 'str',
+    'customer_phone': 'str', 'discount': 'int', 'tax': 'float', 'sale_date': 'datetime', 'notes': 'str'
+}
+
+# Columnas de cada item; el subtotal se recalcula al decodificar
+ITEM_COLUMNS = ('book_id', 'quantity', 'unit_price', 'title', 'author')
+
+# SaleItem con título y autor, sin recalcular en __post_init__
+_item_from_row = row_loader(SaleItem, SALE_ITEM_FIELDS + ('title', 'author'))
+
+IntColumn = Tuple[np.ndarray, Optional[np.ndarray]]
+
+# Fechas sin zona horaria, como las guarda SQLite con CURRENT_TIMESTAMP
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+# Escritura
+
+def _int_column(values: Union[Sequence[Optional[int]], np.ndarray]) -> IntColumn:
+    """Valores enteros -> (arreglo, máscara de nulos o None)"""
+    if isinstance(values, np.ndarray):
+        return values, None
+    mask = np.fromiter((value is None for value in values), dtype=bool, count=len(values))
+    if mask.any():
+        values = [0 if value is None else value for value in values]
+        return np.array(values, dtype=np.int64), mask
+    return np.array(values, dtype=np.int64), None
+
+def _write_ints(parts: List[bytes], array: np.ndarray, mask: Optional[np.ndarray] = None):
+    """Columna de enteros: ancho, máscara empaquetada en bits y valores little-endian"""
+    code, dtype = _INT_TYPES[0]
+    if len(array):
+        low, high = int(array.min()), int(array.max())
+        for code, dtype in _INT_TYPES:
+            info = np.iinfo(dtype)
+            if info.min <= low and high <= info.max:
+                break
+    has_mask = mask is not None and bool(mask.any())
+    parts.append(_COLUMN.pack(code, has_mask))
+    if has_mask:
+        parts.append(np.packbits(mask).tobytes())
+    parts.append(array.astype(dtype, copy=False).tobytes())
+
+def _to_micros(value: Union[datetime, str, None]) -> Optional[int]:
+    """
+    Fecha -> microsegundos desde 1970
+    
+    Acepta datetime o el texto que entrega SQLite ("2024-03-01 10:15:00");
+    las fechas con zona horaria se pasan a UTC.
+    """
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return (value - _EPOCH) // _MICROSECOND
+
+def _write_strings(parts: List[bytes], values: Sequence):
+    """
+    Columna de texto: largos en caracteres (con la máscara de nulos) y un solo bloque UTF-8
+    
+    Los valores que no son texto (p. ej. un ISBN numérico) se guardan con str().
+    """
+    texts = [value if value is None or isinstance(value, str) else str(value) for value in values]
+    mask = np.fromiter((text is None for text in texts), dtype=bool, count=len(texts))
+    if mask.any():
+        texts = ["" if text is None else text for text in texts]
+    lengths = np.fromiter(map(len, texts), dtype=np.int64, count=len(texts))
+    blob = "".join(texts).encode("utf-8")
+    _write_ints(parts, lengths, mask)
+    parts.append(_U32.pack(len(blob)))
+    parts.append(blob)
+
+def _category_column(values: Sequence[Optional[str]]) -> Tuple[np.ndarray, List[Optional[str]]]:
+    """Valores -> (códigos, valores distintos en orden de aparición)"""
+    codes_by_value = {}
+    codes = np.fromiter(
+        (codes_by_value.setdefault(value, len(codes_by_value)) for value in values),
+        dtype=np.int64, count=len(values)
+    )
+    return codes, list(codes_by_value)
+
+def _write_category(parts: List[bytes], codes: np.ndarray, values: Sequence[Optional[str]]):
+    """Columna por categorías: valores distintos como texto y un código por registro"""
+    parts.append(_U32.pack(len(values)))
+    _write_strings(parts, values)
+    _write_ints(parts, codes)
+
+def _write_column(parts: List[bytes], kind: str, values: Sequence):
+    """Escribe una columna de valores de Python según su tipo"""
+    if kind == 'int':
+        _write_ints(parts, *_int_column(values))
+    elif kind == 'float':
+        parts.append(np.array(values, dtype="<f8").tobytes())
+    elif kind == 'str':
+        _write_strings(parts, values)
+    elif kind == 'datetime':
+        _write_ints(parts, *_int_column([_to_micros(value) for value in values]))
+    else:
+        _write_category(parts, *_category_column(values))
+
+def _columns(rows: List[tuple], width: int) -> List[Sequence]:
+    """Filas -> columnas (vacías si no hay filas)"""
+    return list(zip(*rows)) if rows else [()] * width
+
+# Lectura
+
+class _Reader:
+    """Recorre un buffer codificado sin copiarlo"""
+    
+    def __init__(self, data: Union[bytes, bytearray, memoryview]):
+        self.view = memoryview(data)
+        self.position = 0
+    
+    def take(self, size: int) -> memoryview:
+        if self.position + size > len(self.view):
+            raise ValueError("Datos codificados incompletos")
+        chunk = self.view[self.position:self.position + size]
+        self.position += size
+        return chunk
+    
+    def unpack(self, layout: struct.Struct) -> tuple:
+        return layout.unpack(self.take(layout.size))
+    
+    def ints(self, count: int) -> IntColumn:
+        code, has_mask = self.unpack(_COLUMN)
+        dtype = _INT_DTYPES.get(code)
+        if dtype is None:
+            raise ValueError(f"Tipo de columna desconocido: {code!r}")
+        mask = None
+        if has_mask:
+            bits = np.frombuffer(self.take((count + 7) // 8), dtype=np.uint8)
+            mask = np.unpackbits(bits, count=count).astype(bool)
+        array = np.frombuffer(self.take(count * dtype.itemsize), dtype=dtype)
+        return array, mask
+    
+    def floats(self, count: int) -> np.ndarray:
+        return np.frombuffer(self.take(count * 8), dtype="<f8")
+    
+    def strings(self, count: int) -> List[Optional[str]]:
+        lengths, mask = self.ints(count)
+        (size,) = self.unpack(_U32)
+        text = str(self.take(size), "utf-8")
+        ends = np.cumsum(lengths, dtype=np.int64)
+        starts = ends - lengths
+        values = [text[start:end] for start, end in zip(starts.tolist(), ends.tolist())]
+        if mask is not None:
+            for position in np.flatnonzero(mask).tolist():
+                values[position] = None
+        return values
+    
+    def category(self, count: int) -> Tuple[np.ndarray, List[Optional[str]]]:
+        (distinct,) = self.unpack(_U32)
+        values = self.strings(distinct)
+        codes, _ = self.ints(count)
+        return codes, values
+    
+    def column(self, kind: str, count: int) -> list:
+        """Lee una columna como lista de valores de Python"""
+        if kind == 'int':
+            return _to_list(*self.ints(count))
+        if kind == 'float':
+            return self.floats(count).tolist()
+        if kind == 'str':
+            return self.strings(count)
+        if kind == 'datetime':
+            return [None if micros is None else _EPOCH + micros * _MICROSECOND
+                    for micros in _to_list(*self.ints(count))]
+        codes, values = self.category(count)
+        return [values[code] for code in codes.tolist()]
+
+def _to_list(array: np.ndarray, mask: Optional[np.ndarray]) -> List[Optional[int]]:
+    """Arreglo de enteros -> lista de int de Python con None en los nulos"""
+    values = array.tolist()
+    if mask is not None:
+        for position in np.flatnonzero(mask).tolist():
+            values[position] = None
+    return values
+
+def _read_header(data, kind: str, expected: int) -> Tuple[_Reader, int]:
+    reader = _Reader(data)
+    magic, version, found, count = reader.unpack(_HEADER)
+    if magic != MAGIC:
+        raise ValueError("Los datos no están en el formato binario del POS")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Versión de formato no soportada: {version}")
+    if found != expected:
+        raise ValueError(f"Los datos no contienen {kind}")
+    return reader, count
+
+# Libros
+
+def encode_books(books: Union[Iterable[Book], BookCatalog]) -> bytes:
+    """
+    Codifica una lista de libros o un BookCatalog completo
+    
+    Desde un catálogo, las columnas numéricas y los códigos de género y
+    condición se escriben directamente desde sus arreglos, sin crear Book.
+    
+    Args:
+        books (Iterable[Book] | BookCatalog): Libros a codificar
+    
+    Returns:
+        bytes: Libros en formato binario
+    """
+    parts: List[bytes] = []
+    if isinstance(books, BookCatalog):
+        count = len(books)
+        parts.append(_HEADER.pack(MAGIC, FORMAT_VERSION, KIND_BOOKS, count))
+        for name in BOOK_FIELDS:
+            if name in NUMERIC_COLUMNS:
+                array = books.column(name)
+                # El catálogo usa 0 para el año desconocido
+                mask = array == 0 if name == 'publication_year' else None
+                _write_ints(parts, array, mask)
+            elif name in CATEGORY_COLUMNS:
+                codes, values = books.codes(name)
+                _write_category(parts, codes, values)
+            else:
+                _write_column(parts, BOOK_COLUMN_TYPES[name], books.column(name).tolist())
+        return b"".join(parts)
+    
+    rows = [book_values(book) for book in books]
+    parts.append(_HEADER.pack(MAGIC, FORMAT_VERSION, KIND_BOOKS, len(rows)))
+    for name, values in zip(BOOK_FIELDS, _columns(rows, len(BOOK_FIELDS))):
+        _write_column(parts, BOOK_COLUMN_TYPES[name], values)
+    return b"".join(parts)
+
+def decode_books(data: Union[bytes, bytearray, memoryview]) -> List[Book]:
+    """
+    Decodifica libros codificados con encode_books
+    
+    Los libros se arman sin revalidar, como los leídos de la base; las
+    fechas de creación y actualización vuelven como datetime.
+    
+    Raises:
+        ValueError: Si los datos no son libros en este formato
+    """
+    reader, count = _read_header(data, "libros", KIND_BOOKS)
+    columns = [reader.column(BOOK_COLUMN_TYPES[name], count) for name in BOOK_FIELDS]
+    return [book_from_row(row) for row in zip(*columns)]
+
+def decode_catalog(data: Union[bytes, bytearray, memoryview]) -> BookCatalog:
+    """
+    Decodifica libros codificados con encode_books directamente en un BookCatalog
+    
+    Las columnas numéricas y de categorías pasan del buffer a arreglos de
+    NumPy sin crear objetos por libro.
+    
+    Raises:
+        ValueError: Si los datos no son libros en este formato
+    """
+    reader, count = _read_header(data, "libros", KIND_BOOKS)
+    defaults = {'min_stock': 5}
+    columns, categories, text = {}, {}, {}
+    for name in BOOK_FIELDS:
+        if name in NUMERIC_COLUMNS:
+            array, mask = reader.ints(count)
+            array = array.astype(NUMERIC_COLUMNS[name])
+            if mask is not None:
+                array[mask] = defaults.get(name, 0)
+            columns[name] = array
+        elif name in CATEGORY_COLUMNS:
+            codes, values = reader.category(count)
+            categories[name] = (codes.astype(np.int16), values)
+        else:
+            text[name] = reader.column(BOOK_COLUMN_TYPES[name], count)
+    return BookCatalog(columns, categories, {name: text[name] for name in TEXT_COLUMNS})
+
+# Ventas
+
+def encode_sales(sales: Iterable[Sale]) -> bytes:
+    """
+    Codifica una lista de ventas con sus items
+    
+    Sirve también para carritos (ventas sin ID). Los items conservan título
+    y autor si los tienen.
+    
+    Args:
+        sales (Iterable[Sale]): Ventas a codificar
+    
+    Returns:
+        bytes: Ventas en formato binario
+    """
+    sales = list(sales)
+    parts = [_HEADER.pack(MAGIC, FORMAT_VERSION, KIND_SALES, len(sales))]
+    rows = [tuple(getattr(sale, name) for name in SALE_FIELDS) for sale in sales]
+    for name, values in zip(SALE_FIELDS, _columns(rows, len(SALE_FIELDS))):
+        _write_column(parts, SALE_COLUMN_TYPES[name], values)
+    
+    counts = np.fromiter((len(sale.items) for sale in sales), dtype=np.int64, count=len(sales))
+    _write_ints(parts, counts)
+    items = [
+        (item.book_id, item.quantity, item.unit_price, item.title, item.author)
+        for sale in sales for item in sale.items.values()
+    ]
+    parts.append(_U32.pack(len(items)))
+    book_ids, quantities, prices, titles, authors = _columns(items, len(ITEM_COLUMNS))
+    for values in (book_ids, quantities, prices):
+        _write_ints(parts, np.array(values, dtype=np.int64))
+    _write_strings(parts, titles)
+    _write_strings(parts, authors)
+    return b"".join(parts)
+
+def decode_sales(data: Union[bytes, bytearray, memoryview]) -> List[Sale]:
+    """
+    Decodifica ventas codificadas con encode_sales
+    
+    Las ventas y sus items se arman sin revalidar; total_amount queda
+    como se codificó y sale_date vuelve como datetime.
+    
+    Raises:
+        ValueError: Si los datos no son ventas en este formato
+    """
+    reader, count = _read_header(data, "ventas", KIND_SALES)
+    columns = [reader.column(SALE_COLUMN_TYPES[name], count) for name in SALE_FIELDS]
+    counts = reader.ints(count)[0].tolist()
+    
+    (total,) = reader.unpack(_U32)
+    book_ids, quantities, prices = (reader.ints(total)[0].astype(np.int64) for _ in range(3))
+    subtotals = quantities * prices
+    titles = reader.strings(total)
+    authors = reader.strings(total)
+    items = zip(book_ids.tolist(), quantities.tolist(), prices.tolist(), subtotals.tolist(), titles, authors)
+    
+    sales = []
+    for row, size in zip(zip(*columns), counts):
+        sale = sale_from_row(row)
+        for item_row in islice(items, size):
+            sale.attach_item(_item_from_row(item_row))
+        sales.append(sale)
+    return sales
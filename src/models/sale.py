@@ -2,20 +2,45 @@
 Modelo de datos para ventas
 """
 
-from dataclasses import dataclass, field
+from dataclasses import field
+from operator import attrgetter
 from typing import Optional, List, Dict
 from datetime import datetime
 
-@dataclass
+from utils.money import format_money, percent_of
+
+from .base import model, row_loader
+
+SALE_ITEM_FIELDS = ('book_id', 'quantity', 'unit_price', 'subtotal')
+
+# Columnas de la tabla sales, en el orden de to_dict() (sin los items)
+SALE_FIELDS = (
+    'id', 'total_amount', 'payment_method', 'customer_name', 'customer_phone',
+    'discount', 'tax', 'sale_date', 'notes'
+)
+
+_item_values = attrgetter(*SALE_ITEM_FIELDS)
+_sale_values = attrgetter(*SALE_FIELDS)
+
+@model
 class SaleItem:
-    """Modelo de datos para un item de venta"""
+    """
+    Modelo de datos para un item de venta (importes en centavos)
+    
+    Dentro de una venta, la cantidad se cambia con los métodos de Sale para
+    que sus totales acumulados sigan al día.
+    """
     
     book_id: int
     quantity: int
-    unit_price: float
+    unit_price: int
+    
+    # Datos para mostrar en el carrito; no se guardan en sale_items
+    title: Optional[str] = field(default=None, compare=False)
+    author: Optional[str] = field(default=None, compare=False)
     
     # Campos calculados
-    subtotal: float = field(init=False)
+    subtotal: int = field(init=False)
     
     def __post_init__(self):
         """Calcula el subtotal después de la inicialización"""
@@ -23,126 +48,229 @@ class SaleItem:
     
     def to_dict(self) -> dict:
         """Convierte el objeto a diccionario"""
-        return {
-            'book_id': self.book_id,
-            'quantity': self.quantity,
-            'unit_price': self.unit_price,
-            'subtotal': self.subtotal
-        }
+        return dict(zip(SALE_ITEM_FIELDS, _item_values(self)))
 
-@dataclass
+@model
 class Sale:
-    """Modelo de datos para una venta"""
+    """
+    Modelo de datos para una venta, usado también como carrito de compras
+    
+    Los items se indexan por book_id: agregar un libro que ya está suma la
+    cantidad a su línea. El subtotal y el número de ejemplares se llevan
+    como totales acumulados que se ajustan en cada cambio, así que
+    consultarlos no recorre los items. total_amount y discount son importes
+    en centavos; tax es un porcentaje.
     
-    # Campos obligatorios
-    total_amount: float
-    items: List[SaleItem]
+    Un carrito puede estar vacío; validate() comprueba la venta antes de
+    registrarla.
+    """
+    
+    # Items por book_id; también acepta una lista de SaleItem
+    items: Dict[int, SaleItem] = field(default_factory=dict)
+    total_amount: int = 0
     
     # Campos opcionales
     id: Optional[int] = None
     payment_method: str = "Efectivo"
     customer_name: Optional[str] = None
     customer_phone: Optional[str] = None
-    discount: float = 0.0
+    discount: int = 0
     tax: float = 0.0
     sale_date: Optional[datetime] = None
     notes: Optional[str] = None
     
+    # Totales acumulados de los items
+    _subtotal: int = field(init=False, default=0, repr=False, compare=False)
+    _total_items: int = field(init=False, default=0, repr=False, compare=False)
+    
     def __post_init__(self):
-        """Validaciones después de la inicialización"""
-        if self.total_amount < 0:
-            raise ValueError("El monto total no puede ser negativo")
+        """Indexa los items por libro, calcula los totales y valida los importes"""
         if self.discount < 0:
             raise ValueError("El descuento no puede ser negativo")
         if self.tax < 0:
             raise ValueError("El impuesto no puede ser negativo")
-        if not self.items:
-            raise ValueError("La venta debe tener al menos un item")
+        
+        items = self.items.values() if isinstance(self.items, dict) else self.items
+        self.items = {}
+        for item in items:
+            self.attach_item(item)
+        
+        # Sin total explícito (carrito) se usa el calculado
+        if not self.total_amount:
+            self.total_amount = self.final_total
+        if self.total_amount < 0:
+            raise ValueError("El monto total no puede ser negativo")
     
     @property
-    def subtotal(self) -> float:
-        """Calcula el subtotal de todos los items"""
-        return sum(item.subtotal for item in self.items)
+    def subtotal(self) -> int:
+        """Subtotal de todos los items"""
+        return self._subtotal
     
     @property
-    def discount_amount(self) -> float:
-        """Calcula el monto del descuento"""
-        return self.subtotal * (self.discount / 100)
+    def discount_amount(self) -> int:
+        """Monto del descuento, sin pasar del subtotal"""
+        return min(self.discount, self._subtotal)
     
     @property
-    def tax_amount(self) -> float:
-        """Calcula el monto del impuesto"""
-        return (self.subtotal - self.discount_amount) * (self.tax / 100)
+    def tax_amount(self) -> int:
+        """Calcula el monto del impuesto, redondeado al centavo"""
+        return percent_of(self._subtotal - self.discount_amount, self.tax)
     
     @property
-    def final_total(self) -> float:
+    def final_total(self) -> int:
         """Calcula el total final"""
-        return self.subtotal - self.discount_amount + self.tax_amount
+        return self._subtotal - self.discount_amount + self.tax_amount
     
     @property
     def total_items(self) -> int:
-        """Calcula el total de items vendidos"""
-        return sum(item.quantity for item in self.items)
-    
-    def add_item(self, book_id: int, quantity: int, unit_price: float):
-        """Agrega un item a la venta"""
-        item = SaleItem(book_id=book_id, quantity=quantity, unit_price=unit_price)
-        self.items.append(item)
-        # Recalcular total
+        """Ejemplares vendidos de todos los items"""
+        return self._total_items
+    
+    def __len__(self) -> int:
+        """Número de libros distintos"""
+        return len(self.items)
+    
+    def __contains__(self, book_id: int) -> bool:
+        return book_id in self.items
+    
+    def _set_quantity(self, item: SaleItem, quantity: int):
+        """Cambia la cantidad de un item ajustando los totales acumulados"""
+        self._total_items += quantity - item.quantity
+        self._subtotal -= item.subtotal
+        item.quantity = quantity
+        item.subtotal = quantity * item.unit_price
+        self._subtotal += item.subtotal
         self.total_amount = self.final_total
     
+    def attach_item(self, item: SaleItem):
+        """
+        Agrega un SaleItem ya construido (por ejemplo, leído de la base)
+        
+        No cambia total_amount: en una venta registrada es el importe guardado.
+        Si el libro ya está, la cantidad se suma a su línea y se valora al
+        precio de esa línea, como en add_item; el subtotal acumulado cambia
+        en lo mismo que la línea.
+        """
+        line = self.items.get(item.book_id)
+        if line is None:
+            self.items[item.book_id] = item
+            self._subtotal += item.subtotal
+        else:
+            previous = line.subtotal
+            line.quantity += item.quantity
+            line.subtotal = line.quantity * line.unit_price
+            self._subtotal += line.subtotal - previous
+        self._total_items += item.quantity
+    
+    def add_item(self, book_id: int, quantity: int, unit_price: int,
+                 title: Optional[str] = None, author: Optional[str] = None) -> SaleItem:
+        """
+        Agrega un libro a la venta; si ya está, suma la cantidad a su línea
+        
+        Args:
+            book_id (int): ID del libro
+            quantity (int): Ejemplares a agregar
+            unit_price (int): Precio unitario en centavos (se conserva el de la línea existente)
+            title (str): Título para mostrar en el carrito
+            author (str): Autor para mostrar en el carrito
+        
+        Returns:
+            SaleItem: Línea del libro con la cantidad acumulada
+        
+        Raises:
+            ValueError: Si la cantidad no es positiva o el precio es negativo
+        """
+        if quantity <= 0:
+            raise ValueError("La cantidad debe ser mayor a 0")
+        if unit_price < 0:
+            raise ValueError("El precio no puede ser negativo")
+        
+        item = self.items.get(book_id)
+        if item is None:
+            item = self.items[book_id] = SaleItem(book_id=book_id, quantity=0, unit_price=unit_price,
+                                                  title=title, author=author)
+        self._set_quantity(item, item.quantity + quantity)
+        return item
+    
     def remove_item(self, book_id: int):
-        """Remueve un item de la venta"""
-        self.items = [item for item in self.items if item.book_id != book_id]
-        # Recalcular total
-        self.total_amount = self.final_total
+        """Remueve un libro de la venta"""
+        item = self.items.pop(book_id, None)
+        if item is not None:
+            self._subtotal -= item.subtotal
+            self._total_items -= item.quantity
+            self.total_amount = self.final_total
     
     def update_item_quantity(self, book_id: int, new_quantity: int):
-        """Actualiza la cantidad de un item"""
-        for item in self.items:
-            if item.book_id == book_id:
-                item.quantity = new_quantity
-                item.subtotal = item.quantity * item.unit_price
-                break
-        # Recalcular total
+        """Actualiza la cantidad de un libro; con 0 o menos lo remueve"""
+        item = self.items.get(book_id)
+        if item is None:
+            return
+        if new_quantity <= 0:
+            self.remove_item(book_id)
+        else:
+            self._set_quantity(item, new_quantity)
+    
+    def set_adjustments(self, discount: int = 0, tax: float = 0.0):
+        """
+        Fija el descuento (centavos) y el impuesto (%) y recalcula el total
+        
+        Raises:
+            ValueError: Si alguno es negativo
+        """
+        if discount < 0:
+            raise ValueError("El descuento no puede ser negativo")
+        if tax < 0:
+            raise ValueError("El impuesto no puede ser negativo")
+        self.discount = discount
+        self.tax = tax
+        self.total_amount = self.final_total
+    
+    def clear(self):
+        """Vacía la venta conservando los datos del cliente"""
+        self.items.clear()
+        self._subtotal = 0
+        self._total_items = 0
         self.total_amount = self.final_total
     
+    def validate(self, max_items: Optional[int] = None):
+        """
+        Comprueba que la venta se pueda registrar
+        
+        Args:
+            max_items (int): Libros distintos permitidos por venta (None = sin límite)
+        
+        Raises:
+            ValueError: Si la venta no tiene items o supera el límite
+        """
+        if not self.items:
+            raise ValueError("La venta debe tener al menos un item")
+        if max_items is not None and len(self.items) > max_items:
+            raise ValueError(f"La venta tiene {len(self.items)} libros distintos; el máximo es {max_items}")
+    
     def to_dict(self) -> dict:
         """Convierte el objeto a diccionario"""
-        return {
-            'id': self.id,
-            'total_amount': self.total_amount,
-            'payment_method': self.payment_method,
-            'customer_name': self.customer_name,
-            'customer_phone': self.customer_phone,
-            'discount': self.discount,
-            'tax': self.tax,
-            'sale_date': self.sale_date,
-            'notes': self.notes,
-            'items': [item.to_dict() for item in self.items]
-        }
+        data = dict(zip(SALE_FIELDS, _sale_values(self)))
+        data['items'] = [item.to_dict() for item in self.items.values()]
+        return data
     
     @classmethod
     def from_dict(cls, data: dict) -> 'Sale':
-        """Crea un objeto Sale desde un diccionario"""
-        items = [SaleItem(**item) for item in data.get('items', [])]
-        return cls(
-            id=data.get('id'),
-            total_amount=data['total_amount'],
-            items=items,
-            payment_method=data.get('payment_method', 'Efectivo'),
-            customer_name=data.get('customer_name'),
-            customer_phone=data.get('customer_phone'),
-            discount=data.get('discount', 0.0),
-            tax=data.get('tax', 0.0),
-            sale_date=data.get('sale_date'),
-            notes=data.get('notes')
-        )
+        """Crea un objeto Sale desde un diccionario (las claves ausentes toman su valor por defecto)"""
+        items = [
+            SaleItem(book_id=item['book_id'], quantity=item['quantity'], unit_price=item['unit_price'])
+            for item in data.get('items', [])
+        ]
+        return cls(items=items, **{name: data[name] for name in SALE_FIELDS if name in data})
     
     def __str__(self) -> str:
         """Representación string de la venta"""
-        return f"Venta #{self.id} - ${self.total_amount:.2f} ({self.total_items} items)"
+        return f"Venta #{self.id} - {format_money(self.total_amount)} ({self.total_items} items)"
     
     def __repr__(self) -> str:
         """Representación para debugging"""
         return f"Sale(id={self.id}, total={self.total_amount}, items={len(self.items)})"
+
+# Modelos desde filas de sale_items y sales en el orden de sus *_FIELDS, sin
+# revalidar; los items de una venta se agregan después con attach_item
+sale_item_from_row = row_loader(SaleItem, SALE_ITEM_FIELDS)
+sale_from_row = row_loader(Sale, SALE_FIELDS)
@@ -0,0 +1,25 @@
+"""
+Fixtures compartidas de las pruebas
+"""
+
+import pytest
+
+from database.db_manager import DatabaseManager
+from src.models import Book
+
+@pytest.fixture
+def db(tmp_path):
+    """Gestor sobre una base nueva en un directorio temporal"""
+    manager = DatabaseManager(str(tmp_path / "bookstore.db"))
+    yield manager
+    manager.close()
+
+@pytest.fixture
+def make_book():
+    """Crea un Book válido con precios en centavos; los campos se pueden reemplazar"""
+    def make(**fields) -> Book:
+        values = dict(title="Rayuela", author="Julio Cortázar", purchase_price=1500,
+                      sale_price=2995, stock_quantity=3)
+        values.update(fields)
+        return Book(**values)
+    return make
@@ -0,0 +1,76 @@
+"""
+Pruebas de la importación de catálogo desde CSV
+"""
+
+import io
+
+import pytest
+
+from database.catalog_import import _parse_number, isbn_digits, read_book_chunks
+from utils.money import to_cents
+
+@pytest.mark.parametrize("text, decimal, cents", [
+    ("29.95", None, 2995),
+    ("29,95", None, 2995),
+    ("$1,200.50", None, 120050),
+    ("1.200,50", None, 120050),
+    ("1.200.000", None, 120000000),
+    ("1,200", ".", 120000),
+    ("1,200", ",", 120),
+    (" 35 ", None, 3500),
+    ("-5,5", None, -550),
+])
+def test_parse_price(text, decimal, cents):
+    assert _parse_number(text, to_cents, decimal) == cents
+
+@pytest.mark.parametrize("text", ["1.200", "1,200"])
+def test_parse_price_rejects_ambiguous_separator(text):
+    with pytest.raises(ValueError, match="ambiguo"):
+        _parse_number(text, to_cents)
+
+@pytest.mark.parametrize("text", ["abc", "1,2,3", "12,34.5", "1.5,3"])
+def test_parse_price_rejects_malformed(text):
+    with pytest.raises(ValueError):
+        _parse_number(text, to_cents, ".")
+
+def test_parse_empty_is_none():
+    assert _parse_number("  ", to_cents) is None
+    assert _parse_number(None, int) is None
+
+def test_isbn_digits():
+    assert isbn_digits("978-84-376 0494-7") == "9788437604947"
+    assert isbn_digits(" - ") is None
+    assert isbn_digits(None) is None
+
+def test_semicolon_file_reads_decimal_comma():
+    source = io.StringIO("título;autor;precio;costo\nRayuela;Cortázar;29,95;12,5\n")
+    (books, errors), = read_book_chunks(source)
+    assert errors == []
+    assert (books[0].sale_price, books[0].purchase_price) == (2995, 1250)
+
+def test_comma_file_reads_thousands():
+    source = io.StringIO('title,author,sale_price\nRayuela,Cortázar,"1,200"\n')
+    (books, errors), = read_book_chunks(source)
+    assert errors == []
+    assert books[0].sale_price == 120000
+
+def test_ambiguous_row_is_reported_not_imported():
+    source = io.StringIO("titulo;autor;precio\nRayuela;Cortázar;1.200\nFicciones;Borges;15\n")
+    (books, errors), = read_book_chunks(source)
+    assert [book.title for book in books] == ["Ficciones"]
+    assert len(errors) == 1 and "Línea 2" in errors[0]
+
+def test_reimport_matches_isbn_without_hyphens(db):
+    db.import_books_csv(io.StringIO("titulo;autor;precio;isbn;stock\nRayuela;Cortázar;29,95;978-84-376;2\n"))
+    result = db.import_books_csv(io.StringIO("titulo;autor;precio;isbn;stock\nRayuela;Cortázar;31,00;97884 376;3\n"))
+    
+    assert (result.inserted, result.updated) == (0, 1)
+    books = db.execute_query("SELECT isbn, sale_price, stock_quantity FROM books")
+    assert books == [{'isbn': '978-84-376', 'sale_price': 3100, 'stock_quantity': 5}]
+
+def test_reimport_keeps_cost_and_condition_when_missing(db):
+    db.import_books_csv(io.StringIO("titulo;autor;precio;costo;condicion;isbn\nRayuela;Cortázar;29,95;12,00;Usado;1\n"))
+    db.import_books_csv(io.StringIO("titulo;autor;precio;isbn\nRayuela;Cortázar;30,00;1\n"))
+    
+    book = db.execute_query("SELECT purchase_price, sale_price, condition FROM books")[0]
+    assert book == {'purchase_price': 1200, 'sale_price': 3000, 'condition': 'Usado'}
@@ -0,0 +1,92 @@
+"""
+Pruebas del formato binario por columnas de libros y ventas
+"""
+
+from datetime import datetime
+
+import pytest
+
+from src.models import Book, BookCatalog, Sale
+from src.models.codec import decode_books, decode_catalog, decode_sales, encode_books, encode_sales
+
+@pytest.fixture
+def books():
+    first = Book(title="Rayuela", author="Julio Cortázar", isbn="978-84-376", genre="Novela",
+                 purchase_price=1500, sale_price=2995, stock_quantity=3, publication_year=1963)
+    first.id = 1
+    first.created_at = datetime(2024, 3, 1, 10, 15, 0, 123456)
+    first.updated_at = "2024-03-02 08:00:00"  # Así lo entrega SQLite
+    second = Book(title="Ficciones ñ ✓", author="Borges", purchase_price=0, sale_price=100_000_000,
+                  stock_quantity=0)
+    second.id = 70000
+    return [first, second]
+
+def test_books_round_trip(books):
+    decoded = decode_books(encode_books(books))
+    
+    assert [book.title for book in decoded] == ["Rayuela", "Ficciones ñ ✓"]
+    assert [book.id for book in decoded] == [1, 70000]
+    assert decoded[1].sale_price == 100_000_000
+    assert (decoded[0].genre, decoded[1].genre) == ("Novela", None)
+    assert (decoded[0].publication_year, decoded[1].publication_year) == (1963, None)
+    assert decoded[1].isbn is None
+
+def test_book_dates_decode_as_datetime(books):
+    decoded = decode_books(encode_books(books))
+    
+    assert decoded[0].created_at == datetime(2024, 3, 1, 10, 15, 0, 123456)
+    assert decoded[0].updated_at == datetime(2024, 3, 2, 8, 0, 0)
+    assert decoded[1].created_at is None
+
+def test_catalog_round_trip(books):
+    catalog = BookCatalog.from_books(books)
+    decoded = decode_catalog(encode_books(catalog))
+    
+    assert len(decoded) == 2
+    assert decoded.column('sale_price').tolist() == [2995, 100_000_000]
+    assert decoded.column('genre').tolist() == ["Novela", None]
+    assert decoded.value('created_at', 0) == datetime(2024, 3, 1, 10, 15, 0, 123456)
+    assert decode_books(encode_books(catalog))[0].title == "Rayuela"
+
+def test_empty_lists_round_trip():
+    assert decode_books(encode_books([])) == []
+    assert decode_sales(encode_sales([])) == []
+
+def test_cart_round_trip():
+    cart = Sale(payment_method="Tarjeta", customer_name="Ana")
+    cart.add_item(1, 2, 2995, title="Rayuela", author="Julio Cortázar")
+    cart.add_item(7, 1, 150, title="Ficciones", author="Borges")
+    cart.set_adjustments(discount=100, tax=16)
+    cart.sale_date = datetime(2024, 3, 5, 18, 30)
+    
+    (decoded,) = decode_sales(encode_sales([cart]))
+    
+    assert decoded.id is None
+    assert decoded.sale_date == datetime(2024, 3, 5, 18, 30)
+    assert (decoded.payment_method, decoded.customer_name) == ("Tarjeta", "Ana")
+    assert (decoded.discount, decoded.tax, decoded.total_amount) == (100, 16, cart.total_amount)
+    assert {book_id: (item.quantity, item.unit_price, item.subtotal, item.title)
+            for book_id, item in decoded.items.items()} == {
+        1: (2, 2995, 5990, "Rayuela"), 7: (1, 150, 150, "Ficciones")
+    }
+    assert (decoded.subtotal, decoded.total_items) == (6140, 3)
+
+def test_sales_keep_their_items_apart():
+    sales = []
+    for count in (3, 0, 1):
+        sale = Sale()
+        for book_id in range(count):
+            sale.add_item(book_id + 1, 1, 100)
+        sales.append(sale)
+    
+    decoded = decode_sales(encode_sales(sales))
+    
+    assert [len(sale) for sale in decoded] == [3, 0, 1]
+
+def test_decode_rejects_wrong_kind(books):
+    with pytest.raises(ValueError):
+        decode_sales(encode_books(books))
+    with pytest.raises(ValueError):
+        decode_books(b"not a payload")
+    with pytest.raises(ValueError):
+        decode_books(encode_books(books)[:-3])
@@ -0,0 +1,127 @@
+"""
+Pruebas de la actualización de una base creada con el esquema original
+"""
+
+import sqlite3
+
+import pytest
+
+from database.db_manager import DatabaseManager
+from database.migrations import get_schema_version, latest_version
+
+# Esquema original: importes en REAL, sin sale_day ni tablas auxiliares
+BASELINE_SCHEMA = """
+    CREATE TABLE books (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        title TEXT NOT NULL,
+        author TEXT NOT NULL,
+        isbn TEXT UNIQUE,
+        genre TEXT,
+        publisher TEXT,
+        publication_year INTEGER,
+        purchase_price REAL NOT NULL,
+        sale_price REAL NOT NULL,
+        stock_quantity INTEGER NOT NULL DEFAULT 0,
+        min_stock INTEGER DEFAULT 5,
+        condition TEXT DEFAULT 'Nuevo',
+        description TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE TABLE sales (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        total_amount REAL NOT NULL,
+        payment_method TEXT DEFAULT 'Efectivo',
+        customer_name TEXT,
+        customer_phone TEXT,
+        discount REAL DEFAULT 0,
+        tax REAL DEFAULT 0,
+        sale_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        notes TEXT
+    );
+    CREATE TABLE sale_items (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        sale_id INTEGER NOT NULL,
+        book_id INTEGER NOT NULL,
+        quantity INTEGER NOT NULL,
+        unit_price REAL NOT NULL,
+        subtotal REAL NOT NULL,
+        FOREIGN KEY (sale_id) REFERENCES sales (id) ON DELETE CASCADE,
+        FOREIGN KEY (book_id) REFERENCES books (id)
+    );
+    CREATE TABLE inventory_movements (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        book_id INTEGER NOT NULL,
+        movement_type TEXT NOT NULL,
+        quantity INTEGER NOT NULL,
+        reason TEXT,
+        reference_id INTEGER,
+        movement_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (book_id) REFERENCES books (id)
+    );
+    CREATE TABLE system_config (
+        key TEXT PRIMARY KEY,
+        value TEXT NOT NULL,
+        description TEXT,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+"""
+
+@pytest.fixture
+def upgraded(tmp_path):
+    """Base con el esquema original y datos en pesos, abierta con el gestor actual"""
+    path = tmp_path / "bookstore.db"
+    conn = sqlite3.connect(path)
+    conn.executescript(BASELINE_SCHEMA)
+    conn.execute("""
+        INSERT INTO books (id, title, author, isbn, purchase_price, sale_price, stock_quantity)
+        VALUES (1, 'Ficciones', 'Jorge Luis Borges', '978-84-1', 10.1, 29.95, 4)
+    """)
+    conn.execute("""
+        INSERT INTO sales (id, total_amount, discount, tax, sale_date)
+        VALUES (1, 59.9, 0.5, 0, '2024-03-05 18:30:00')
+    """)
+    conn.execute("""
+        INSERT INTO sale_items (sale_id, book_id, quantity, unit_price, subtotal)
+        VALUES (1, 1, 2, 29.95, 59.9)
+    """)
+    conn.commit()
+    conn.close()
+    
+    manager = DatabaseManager(str(path))
+    yield manager
+    manager.close()
+
+def test_upgrade_reaches_latest_version(upgraded):
+    with upgraded.get_connection() as conn:
+        assert get_schema_version(conn) == latest_version()
+
+def test_upgrade_converts_money_to_integer_cents(upgraded):
+    book = upgraded.execute_query(
+        "SELECT purchase_price, sale_price, typeof(sale_price) AS kind FROM books WHERE id = 1"
+    )[0]
+    assert book == {'purchase_price': 1010, 'sale_price': 2995, 'kind': 'integer'}
+    
+    sale = upgraded.execute_query("SELECT total_amount, discount FROM sales WHERE id = 1")[0]
+    assert sale == {'total_amount': 5990, 'discount': 50}
+    
+    item = upgraded.execute_query("SELECT unit_price, subtotal FROM sale_items WHERE sale_id = 1")[0]
+    assert item == {'unit_price': 2995, 'subtotal': 5990}
+
+def test_upgrade_backfills_sale_day(upgraded):
+    assert upgraded.execute_query("SELECT sale_day FROM sales WHERE id = 1")[0]['sale_day'] == 20240305
+
+def test_upgraded_schema_keeps_new_rows_in_cents(upgraded, make_book):
+    # Los triggers y columnas recreados siguen funcionando después de la reconstrucción
+    book_id = upgraded.add_book(make_book(isbn="2", sale_price=1250))
+    row = upgraded.execute_query("SELECT sale_price, typeof(sale_price) AS kind FROM books WHERE id = ?", (book_id,))
+    assert row == [{'sale_price': 1250, 'kind': 'integer'}]
+    assert upgraded.search_books("Ficciones")[0]['id'] == 1
+
+def test_upgrade_is_idempotent(upgraded, tmp_path):
+    upgraded.close()
+    again = DatabaseManager(str(tmp_path / "bookstore.db"))
+    try:
+        assert again.execute_query("SELECT sale_price FROM books WHERE id = 1")[0]['sale_price'] == 2995
+    finally:
+        again.close()
@@ -0,0 +1,68 @@
+"""
+Pruebas de la invalidación de la caché de consultas de DatabaseManager
+"""
+
+import sqlite3
+
+from src.models import Sale
+
+BOOK_COUNT = "SELECT COUNT(*) AS n FROM books"
+
+def test_cached_read_is_reused(db, make_book):
+    db.add_book(make_book())
+    db.execute_query(BOOK_COUNT)
+    hits = db.cache_stats()['hits']
+    
+    assert db.execute_query(BOOK_COUNT) == [{'n': 1}]
+    assert db.cache_stats()['hits'] == hits + 1
+
+def test_own_write_invalidates_cached_table(db, make_book):
+    assert db.execute_query(BOOK_COUNT) == [{'n': 0}]
+    
+    db.add_book(make_book())
+    
+    assert db.execute_query(BOOK_COUNT) == [{'n': 1}]
+
+def test_write_to_other_table_keeps_entry(db, make_book):
+    db.add_book(make_book())
+    db.execute_query(BOOK_COUNT)
+    hits = db.cache_stats()['hits']
+    
+    db.execute_update("INSERT INTO inventory_movements (book_id, movement_type, quantity) VALUES (1, 'IN', 1)")
+    
+    assert db.execute_query(BOOK_COUNT) == [{'n': 1}]
+    assert db.cache_stats()['hits'] == hits + 1
+
+def test_trigger_maintained_table_is_invalidated(db, make_book):
+    # La venta escribe sales; el trigger actualiza daily_sales_summary
+    book_id = db.add_book(make_book())
+    query = "SELECT COALESCE(SUM(sale_count), 0) AS n FROM daily_sales_summary"
+    assert db.execute_query(query) == [{'n': 0}]
+    
+    sale = Sale()
+    sale.add_item(book_id, 1, 2995)
+    db.record_sale(sale)
+    
+    assert db.execute_query(query) == [{'n': 1}]
+
+def test_external_write_is_seen(db, tmp_path):
+    assert db.execute_query(BOOK_COUNT) == [{'n': 0}]
+    
+    other = sqlite3.connect(tmp_path / "bookstore.db")
+    other.execute("INSERT INTO books (title, author, purchase_price, sale_price) VALUES ('a', 'b', 1, 2)")
+    other.commit()
+    other.close()
+    
+    assert db.execute_query(BOOK_COUNT) == [{'n': 1}]
+
+def test_external_write_before_own_write_is_not_lost(db, tmp_path):
+    assert db.execute_query(BOOK_COUNT) == [{'n': 0}]
+    
+    other = sqlite3.connect(tmp_path / "bookstore.db")
+    other.execute("INSERT INTO books (title, author, purchase_price, sale_price) VALUES ('a', 'b', 1, 2)")
+    other.commit()
+    other.close()
+    # La escritura propia, en otra tabla, no debe dar por vista la externa
+    db.set_system_config("min_stock_alert", 4)
+    
+    assert db.execute_query(BOOK_COUNT) == [{'n': 1}]
@@ -0,0 +1,54 @@
+"""
+Pruebas de DatabaseManager.record_sale
+"""
+
+import pytest
+
+from src.models import Sale
+
+def _count(db, table: str) -> int:
+    return db.execute_query(f"SELECT COUNT(*) AS n FROM {table}")[0]['n']
+
+def test_record_sale_discounts_stock_and_logs_movements(db, make_book):
+    book_id = db.add_book(make_book(stock_quantity=3))
+    sale = Sale(payment_method="Efectivo")
+    sale.add_item(book_id, 2, 2995)
+    
+    sale_id = db.record_sale(sale)
+    
+    assert sale.id == sale_id
+    assert db.execute_query("SELECT stock_quantity FROM books WHERE id = ?", (book_id,))[0]['stock_quantity'] == 1
+    assert db.execute_query("SELECT total_amount FROM sales WHERE id = ?", (sale_id,))[0]['total_amount'] == 5990
+    movements = db.execute_query(
+        "SELECT movement_type, quantity, reference_id FROM inventory_movements WHERE book_id = ?", (book_id,)
+    )
+    assert movements == [{'movement_type': 'OUT', 'quantity': 2, 'reference_id': sale_id}]
+
+def test_record_sale_rejects_oversell_without_writing(db, make_book):
+    in_stock = db.add_book(make_book(isbn="1", stock_quantity=5))
+    scarce = db.add_book(make_book(isbn="2", title="El Aleph", stock_quantity=1))
+    sale = Sale()
+    sale.add_item(in_stock, 1, 2995)
+    sale.add_item(scarce, 2, 2995)
+    
+    with pytest.raises(ValueError, match="Stock insuficiente.*El Aleph"):
+        db.record_sale(sale)
+    
+    # La transacción completa se deshizo, también el libro que sí tenía stock
+    stock = {row['id']: row['stock_quantity'] for row in db.execute_query("SELECT id, stock_quantity FROM books")}
+    assert stock == {in_stock: 5, scarce: 1}
+    assert _count(db, "sales") == 0
+    assert _count(db, "sale_items") == 0
+    assert _count(db, "inventory_movements") == 0
+
+def test_record_sale_rejects_missing_book(db):
+    sale = Sale()
+    sale.add_item(999, 1, 100)
+    
+    with pytest.raises(ValueError, match="no existe"):
+        db.record_sale(sale)
+    assert _count(db, "sales") == 0
+
+def test_record_sale_rejects_empty_sale(db):
+    with pytest.raises(ValueError):
+        db.record_sale(Sale())
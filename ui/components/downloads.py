@@ -0,0 +1,87 @@
+"""
+Descarga de archivos exportados
+"""
+
+import time
+import uuid
+from pathlib import Path
+from typing import Optional
+
+import streamlit as st
+
+from src.config import EXPORT_CONFIG
+from ui.components.stores import current_store
+
+def remove_old_exports(directory: Path, max_age_hours: float = None) -> int:
+    """
+    Borra las exportaciones más viejas que ``max_age_hours``
+    
+    Quedan las que se informaron por su ruta (demasiado grandes para el
+    navegador) y las que una sesión no llegó a descargar.
+    
+    Returns:
+        int: Archivos borrados
+    """
+    if max_age_hours is None:
+        max_age_hours = EXPORT_CONFIG["max_age_hours"]
+    cutoff = time.time() - max_age_hours * 3600
+    removed = 0
+    for path in directory.iterdir():
+        try:
+            if path.is_file() and path.stat().st_mtime < cutoff:
+                path.unlink()
+                removed += 1
+        except OSError:
+            # Otra sesión lo borró o todavía lo está escribiendo en Windows
+            continue
+    return removed
+
+def export_path(file_name: str, store: Optional[str] = None) -> Path:
+    """
+    Ruta única en la carpeta de exportaciones para un archivo generado desde la interfaz
+    
+    El nombre lleva la tienda y un sufijo aleatorio, de modo que dos
+    sesiones o dos tiendas que exportan lo mismo el mismo día no se pisan
+    el archivo. De paso se borran las exportaciones viejas.
+    
+    Args:
+        file_name (str): Nombre sugerido ("inventario_20240301.csv")
+        store (str): Tienda; la de la sesión si es None
+    
+    Returns:
+        Path: Ruta donde escribir, p. ej. inventario_20240301_principal_<sufijo>.csv
+    """
+    directory = Path(EXPORT_CONFIG["directory"])
+    directory.mkdir(parents=True, exist_ok=True)
+    remove_old_exports(directory)
+    
+    name = Path(file_name)
+    return directory / f"{name.stem}_{store or current_store()}_{uuid.uuid4().hex[:12]}{name.suffix}"
+
+def download_name(path: Path) -> str:
+    """Nombre para el navegador: el de export_path sin el sufijo aleatorio"""
+    return f"{path.stem.rsplit('_', 1)[0]}{path.suffix}"
+
+def offer_download(path: Path, label: str, mime: str):
+    """
+    Ofrece un archivo ya escrito en disco para descargar
+    
+    Se entrega el archivo abierto, no su contenido. Si supera
+    download_max_mb no se carga en el navegador: queda en la carpeta de
+    exportaciones y se muestra su ruta. Si se entrega, el botón ya tiene
+    su copia y el archivo se borra.
+    
+    Args:
+        path (Path): Archivo generado con export_path
+        label (str): Texto del botón
+        mime (str): Tipo MIME del archivo
+    """
+    size_mb = path.stat().st_size / (1024 * 1024)
+    if size_mb > EXPORT_CONFIG["download_max_mb"]:
+        st.info(f"📁 El archivo ({size_mb:,.0f} MB) es demasiado grande para descargarlo desde "
+                f"el navegador; quedó guardado en {path} por {EXPORT_CONFIG['max_age_hours']} horas")
+        return
+    
+    with open(path, "rb") as file:
+        st.download_button(label=label, data=file, file_name=download_name(path), mime=mime)
+    path.unlink(missing_ok=True)
@@ -0,0 +1,29 @@
+"""
+Selección de la tienda activa
+"""
+
+import streamlit as st
+
+from database.db_manager import DatabaseManager, get_db
+from src.config import DEFAULT_STORE, STORES
+
+def current_store() -> str:
+    """Clave de la tienda seleccionada en la sesión"""
+    store = st.session_state.get("store", DEFAULT_STORE)
+    return store if store in STORES else DEFAULT_STORE
+
+def current_db() -> DatabaseManager:
+    """Gestor de base de datos de la tienda seleccionada"""
+    return get_db(current_store())
+
+def store_name(store: str) -> str:
+    """Nombre visible de una tienda"""
+    return STORES[store]["name"]
+
+def store_selector():
+    """Muestra el selector de tienda en la barra lateral si hay más de una"""
+    if len(STORES) < 2:
+        return
+    if st.session_state.get("store") not in STORES:
+        st.session_state.store = DEFAULT_STORE
+    st.sidebar.selectbox("🏪 Tienda", list(STORES), format_func=store_name, key="store")
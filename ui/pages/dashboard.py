@@ -11,27 +11,33 @@ from pathlib import Path
 # Agregar el directorio src al path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
 
-from database.db_manager import db_manager
+from database.db_manager import day_key
+from ui.components.stores import current_db
+from utils.money import format_money, frame_to_units
 
 def show_dashboard():
     """Muestra el dashboard principal minimalista"""
+    db_manager = current_db()
     
     # Header simple y elegante
     st.markdown('<h2 style="text-align: center; color: #2c3e50; font-weight: 300; margin-bottom: 2rem;">Dashboard</h2>', unsafe_allow_html=True)
     
     # Obtener datos para métricas
-    all_books = db_manager.execute_query("SELECT * FROM books")
-    total_books = len(all_books)
-    total_stock = sum(book['stock_quantity'] for book in all_books)
-    low_stock_books = [book for book in all_books if book['stock_quantity'] <= book['min_stock']]
+    catalog = db_manager.get_book_catalog()
+    total_books = len(catalog)
+    total_stock = catalog.total_stock()
+    low_stock_books = catalog.take(catalog.is_low_stock)
     
     # Ventas del día
-    today = date.today().strftime('%Y-%m-%d')
-    today_sales = db_manager.execute_query('''
-        SELECT * FROM sales 
-        WHERE DATE(sale_date) = ?
-    ''', (today,))
-    today_revenue = sum(sale['total_amount'] for sale in today_sales)
+    today = day_key(date.today())
+    today_summary = db_manager.execute_query('''
+        SELECT COALESCE(SUM(sale_count), 0) as sales_count,
+               COALESCE(SUM(revenue), 0) as revenue
+        FROM daily_sales_summary 
+        WHERE sale_day = ?
+    ''', (today,))[0]
+    today_sales_count = today_summary['sales_count']
+    today_revenue = today_summary['revenue']
     
     # Métricas principales en cards minimalistas
     col1, col2, col3, col4 = st.columns(4)
@@ -64,7 +70,7 @@ def show_dashboard():
     with col4:
         st.markdown(f"""
         <div style="background: white; padding: 1.5rem; border-radius: 12px; border: 1px solid #e9ecef; text-align: center; box-shadow: 0 2px 8px rgba(0,0,0,0.06);">
-            <h3 style="color: #f39c12; margin: 0; font-size: 2rem; font-weight: 300;">${today_revenue:,.0f}</h3>
+            <h3 style="color: #f39c12; margin: 0; font-size: 2rem; font-weight: 300;">{format_money(today_revenue, decimals=0)}</h3>
             <p style="color: #6c757d; margin: 0.5rem 0 0 0; font-size: 0.9rem;">Ventas Hoy</p>
         </div>
         """, unsafe_allow_html=True)
@@ -99,13 +105,16 @@ def show_dashboard():
         
         with st.expander("Ver libros con stock bajo"):
             for book in low_stock_books:
-                st.write(f"• **{book['title']}** por {book['author']} - Stock: {book['stock_quantity']} (Mín: {book['min_stock']})")
+                st.write(f"• **{book.title}** por {book.author} - Stock: {book.stock_quantity} (Mín: {book.min_stock})")
     
     # Resumen de libros recientes
     st.subheader("📖 Libros Agregados Recientemente")
-    if all_books:
-        recent_books = sorted(all_books, key=lambda x: x['created_at'], reverse=True)[:5]
-        df_recent = pd.DataFrame(recent_books)
+    if catalog:
+        recent_books = catalog.sort_by('created_at', ascending=False).take(range(min(5, len(catalog))))
+        df_recent = frame_to_units(pd.DataFrame({
+            column: recent_books.column(column)
+            for column in ('title', 'author', 'sale_price', 'stock_quantity')
+        }), ['sale_price'])
         st.dataframe(
             df_recent[['title', 'author', 'sale_price', 'stock_quantity']].rename(columns={
                 'title': 'Título',
@@ -125,11 +134,11 @@ def show_dashboard():
     
     with col1:
         # Distribución por género
-        if all_books:
+        if catalog:
             genre_counts = {}
-            for book in all_books:
-                genre = book['genre'] or 'Sin género'
-                genre_counts[genre] = genre_counts.get(genre, 0) + 1
+            for genre, count in catalog.value_counts('genre').items():
+                genre = genre or 'Sin género'
+                genre_counts[genre] = genre_counts.get(genre, 0) + count
             
             if genre_counts:
                 st.markdown("#### 📚 Libros por Género")
@@ -138,21 +147,21 @@ def show_dashboard():
     
     with col2:
         # Ventas de la última semana
-        week_ago = (date.today() - pd.Timedelta(days=7)).strftime('%Y-%m-%d')
+        week_ago = day_key(date.today() - pd.Timedelta(days=7))
         week_sales = db_manager.execute_query('''
-            SELECT DATE(sale_date) as sale_date, 
-                   COUNT(*) as sales_count,
-                   SUM(total_amount) as daily_revenue
-            FROM sales 
-            WHERE DATE(sale_date) >= ?
-            GROUP BY DATE(sale_date)
-            ORDER BY sale_date
+            SELECT sale_day, 
+                   SUM(sale_count) as sales_count,
+                   SUM(revenue) as daily_revenue
+            FROM daily_sales_summary 
+            WHERE sale_day >= ?
+            GROUP BY sale_day
+            ORDER BY sale_day
         ''', (week_ago,))
         
         if week_sales:
             st.markdown("#### 📈 Ventas de la Última Semana")
-            df_week = pd.DataFrame(week_sales)
-            df_week['sale_date'] = pd.to_datetime(df_week['sale_date'])
+            df_week = frame_to_units(pd.DataFrame(week_sales), ['daily_revenue'])
+            df_week['sale_date'] = pd.to_datetime(df_week['sale_day'].astype(str), format='%Y%m%d')
             st.line_chart(df_week.set_index('sale_date')['daily_revenue'])
         else:
             st.info("No hay ventas en la última semana")
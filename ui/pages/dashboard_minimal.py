@@ -11,27 +11,33 @@ from pathlib import Path
 # Agregar el directorio src al path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
 
-from database.db_manager import db_manager
+from database.db_manager import day_key
+from ui.components.stores import current_db
+from utils.money import format_money, from_cents
 
 def show_dashboard():
     """Muestra el dashboard principal minimalista"""
+    db_manager = current_db()
     
     # Header elegante y simple
     st.markdown('<h2 style="text-align: center; color: #2c3e50; font-weight: 300; margin-bottom: 3rem; letter-spacing: 1px;">Dashboard</h2>', unsafe_allow_html=True)
     
     # Obtener datos esenciales
-    all_books = db_manager.execute_query("SELECT * FROM books")
-    total_books = len(all_books)
-    total_stock = sum(book['stock_quantity'] for book in all_books)
-    low_stock_books = [book for book in all_books if book['stock_quantity'] <= book['min_stock']]
+    catalog = db_manager.get_book_catalog()
+    total_books = len(catalog)
+    total_stock = catalog.total_stock()
+    low_stock_books = catalog.take(catalog.is_low_stock)
     
     # Ventas del día
-    today = date.today().strftime('%Y-%m-%d')
-    today_sales = db_manager.execute_query('''
-        SELECT * FROM sales 
-        WHERE DATE(sale_date) = ?
-    ''', (today,))
-    today_revenue = sum(sale['total_amount'] for sale in today_sales)
+    today = day_key(date.today())
+    today_summary = db_manager.execute_query('''
+        SELECT COALESCE(SUM(sale_count), 0) as sales_count,
+               COALESCE(SUM(revenue), 0) as revenue
+        FROM daily_sales_summary 
+        WHERE sale_day = ?
+    ''', (today,))[0]
+    today_sales_count = today_summary['sales_count']
+    today_revenue = today_summary['revenue']
     
     # Métricas principales en cards minimalistas
     col1, col2, col3, col4 = st.columns(4)
@@ -64,7 +70,7 @@ def show_dashboard():
     with col4:
         st.markdown(f"""
         <div style="background: white; padding: 2rem; border-radius: 16px; border: 1px solid #e9ecef; text-align: center; box-shadow: 0 4px 12px rgba(0,0,0,0.08); transition: all 0.3s ease;">
-            <h2 style="color: #f39c12; margin: 0; font-size: 2.5rem; font-weight: 200;">${today_revenue:,.0f}</h2>
+            <h2 style="color: #f39c12; margin: 0; font-size: 2.5rem; font-weight: 200;">{format_money(today_revenue, decimals=0)}</h2>
             <p style="color: #6c757d; margin: 1rem 0 0 0; font-size: 0.9rem; text-transform: uppercase; letter-spacing: 1px;">Hoy</p>
         </div>
         """, unsafe_allow_html=True)
@@ -102,7 +108,7 @@ def show_dashboard():
         """, unsafe_allow_html=True)
     
     # Resumen de actividad (solo si hay ventas hoy)
-    if today_sales:
+    if today_sales_count:
         st.markdown("<div style='margin: 3rem 0 2rem 0;'></div>", unsafe_allow_html=True)
         st.markdown('<h3 style="text-align: center; color: #2c3e50; font-weight: 300; margin-bottom: 1.5rem; letter-spacing: 1px;">Actividad de Hoy</h3>', unsafe_allow_html=True)
         
@@ -111,16 +117,16 @@ def show_dashboard():
         with col1:
             st.markdown(f"""
             <div style="background: linear-gradient(135deg, #11998e, #38ef7d); border-radius: 12px; padding: 2rem; text-align: center; color: white; box-shadow: 0 4px 12px rgba(17, 153, 142, 0.3);">
-                <h3 style="margin: 0; font-weight: 300; font-size: 2rem;">{len(today_sales)}</h3>
+                <h3 style="margin: 0; font-weight: 300; font-size: 2rem;">{today_sales_count}</h3>
                 <p style="margin: 0.5rem 0 0 0; font-size: 0.9rem; opacity: 0.9;">Ventas Realizadas</p>
             </div>
             """, unsafe_allow_html=True)
         
         with col2:
-            avg_sale = today_revenue / len(today_sales) if today_sales else 0
+            avg_sale = today_revenue // today_sales_count
             st.markdown(f"""
             <div style="background: linear-gradient(135deg, #667eea, #764ba2); border-radius: 12px; padding: 2rem; text-align: center; color: white; box-shadow: 0 4px 12px rgba(102, 126, 234, 0.3);">
-                <h3 style="margin: 0; font-weight: 300; font-size: 2rem;">${avg_sale:.0f}</h3>
+                <h3 style="margin: 0; font-weight: 300; font-size: 2rem;">{format_money(avg_sale, decimals=0)}</h3>
                 <p style="margin: 0.5rem 0 0 0; font-size: 0.9rem; opacity: 0.9;">Venta Promedio</p>
             </div>
             """, unsafe_allow_html=True)
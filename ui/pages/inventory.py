@@ -4,6 +4,8 @@ Página de gestión de inventario
 
 import streamlit as st
 import pandas as pd
+import io
+import sqlite3
 from datetime import datetime
 import sys
 from pathlib import Path
@@ -11,8 +13,68 @@ from pathlib import Path
 # Agregar el directorio src al path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
 
-from database.db_manager import db_manager
+from ui.components.downloads import export_path, offer_download
+from ui.components.stores import current_db
+from database.repositories import BookRepository
 from src.models import Book
+from utils.money import format_money, frame_to_units, to_cents
+
+# Orden SQL equivalente a cada opción de "Ordenar por"
+SORT_COLUMNS = {
+    "Título": "title",
+    "Autor": "author",
+    "Precio": "sale_price DESC",
+    "Stock": "stock_quantity",
+    "Fecha": "created_at DESC"
+}
+
+def get_stock_status(stock: int, min_stock_alert: int = 5) -> str:
+    """Retorna la etiqueta de estado para una cantidad en stock"""
+    if stock == 0:
+        return "❌ Sin stock"
+    elif stock <= min_stock_alert:
+        return "⚠️ Stock bajo"
+    else:
+        return "✅ En stock"
+
+# Misma clasificación que get_stock_status(), calculada por SQLite al exportar;
+# su parámetro es el min_stock_alert de system_config
+STOCK_STATUS_SQL = """
+    CASE WHEN stock_quantity = 0 THEN '❌ Sin stock'
+         WHEN stock_quantity <= ? THEN '⚠️ Stock bajo'
+         ELSE '✅ En stock' END
+"""
+
+def export_inventory_csv(filter_genre: str, filter_condition: str,
+                         show_low_stock: bool, sort_by: str) -> Path:
+    """Escribe el CSV del inventario filtrado en la carpeta de exportaciones, leyendo el cursor por bloques"""
+    db_manager = current_db()
+    conditions = []
+    params = [db_manager.get_system_config("min_stock_alert")]
+    
+    if filter_genre != "Todos":
+        conditions.append("genre = ?")
+        params.append(filter_genre)
+    
+    if filter_condition != "Todos":
+        conditions.append("condition = ?")
+        params.append(filter_condition)
+    
+    if show_low_stock:
+        conditions.append("stock_quantity <= min_stock")
+    
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    
+    # Las filas pasan del cursor al archivo en disco sin DataFrame ni buffers intermedios
+    path = export_path(f"inventario_{datetime.now().strftime('%Y%m%d')}.csv")
+    db_manager.export_query(f'''
+        SELECT title AS "Título", author AS "Autor", genre AS "Género",
+               sale_price / 100.0 AS "Precio", stock_quantity AS "Stock",
+               condition AS "Condición", {STOCK_STATUS_SQL} AS "Estado"
+        FROM books {where}
+        ORDER BY {SORT_COLUMNS[sort_by]}
+    ''', tuple(params), path)
+    return path
 
 def show_inventory_page():
     """Muestra la página de gestión de inventario"""
@@ -21,11 +83,12 @@ def show_inventory_page():
     st.markdown("---")
     
     # Tabs para diferentes acciones
-    tab1, tab2, tab3, tab4 = st.tabs([
+    tab1, tab2, tab3, tab4, tab5 = st.tabs([
         "➕ Agregar Libro", 
         "📋 Lista de Libros", 
         "🔍 Buscar Libros",
-        "📊 Estadísticas"
+        "📊 Estadísticas",
+        "📥 Importar CSV"
     ])
     
     with tab1:
@@ -39,9 +102,13 @@ def show_inventory_page():
     
     with tab4:
         show_inventory_stats()
+    
+    with tab5:
+        show_import_books()
 
 def show_add_book_form():
     """Muestra el formulario para agregar un libro"""
+    db_manager = current_db()
     st.subheader("➕ Agregar Nuevo Libro")
     
     with st.form("add_book_form", clear_on_submit=True):
@@ -63,39 +130,43 @@ def show_add_book_form():
             purchase_price = st.number_input("Precio de Compra (opcional)", min_value=0.0, format="%.2f", help="Puedes dejarlo en 0 si no conoces el precio de compra")
             sale_price = st.number_input("Precio de Venta *", min_value=0.0, format="%.2f")
             stock_quantity = st.number_input("Cantidad en Stock *", min_value=0, value=1)
-            min_stock = st.number_input("Stock Mínimo", min_value=0, value=5)
+            min_stock = st.number_input("Stock Mínimo", min_value=0,
+                                        value=db_manager.get_system_config("min_stock_alert"))
             condition = st.selectbox("Condición", [
                 "Nuevo", "Usado - Como Nuevo", "Usado - Bueno", "Usado - Regular"
             ])
         
         description = st.text_area("Descripción", placeholder="Descripción opcional del libro...")
         
+        # Los precios se capturan en pesos y se guardan en centavos
+        purchase_cents, sale_cents = to_cents(purchase_price), to_cents(sale_price)
+        
         # Mostrar cálculos automáticos
-        if sale_price > 0:
-            total_value = sale_price * stock_quantity
+        if sale_cents > 0:
+            total_value = sale_cents * stock_quantity
             
-            if purchase_price > 0:
-                profit = sale_price - purchase_price
-                margin = (profit / purchase_price) * 100
+            if purchase_cents > 0:
+                profit = sale_cents - purchase_cents
+                margin = (profit / purchase_cents) * 100
                 
                 col_calc1, col_calc2, col_calc3 = st.columns(3)
                 with col_calc1:
-                    st.metric("💰 Ganancia por unidad", f"${profit:.2f}")
+                    st.metric("💰 Ganancia por unidad", format_money(profit))
                 with col_calc2:
                     st.metric("📈 Margen de ganancia", f"{margin:.1f}%")
                 with col_calc3:
-                    st.metric("💎 Valor total stock", f"${total_value:.2f}")
+                    st.metric("💎 Valor total stock", format_money(total_value))
             else:
                 col_calc1, col_calc2 = st.columns(2)
                 with col_calc1:
-                    st.metric("💎 Valor total stock", f"${total_value:.2f}")
+                    st.metric("💎 Valor total stock", format_money(total_value))
                 with col_calc2:
                     st.info("💡 Agrega precio de compra para ver ganancia y margen")
         
         submitted = st.form_submit_button("➕ Agregar Libro", use_container_width=True)
         
         if submitted:
-            if title and author and sale_price > 0:
+            if title and author and sale_cents > 0:
                 try:
                     # Crear objeto Book
                     book = Book(
@@ -105,33 +176,16 @@ def show_add_book_form():
                         genre=genre if genre else None,
                         publisher=publisher if publisher else None,
                         publication_year=publication_year,
-                        purchase_price=purchase_price,
-                        sale_price=sale_price,
+                        purchase_price=purchase_cents,
+                        sale_price=sale_cents,
                         stock_quantity=stock_quantity,
                         min_stock=min_stock,
                         condition=condition,
                         description=description if description else None
                     )
                     
-                    # Insertar en la base de datos
-                    book_id = db_manager.execute_update('''
-                        INSERT INTO books (title, author, isbn, genre, publisher, 
-                                         publication_year, purchase_price, sale_price, 
-                                         stock_quantity, min_stock, condition, description)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    ''', (
-                        book.title, book.author, book.isbn, book.genre, book.publisher,
-                        book.publication_year, book.purchase_price, book.sale_price,
-                        book.stock_quantity, book.min_stock, book.condition, book.description
-                    ))
-                    
-                    # Registrar movimiento de inventario si hay stock
-                    if book.stock_quantity > 0:
-                        db_manager.execute_update('''
-                            INSERT INTO inventory_movements 
-                            (book_id, movement_type, quantity, reason)
-                            VALUES (?, ?, ?, ?)
-                        ''', (book_id, 'IN', book.stock_quantity, 'Stock inicial'))
+                    # Insertar el libro y su movimiento de stock inicial en una sola transacción
+                    book_id = BookRepository(db_manager).add(book, initial_movement=True)
                     
                     st.success(f"✅ Libro agregado exitosamente con ID: {book_id}")
                     st.balloons()
@@ -143,22 +197,23 @@ def show_add_book_form():
 
 def show_books_list():
     """Muestra la lista de libros con filtros"""
+    db_manager = current_db()
     st.subheader("📋 Lista de Libros en Inventario")
     
     # Obtener todos los libros
-    books = db_manager.execute_query("SELECT * FROM books ORDER BY title")
+    books = db_manager.query_frame("SELECT * FROM books ORDER BY title")
     
-    if books:
+    if not books.empty:
         # Filtros
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
             filter_genre = st.selectbox("Filtrar por Género", 
-                ["Todos"] + list(set([book['genre'] for book in books if book['genre']])))
+                ["Todos"] + books['genre'].dropna().unique().tolist())
         
         with col2:
             filter_condition = st.selectbox("Filtrar por Condición",
-                ["Todos"] + list(set([book['condition'] for book in books if book['condition']])))
+                ["Todos"] + books['condition'].dropna().unique().tolist())
         
         with col3:
             sort_by = st.selectbox("Ordenar por", 
@@ -168,48 +223,39 @@ def show_books_list():
             show_low_stock = st.checkbox("Solo stock bajo", value=False)
         
         # Aplicar filtros
-        filtered_books = books.copy()
+        filtered_books = books
         
         if filter_genre != "Todos":
-            filtered_books = [book for book in filtered_books if book['genre'] == filter_genre]
+            filtered_books = filtered_books[filtered_books['genre'] == filter_genre]
         
         if filter_condition != "Todos":
-            filtered_books = [book for book in filtered_books if book['condition'] == filter_condition]
+            filtered_books = filtered_books[filtered_books['condition'] == filter_condition]
         
         if show_low_stock:
-            filtered_books = [book for book in filtered_books if book['stock_quantity'] <= book['min_stock']]
+            filtered_books = filtered_books[filtered_books['stock_quantity'] <= filtered_books['min_stock']]
         
         # Ordenar
         if sort_by == "Título":
-            filtered_books.sort(key=lambda x: x['title'])
+            filtered_books = filtered_books.sort_values('title', kind='stable')
         elif sort_by == "Autor":
-            filtered_books.sort(key=lambda x: x['author'])
+            filtered_books = filtered_books.sort_values('author', kind='stable')
         elif sort_by == "Precio":
-            filtered_books.sort(key=lambda x: x['sale_price'], reverse=True)
+            filtered_books = filtered_books.sort_values('sale_price', ascending=False, kind='stable')
         elif sort_by == "Stock":
-            filtered_books.sort(key=lambda x: x['stock_quantity'])
+            filtered_books = filtered_books.sort_values('stock_quantity', kind='stable')
         elif sort_by == "Fecha":
-            filtered_books.sort(key=lambda x: x['created_at'], reverse=True)
+            filtered_books = filtered_books.sort_values('created_at', ascending=False, kind='stable')
         
         # Mostrar tabla
-        if filtered_books:
-            df = pd.DataFrame(filtered_books)
-            
+        if not filtered_books.empty:
             # Seleccionar y renombrar columnas para mostrar
             display_columns = ['title', 'author', 'genre', 'sale_price', 'stock_quantity', 'condition']
-            display_df = df[display_columns].copy()
+            display_df = frame_to_units(filtered_books[display_columns], ['sale_price']).reset_index(drop=True)
             display_df.columns = ['Título', 'Autor', 'Género', 'Precio', 'Stock', 'Condición']
             
             # Agregar columna de estado de stock
-            def get_stock_status(row):
-                if row['Stock'] == 0:
-                    return "❌ Sin stock"
-                elif row['Stock'] <= 5:  # Asumiendo min_stock de 5
-                    return "⚠️ Stock bajo"
-                else:
-                    return "✅ En stock"
-            
-            display_df['Estado'] = display_df.apply(get_stock_status, axis=1)
+            min_stock_alert = db_manager.get_system_config("min_stock_alert")
+            display_df['Estado'] = display_df['Stock'].apply(get_stock_status, args=(min_stock_alert,))
             
             st.dataframe(display_df, use_container_width=True)
             
@@ -222,13 +268,9 @@ def show_books_list():
             
             with col2:
                 if st.button("📤 Exportar CSV", use_container_width=True):
-                    csv = display_df.to_csv(index=False)
-                    st.download_button(
-                        label="💾 Descargar CSV",
-                        data=csv,
-                        file_name=f"inventario_{datetime.now().strftime('%Y%m%d')}.csv",
-                        mime="text/csv"
-                    )
+                    csv_path = export_inventory_csv(filter_genre, filter_condition,
+                                                    show_low_stock, sort_by)
+                    offer_download(csv_path, "💾 Descargar CSV", "text/csv")
             
             with col3:
                 if st.button("🔄 Actualizar", use_container_width=True):
@@ -242,6 +284,7 @@ def show_books_list():
 
 def show_search_books():
     """Muestra la funcionalidad de búsqueda de libros"""
+    db_manager = current_db()
     st.subheader("🔍 Buscar Libros")
     
     # Barra de búsqueda
@@ -249,11 +292,7 @@ def show_search_books():
     
     if search_query:
         # Realizar búsqueda
-        search_results = db_manager.execute_query('''
-            SELECT * FROM books 
-            WHERE title LIKE ? OR author LIKE ? OR isbn LIKE ?
-            ORDER BY title
-        ''', (f"%{search_query}%", f"%{search_query}%", f"%{search_query}%"))
+        search_results = db_manager.search_books(search_query, limit=100)
         
         if search_results:
             st.success(f"Se encontraron {len(search_results)} resultado(s)")
@@ -270,8 +309,8 @@ def show_search_books():
                         st.write(f"**Condición:** {book['condition']}")
                     
                     with col2:
-                        st.write(f"**Precio de compra:** ${book['purchase_price']:.2f}")
-                        st.write(f"**Precio de venta:** ${book['sale_price']:.2f}")
+                        st.write(f"**Precio de compra:** {format_money(book['purchase_price'])}")
+                        st.write(f"**Precio de venta:** {format_money(book['sale_price'])}")
                         st.write(f"**Stock actual:** {book['stock_quantity']}")
                         st.write(f"**Stock mínimo:** {book['min_stock']}")
                         
@@ -309,19 +348,23 @@ def show_search_books():
 
 def show_inventory_stats():
     """Muestra estadísticas del inventario"""
+    db_manager = current_db()
     st.subheader("📊 Estadísticas del Inventario")
     
     # Obtener datos
-    books = db_manager.execute_query("SELECT * FROM books")
+    books = db_manager.query_frame("SELECT * FROM books")
     
-    if books:
+    if not books.empty:
         # Métricas principales
         col1, col2, col3, col4 = st.columns(4)
         
+        stock_value = books['sale_price'] * books['stock_quantity']
+        low_stock_mask = books['stock_quantity'] <= books['min_stock']
+        
         total_books = len(books)
-        total_stock = sum(book['stock_quantity'] for book in books)
-        total_value = sum(book['sale_price'] * book['stock_quantity'] for book in books)
-        low_stock_count = len([book for book in books if book['stock_quantity'] <= book['min_stock']])
+        total_stock = int(books['stock_quantity'].sum())
+        total_value = int(stock_value.sum())
+        low_stock_count = int(low_stock_mask.sum())
         
         with col1:
             st.metric("📚 Total Libros", total_books)
@@ -330,7 +373,7 @@ def show_inventory_stats():
             st.metric("📦 Stock Total", total_stock)
         
         with col3:
-            st.metric("💰 Valor Total", f"${total_value:,.2f}")
+            st.metric("💰 Valor Total", format_money(total_value))
         
         with col4:
             st.metric("⚠️ Stock Bajo", low_stock_count)
@@ -342,48 +385,84 @@ def show_inventory_stats():
         
         with col1:
             # Distribución por género
-            genre_counts = {}
-            for book in books:
-                genre = book['genre'] or 'Sin género'
-                genre_counts[genre] = genre_counts.get(genre, 0) + 1
+            genre_counts = books['genre'].astype(object).fillna('Sin género').value_counts(sort=False)
             
-            if genre_counts:
+            if not genre_counts.empty:
                 st.subheader("📊 Libros por Género")
-                genre_df = pd.DataFrame(list(genre_counts.items()), columns=['Género', 'Cantidad'])
+                genre_df = genre_counts.rename_axis('Género').reset_index(name='Cantidad')
                 st.bar_chart(genre_df.set_index('Género'))
         
         with col2:
             # Distribución por condición
-            condition_counts = {}
-            for book in books:
-                condition = book['condition'] or 'Sin condición'
-                condition_counts[condition] = condition_counts.get(condition, 0) + 1
+            condition_counts = books['condition'].astype(object).fillna('Sin condición').value_counts(sort=False)
             
-            if condition_counts:
+            if not condition_counts.empty:
                 st.subheader("📊 Libros por Condición")
-                condition_df = pd.DataFrame(list(condition_counts.items()), columns=['Condición', 'Cantidad'])
+                condition_df = condition_counts.rename_axis('Condición').reset_index(name='Cantidad')
                 st.bar_chart(condition_df.set_index('Condición'))
         
         # Tabla de libros con stock bajo
         if low_stock_count > 0:
             st.subheader("⚠️ Libros con Stock Bajo")
-            low_stock_books = [book for book in books if book['stock_quantity'] <= book['min_stock']]
-            
-            low_stock_df = pd.DataFrame(low_stock_books)
             display_columns = ['title', 'author', 'stock_quantity', 'min_stock', 'sale_price']
-            display_df = low_stock_df[display_columns].copy()
+            display_df = frame_to_units(books.loc[low_stock_mask, display_columns], ['sale_price']).reset_index(drop=True)
             display_df.columns = ['Título', 'Autor', 'Stock Actual', 'Stock Mínimo', 'Precio']
             
             st.dataframe(display_df, use_container_width=True)
         
         # Top 5 libros más valiosos
         st.subheader("💎 Top 5 Libros Más Valiosos")
-        books_with_value = [(book, book['sale_price'] * book['stock_quantity']) for book in books]
-        books_with_value.sort(key=lambda x: x[1], reverse=True)
+        top_books = books.assign(value=stock_value).nlargest(5, 'value', keep='first')
         
-        top_books = books_with_value[:5]
-        for i, (book, value) in enumerate(top_books, 1):
-            st.write(f"{i}. **{book['title']}** - ${value:,.2f} (Stock: {book['stock_quantity']})")
+        for i, book in enumerate(top_books.itertuples(index=False), 1):
+            st.write(f"{i}. **{book.title}** - {format_money(book.value)} (Stock: {book.stock_quantity})")
     
     else:
         st.info("No hay libros en el inventario para mostrar estadísticas.")
+
+def show_import_books():
+    """Muestra la importación masiva de libros desde un CSV"""
+    db_manager = current_db()
+    st.subheader("📥 Importar Catálogo desde CSV")
+    st.caption(
+        "Columnas obligatorias: título, autor y precio de venta. Opcionales: ISBN, género, "
+        "editorial, año, precio de compra, stock, stock mínimo, condición y descripción. "
+        "Los libros con un ISBN ya registrado se actualizan."
+    )
+    
+    uploaded_file = st.file_uploader("Archivo CSV", type=["csv", "txt"], key="import_csv")
+    replace_stock = st.checkbox(
+        "Reemplazar el stock actual por el del archivo",
+        help="Si no se marca, las cantidades del archivo se suman al stock existente"
+    )
+    
+    if uploaded_file is not None and st.button("📥 Importar", use_container_width=True):
+        progress_bar = st.progress(0.0)
+        status = st.empty()
+        total_size = uploaded_file.size or 1
+        
+        def report(result):
+            progress_bar.progress(min(uploaded_file.tell() / total_size, 1.0))
+            status.text(f"{result.rows} filas procesadas...")
+        
+        try:
+            source = io.TextIOWrapper(uploaded_file, encoding='utf-8-sig', newline='')
+            result = db_manager.import_books_csv(source, replace_stock=replace_stock, progress=report)
+        except (ValueError, UnicodeDecodeError) as e:
+            st.error(f"❌ No se pudo importar el archivo: {str(e)}")
+            return
+        except sqlite3.Error as e:
+            # Cada bloque se confirma por separado: los anteriores al error quedan guardados
+            st.error(f"❌ Error de base de datos durante la importación: {str(e)}. "
+                     "Los bloques ya procesados quedaron guardados.")
+            return
+        
+        progress_bar.progress(1.0)
+        status.empty()
+        st.success(f"✅ {result.inserted} libros nuevos y {result.updated} actualizados")
+        
+        if result.errors:
+            st.warning(f"⚠️ {result.skipped} fila(s) no se importaron")
+            with st.expander("Ver errores"):
+                for error in result.errors[:100]:
+                    st.write(f"• {error}")
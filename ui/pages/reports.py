@@ -13,20 +13,83 @@ from pathlib import Path
 # Agregar el directorio src al path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
 
-from database.db_manager import db_manager
+from database.db_manager import day_range
+from ui.components.downloads import export_path, offer_download
+from ui.components.stores import current_db, current_store, store_name
+from database.export import DATASETS, EXPORT_FORMATS, export_filename
+from database import federation
+from src.config import STORES
+from utils.money import format_money, frame_to_units
+
+# Valor del selector de alcance que consolida todas las tiendas
+ALL_STORES = "__all__"
+
+def report_stores():
+    """Tiendas a consolidar, o None si el reporte es solo de la tienda actual"""
+    if len(STORES) > 1 and st.session_state.get("report_scope") == ALL_STORES:
+        return list(STORES)
+    return None
+
+def report_totals(query: str, params=()) -> dict:
+    """Fila de totales de la tienda actual o suma de las de todas las tiendas"""
+    stores = report_stores()
+    if stores is not None:
+        return federation.federated_totals(query, params, stores)
+    rows = current_db().execute_query(query, params, analytics=True)
+    # Copia: la fila es compartida con la caché de consultas
+    return dict(rows[0]) if rows else {}
+
+def report_frame(query: str, params=(), dtypes=None, by=None, sums=(), first=(),
+                 sort_by=None, ascending=False, limit=None):
+    """
+    Ejecuta una consulta de reporte en la tienda actual o en todas
+    
+    Las consultas con ``limit`` terminan en ``LIMIT ?``: en una sola tienda
+    se limita en SQL; al consolidar, cada tienda devuelve todo (LIMIT -1) y
+    el límite se aplica después de combinar por ``by``. Sin ``by`` las filas
+    de las tiendas solo se juntan, ordenadas por ``sort_by``, y se agrega la
+    columna ``store``.
+    """
+    params = tuple(params)
+    stores = report_stores()
+    if stores is None:
+        if limit:
+            params += (limit,)
+        return current_db().query_frame(query, params, dtypes=dtypes, analytics=True)
+    
+    if limit:
+        params += (-1,)
+    frame = federation.federated_frame(query, params, stores, dtypes=dtypes)
+    if by is None:
+        if federation.STORE_COLUMN in frame.columns:
+            frame[federation.STORE_COLUMN] = frame[federation.STORE_COLUMN].map(store_name)
+        if sort_by and sort_by in frame.columns:
+            frame = frame.sort_values(sort_by, ascending=ascending, ignore_index=True)
+        return frame
+    return federation.merge_partials(frame, by, sums, first, sort_by, ascending, limit)
 
 def show_reports_page():
     """Muestra la página de reportes y análisis"""
     
     st.header("📊 Dashboard de Reportes")
+    
+    if len(STORES) > 1:
+        st.radio(
+            "Alcance",
+            [current_store(), ALL_STORES],
+            format_func=lambda scope: "🏬 Todas las tiendas" if scope == ALL_STORES else f"🏪 {store_name(scope)}",
+            horizontal=True,
+            key="report_scope"
+        )
     st.markdown("---")
     
     # Tabs para diferentes tipos de reportes
-    tab1, tab2, tab3, tab4 = st.tabs([
+    tab1, tab2, tab3, tab4, tab5 = st.tabs([
         "📈 Resumen General", 
         "💰 Análisis de Ventas", 
         "📚 Inventario",
-        "🎯 Rendimiento"
+        "🎯 Rendimiento",
+        "📤 Exportar Datos"
     ])
     
     with tab1:
@@ -40,6 +103,9 @@ def show_reports_page():
     
     with tab4:
         show_performance_analysis()
+    
+    with tab5:
+        show_data_export()
 
 def show_general_summary():
     """Muestra el resumen general del negocio"""
@@ -54,17 +120,16 @@ def show_general_summary():
     
     if start_date <= end_date:
         # Obtener métricas principales
-        sales_data = db_manager.execute_query('''
-            SELECT COUNT(*) as total_sales, 
-                   COALESCE(SUM(total_amount), 0) as total_revenue,
-                   COALESCE(SUM(discount), 0) as total_discounts,
-                   COALESCE(AVG(total_amount), 0) as avg_sale
-            FROM sales 
-            WHERE DATE(sale_date) BETWEEN ? AND ?
-        ''', (start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d')))
+        sales_metrics = report_totals('''
+            SELECT COALESCE(SUM(sale_count), 0) as total_sales, 
+                   COALESCE(SUM(revenue), 0) as total_revenue,
+                   COALESCE(SUM(discounts), 0) as total_discounts
+            FROM daily_sales_summary 
+            WHERE sale_day >= ? AND sale_day < ?
+        ''', day_range(start_date, end_date))
         
         # Obtener datos de inventario
-        inventory_data = db_manager.execute_query('''
+        inventory_metrics = report_totals('''
             SELECT COUNT(*) as total_books,
                    COALESCE(SUM(stock_quantity), 0) as total_stock,
                    COALESCE(SUM(sale_price * stock_quantity), 0) as inventory_value,
@@ -72,9 +137,10 @@ def show_general_summary():
             FROM books
         ''')
         
-        if sales_data and inventory_data:
-            sales_metrics = sales_data[0]
-            inventory_metrics = inventory_data[0]
+        if sales_metrics and inventory_metrics:
+            # El promedio se calcula de los totales para que valga también al consolidar
+            avg_sale = (sales_metrics['total_revenue'] // sales_metrics['total_sales']
+                        if sales_metrics['total_sales'] else 0)
             
             # Mostrar métricas principales
             col1, col2, col3, col4 = st.columns(4)
@@ -82,7 +148,7 @@ def show_general_summary():
             with col1:
                 st.metric(
                     "💰 Ingresos Totales", 
-                    f"${sales_metrics['total_revenue']:,.2f}",
+                    format_money(sales_metrics['total_revenue']),
                     help="Ingresos totales en el período seleccionado"
                 )
             
@@ -96,14 +162,14 @@ def show_general_summary():
             with col3:
                 st.metric(
                     "📊 Venta Promedio", 
-                    f"${sales_metrics['avg_sale']:,.2f}",
+                    format_money(avg_sale),
                     help="Valor promedio por venta"
                 )
             
             with col4:
                 st.metric(
                     "🎁 Descuentos Dados", 
-                    f"${sales_metrics['total_discounts']:,.2f}",
+                    format_money(sales_metrics['total_discounts']),
                     help="Total de descuentos aplicados"
                 )
             
@@ -129,7 +195,7 @@ def show_general_summary():
             with col3:
                 st.metric(
                     "💎 Valor Inventario", 
-                    f"${inventory_metrics['inventory_value']:,.2f}",
+                    format_money(inventory_metrics['inventory_value']),
                     help="Valor total del inventario"
                 )
             
@@ -141,22 +207,21 @@ def show_general_summary():
                 )
             
             # Gráfico de ventas por día
-            daily_sales = db_manager.execute_query('''
-                SELECT DATE(sale_date) as date, 
-                       COUNT(*) as sales_count,
-                       SUM(total_amount) as daily_revenue
-                FROM sales 
-                WHERE DATE(sale_date) BETWEEN ? AND ?
-                GROUP BY DATE(sale_date)
-                ORDER BY date
-            ''', (start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d')))
+            df_daily = report_frame('''
+                SELECT printf('%04d-%02d-%02d', sale_day / 10000, sale_day / 100 % 100, sale_day % 100) as date, 
+                       SUM(sale_count) as sales_count,
+                       SUM(revenue) as daily_revenue
+                FROM daily_sales_summary 
+                WHERE sale_day >= ? AND sale_day < ?
+                GROUP BY sale_day
+                ORDER BY sale_day
+            ''', day_range(start_date, end_date), dtypes={'date': 'datetime64[ns]'},
+                by=['date'], sums=['sales_count', 'daily_revenue'], sort_by='date', ascending=True)
             
-            if daily_sales:
+            if not df_daily.empty:
                 st.markdown("### 📈 Tendencia de Ventas Diarias")
-                df_daily = pd.DataFrame(daily_sales)
-                df_daily['date'] = pd.to_datetime(df_daily['date'])
                 
-                fig = px.line(df_daily, x='date', y='daily_revenue', 
+                fig = px.line(frame_to_units(df_daily, ['daily_revenue']), x='date', y='daily_revenue', 
                              title='Ingresos por Día',
                              labels={'daily_revenue': 'Ingresos ($)', 'date': 'Fecha'})
                 fig.update_layout(height=400)
@@ -178,27 +243,27 @@ def show_sales_analysis():
     
     if start_date <= end_date:
         # Libros más vendidos
-        top_books = db_manager.execute_query('''
+        df_top = report_frame('''
             SELECT b.title, b.author, b.sale_price,
                    SUM(si.quantity) as total_sold,
                    SUM(si.subtotal) as total_revenue,
                    COUNT(DISTINCT s.id) as num_sales
-            FROM sale_items si
+            FROM all_sale_items si
             JOIN books b ON si.book_id = b.id
-            JOIN sales s ON si.sale_id = s.id
-            WHERE DATE(s.sale_date) BETWEEN ? AND ?
+            JOIN all_sales s ON si.sale_id = s.id
+            WHERE s.sale_day >= ? AND s.sale_day < ?
             GROUP BY b.id
             ORDER BY total_sold DESC
-            LIMIT 10
-        ''', (start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d')))
+            LIMIT ?
+        ''', day_range(start_date, end_date), by=['title', 'author'], first=['sale_price'],
+            sums=['total_sold', 'total_revenue', 'num_sales'], sort_by='total_sold', limit=10)
         
-        if top_books:
+        if not df_top.empty:
             st.markdown("### 🏆 Libros Más Vendidos")
             
-            df_top = pd.DataFrame(top_books)
             df_top.columns = ['Título', 'Autor', 'Precio', 'Cantidad Vendida', 'Ingresos', 'Num. Ventas']
-            df_top['Precio'] = df_top['Precio'].apply(lambda x: f"${x:.2f}")
-            df_top['Ingresos'] = df_top['Ingresos'].apply(lambda x: f"${x:.2f}")
+            df_top['Precio'] = df_top['Precio'].apply(format_money)
+            df_top['Ingresos'] = df_top['Ingresos'].apply(format_money)
             
             st.dataframe(df_top, use_container_width=True)
             
@@ -210,20 +275,21 @@ def show_sales_analysis():
             st.plotly_chart(fig, use_container_width=True)
         
         # Análisis por método de pago
-        payment_analysis = db_manager.execute_query('''
+        df_payment = report_frame('''
             SELECT payment_method, 
-                   COUNT(*) as num_sales,
-                   SUM(total_amount) as total_revenue
-            FROM sales 
-            WHERE DATE(sale_date) BETWEEN ? AND ?
+                   SUM(sale_count) as num_sales,
+                   SUM(revenue) as total_revenue
+            FROM daily_sales_summary 
+            WHERE sale_day >= ? AND sale_day < ?
             GROUP BY payment_method
             ORDER BY total_revenue DESC
-        ''', (start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d')))
+        ''', day_range(start_date, end_date), by=['payment_method'],
+            sums=['num_sales', 'total_revenue'], sort_by='total_revenue')
         
-        if payment_analysis:
+        if not df_payment.empty:
             st.markdown("### 💳 Análisis por Método de Pago")
             
-            df_payment = pd.DataFrame(payment_analysis)
+            df_payment = frame_to_units(df_payment, ['total_revenue'])
             df_payment.columns = ['Método de Pago', 'Número de Ventas', 'Ingresos Totales']
             
             col1, col2 = st.columns(2)
@@ -245,18 +311,19 @@ def show_inventory_analysis():
     st.subheader("📚 Análisis de Inventario")
     
     # Libros con stock bajo
-    low_stock = db_manager.execute_query('''
+    df_low = report_frame('''
         SELECT title, author, stock_quantity, min_stock, sale_price
         FROM books 
         WHERE stock_quantity <= min_stock
         ORDER BY stock_quantity ASC
-    ''')
+    ''', sort_by='stock_quantity', ascending=True)
     
-    if low_stock:
+    if not df_low.empty:
         st.markdown("### ⚠️ Libros con Stock Bajo")
-        df_low = pd.DataFrame(low_stock)
-        df_low.columns = ['Título', 'Autor', 'Stock Actual', 'Stock Mínimo', 'Precio']
-        df_low['Precio'] = df_low['Precio'].apply(lambda x: f"${x:.2f}")
+        # Al consolidar, cada fila indica la tienda que debe reabastecer
+        df_low.columns = ['Título', 'Autor', 'Stock Actual', 'Stock Mínimo', 'Precio'] + \
+            (['Tienda'] if len(df_low.columns) > 5 else [])
+        df_low['Precio'] = df_low['Precio'].apply(format_money)
         
         st.dataframe(df_low, use_container_width=True)
         
@@ -266,7 +333,7 @@ def show_inventory_analysis():
         st.success("✅ Todos los libros tienen stock suficiente")
     
     # Distribución por género
-    genre_distribution = db_manager.execute_query('''
+    df_genre = report_frame('''
         SELECT genre, 
                COUNT(*) as num_books,
                SUM(stock_quantity) as total_stock,
@@ -274,45 +341,111 @@ def show_inventory_analysis():
         FROM books 
         GROUP BY genre
         ORDER BY total_value DESC
-    ''')
+    ''', by=['genre'], sums=['num_books', 'total_stock', 'total_value'], sort_by='total_value')
     
-    if genre_distribution:
+    if not df_genre.empty:
         st.markdown("### 📖 Distribución por Género")
         
-        df_genre = pd.DataFrame(genre_distribution)
         df_genre.columns = ['Género', 'Número de Títulos', 'Stock Total', 'Valor Total']
         
         col1, col2 = st.columns(2)
         
         with col1:
             # Gráfico de barras
-            fig_genre = px.bar(df_genre, x='Género', y='Valor Total',
+            fig_genre = px.bar(frame_to_units(df_genre, ['Valor Total']), x='Género', y='Valor Total',
                               title='Valor del Inventario por Género')
             fig_genre.update_layout(height=400)
             st.plotly_chart(fig_genre, use_container_width=True)
         
         with col2:
-            df_genre['Valor Total'] = df_genre['Valor Total'].apply(lambda x: f"${x:.2f}")
+            df_genre['Valor Total'] = df_genre['Valor Total'].apply(format_money)
             st.dataframe(df_genre, use_container_width=True)
     
     # Libros más valiosos
-    valuable_books = db_manager.execute_query('''
+    df_valuable = report_frame('''
         SELECT title, author, sale_price, stock_quantity,
                (sale_price * stock_quantity) as total_value
         FROM books 
         ORDER BY total_value DESC
-        LIMIT 10
-    ''')
+        LIMIT ?
+    ''', by=['title', 'author'], first=['sale_price'], sums=['stock_quantity', 'total_value'],
+        sort_by='total_value', limit=10)
     
-    if valuable_books:
+    if not df_valuable.empty:
         st.markdown("### 💎 Libros Más Valiosos (por valor total en stock)")
         
-        df_valuable = pd.DataFrame(valuable_books)
         df_valuable.columns = ['Título', 'Autor', 'Precio Unit.', 'Stock', 'Valor Total']
-        df_valuable['Precio Unit.'] = df_valuable['Precio Unit.'].apply(lambda x: f"${x:.2f}")
-        df_valuable['Valor Total'] = df_valuable['Valor Total'].apply(lambda x: f"${x:.2f}")
+        df_valuable['Precio Unit.'] = df_valuable['Precio Unit.'].apply(format_money)
+        df_valuable['Valor Total'] = df_valuable['Valor Total'].apply(format_money)
         
         st.dataframe(df_valuable, use_container_width=True)
+    
+    show_inventory_valuation()
+
+def show_inventory_valuation():
+    """Muestra el valor del inventario al cierre de cada mes y a una fecha dada"""
+    st.markdown("### 📈 Valor del Inventario en el Tiempo")
+    st.caption("Calculado con el historial de movimientos de inventario y los precios actuales")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        since = st.date_input("Desde", value=date.today().replace(day=1) - timedelta(days=365), key="valuation_start")
+    with col2:
+        as_of = st.date_input("Inventario al", value=date.today(), key="valuation_as_of")
+    
+    stores = report_stores()
+    if stores is None:
+        db_manager = current_db()
+        monthly = db_manager.stock_valuation_by_month(since, analytics=True)
+        stock = db_manager.inventory_as_of(as_of, analytics=True)
+    else:
+        monthly = federation.merge_rows(
+            federation.run_on_stores(lambda db: db.stock_valuation_by_month(since, analytics=True), stores),
+            by=['closing_date'], sums=['units', 'cost_value', 'retail_value'],
+            sort_by='closing_date', ascending=True
+        )
+        stock = federation.merge_rows(
+            federation.run_on_stores(lambda db: db.inventory_as_of(as_of, analytics=True), stores),
+            by=['title', 'author'], sums=['stock_quantity', 'cost_value', 'retail_value'],
+            sort_by='title', ascending=True
+        )
+    
+    if monthly:
+        df_monthly = frame_to_units(pd.DataFrame(monthly), ['cost_value', 'retail_value'])
+        df_monthly['closing_date'] = pd.to_datetime(df_monthly['closing_date'])
+        
+        fig = px.line(df_monthly, x='closing_date', y=['cost_value', 'retail_value'],
+                      title='Valor del Inventario al Cierre de Cada Mes',
+                      labels={'closing_date': 'Cierre de Mes', 'value': 'Valor ($)', 'variable': 'Valuación'})
+        fig.update_layout(height=400)
+        st.plotly_chart(fig, use_container_width=True)
+    else:
+        st.info("📭 Aún no hay meses cerrados con movimientos de inventario")
+    
+    if stock:
+        df_stock = pd.DataFrame(stock)
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("📦 Unidades", int(df_stock['stock_quantity'].sum()))
+        with col2:
+            st.metric("💵 Valor a Costo", format_money(df_stock['cost_value'].sum()))
+        with col3:
+            st.metric("💎 Valor a Precio de Venta", format_money(df_stock['retail_value'].sum()))
+        
+        display_df = frame_to_units(
+            df_stock[['title', 'author', 'stock_quantity', 'cost_value', 'retail_value']],
+            ['cost_value', 'retail_value']
+        ).rename(columns={
+            'title': 'Título',
+            'author': 'Autor',
+            'stock_quantity': 'Stock',
+            'cost_value': 'Valor a Costo',
+            'retail_value': 'Valor a Precio de Venta'
+        })
+        st.dataframe(display_df, use_container_width=True)
+    else:
+        st.info(f"📭 No hay stock registrado al {as_of.strftime('%d/%m/%Y')}")
 
 def show_performance_analysis():
     """Muestra análisis de rendimiento"""
@@ -327,38 +460,40 @@ def show_performance_analysis():
     
     if start_date <= end_date:
         # Análisis de ganancias (solo para libros con precio de compra)
-        profit_analysis = db_manager.execute_query('''
+        df_profit = report_frame('''
             SELECT b.title, b.author, b.purchase_price, b.sale_price,
                    (b.sale_price - b.purchase_price) as profit_per_unit,
                    SUM(si.quantity) as units_sold,
                    SUM(si.quantity * (b.sale_price - b.purchase_price)) as total_profit
-            FROM sale_items si
+            FROM all_sale_items si
             JOIN books b ON si.book_id = b.id
-            JOIN sales s ON si.sale_id = s.id
-            WHERE DATE(s.sale_date) BETWEEN ? AND ?
+            JOIN all_sales s ON si.sale_id = s.id
+            WHERE s.sale_day >= ? AND s.sale_day < ?
               AND b.purchase_price > 0
             GROUP BY b.id
             ORDER BY total_profit DESC
-            LIMIT 10
-        ''', (start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d')))
+            LIMIT ?
+        ''', day_range(start_date, end_date), by=['title', 'author'],
+            first=['purchase_price', 'sale_price', 'profit_per_unit'],
+            sums=['units_sold', 'total_profit'], sort_by='total_profit', limit=10)
         
-        if profit_analysis:
+        if not df_profit.empty:
             st.markdown("### 💰 Libros Más Rentables")
             st.info("💡 Solo se muestran libros con precio de compra registrado")
             
-            df_profit = pd.DataFrame(profit_analysis)
+            # Ganancia total del período antes de formatear las columnas
+            total_profit = int(df_profit['total_profit'].sum())
+            
             df_profit.columns = ['Título', 'Autor', 'Precio Compra', 'Precio Venta', 
                                'Ganancia/Unidad', 'Unidades Vendidas', 'Ganancia Total']
             
             # Formatear precios
             for col in ['Precio Compra', 'Precio Venta', 'Ganancia/Unidad', 'Ganancia Total']:
-                df_profit[col] = df_profit[col].apply(lambda x: f"${x:.2f}")
+                df_profit[col] = df_profit[col].apply(format_money)
             
             st.dataframe(df_profit, use_container_width=True)
             
-            # Calcular ganancia total del período
-            total_profit = sum([float(row['total_profit']) for row in profit_analysis])
-            st.metric("🎯 Ganancia Total del Período", f"${total_profit:.2f}")
+            st.metric("🎯 Ganancia Total del Período", format_money(total_profit))
         
         else:
             st.warning("⚠️ No hay datos de ganancias disponibles. Asegúrate de registrar el precio de compra de los libros.")
@@ -368,21 +503,19 @@ def show_performance_analysis():
         previous_start = start_date - timedelta(days=days_diff + 1)
         previous_end = start_date - timedelta(days=1)
         
-        current_period = db_manager.execute_query('''
-            SELECT COUNT(*) as sales, SUM(total_amount) as revenue
-            FROM sales 
-            WHERE DATE(sale_date) BETWEEN ? AND ?
-        ''', (start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d')))
+        current = report_totals('''
+            SELECT COALESCE(SUM(sale_count), 0) as sales, SUM(revenue) as revenue
+            FROM daily_sales_summary 
+            WHERE sale_day >= ? AND sale_day < ?
+        ''', day_range(start_date, end_date))
         
-        previous_period = db_manager.execute_query('''
-            SELECT COUNT(*) as sales, SUM(total_amount) as revenue
-            FROM sales 
-            WHERE DATE(sale_date) BETWEEN ? AND ?
-        ''', (previous_start.strftime('%Y-%m-%d'), previous_end.strftime('%Y-%m-%d')))
+        previous = report_totals('''
+            SELECT COALESCE(SUM(sale_count), 0) as sales, SUM(revenue) as revenue
+            FROM daily_sales_summary 
+            WHERE sale_day >= ? AND sale_day < ?
+        ''', day_range(previous_start, previous_end))
         
-        if current_period and previous_period:
-            current = current_period[0]
-            previous = previous_period[0]
+        if current and previous:
             
             st.markdown("### 📊 Comparación con Período Anterior")
             
@@ -404,9 +537,41 @@ def show_performance_analysis():
                 
                 st.metric(
                     "Ingresos vs Período Anterior",
-                    f"${current['revenue'] or 0:.2f}",
-                    delta=f"${revenue_change:.2f} ({revenue_pct:+.1f}%)"
+                    format_money(current['revenue']),
+                    delta=f"{format_money(revenue_change)} ({revenue_pct:+.1f}%)"
                 )
     
     else:
         st.error("La fecha de inicio debe ser anterior a la fecha de fin")
+
+def show_data_export():
+    """Exporta ventas, movimientos o inventario a CSV o Parquet bajo pedido"""
+    db_manager = current_db()
+    st.markdown("### 📤 Exportar Datos")
+    st.caption("El archivo se genera solo al presionar el botón, leyendo la base por bloques")
+    
+    dataset = st.selectbox("Datos a exportar", list(DATASETS),
+                           format_func=lambda name: DATASETS[name]["label"], key="export_dataset")
+    
+    start = end = None
+    if DATASETS[dataset]["range"] is not None:
+        col1, col2 = st.columns(2)
+        with col1:
+            start = st.date_input("Desde", value=date.today() - timedelta(days=30), key="export_start")
+        with col2:
+            end = st.date_input("Hasta", value=date.today(), key="export_end")
+    
+    fmt = st.radio("Formato", EXPORT_FORMATS, format_func=str.upper, horizontal=True, key="export_format")
+    
+    if st.button("📦 Preparar exportación", use_container_width=True):
+        # Se escribe por bloques en la carpeta de exportaciones; la descarga entrega el archivo
+        path = export_path(export_filename(dataset, fmt, start, end))
+        try:
+            rows = db_manager.export_dataset(dataset, path, fmt, start, end, analytics=True)
+        except RuntimeError as e:
+            st.error(f"❌ {e}")
+            return
+        
+        st.success(f"✅ {rows:,} filas exportadas")
+        offer_download(path, f"💾 Descargar {fmt.upper()}",
+                       "text/csv" if fmt == "csv" else "application/octet-stream")
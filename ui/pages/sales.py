@@ -11,8 +11,15 @@ from pathlib import Path
 # Agregar el directorio src al path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
 
-from database.db_manager import db_manager
-from src.models import Sale, SaleItem
+from database.db_manager import day_range
+from database.repositories import BookRepository, SaleRepository
+from ui.components.stores import current_db
+from src.models import Sale
+from src.models.codec import decode_sales, encode_sales
+from utils.money import format_money, frame_to_units, to_cents
+
+# Ventas por página en el historial
+HISTORY_PAGE_SIZE = 200
 
 def show_sales_page():
     """Muestra la página de gestión de ventas"""
@@ -20,9 +27,9 @@ def show_sales_page():
     st.header("💰 Gestión de Ventas")
     st.markdown("---")
     
-    # Inicializar carrito en session_state
-    if 'cart' not in st.session_state:
-        st.session_state.cart = []
+    # El carrito es la propia venta, indexada por libro
+    if not isinstance(st.session_state.get('cart'), Sale):
+        st.session_state.cart = Sale()
     
     # Tabs para diferentes acciones
     tab1, tab2, tab3 = st.tabs([
@@ -42,6 +49,8 @@ def show_sales_page():
 
 def show_new_sale():
     """Muestra la interfaz para crear una nueva venta"""
+    db_manager = current_db()
+    cart: Sale = st.session_state.cart
     st.subheader("🛒 Nueva Venta")
     
     col1, col2 = st.columns([2, 1])
@@ -53,95 +62,83 @@ def show_new_sale():
         search_product = st.text_input("Buscar libro para agregar:", placeholder="Título, autor o ISBN")
         
         if search_product:
-            search_results = db_manager.execute_query('''
-                SELECT * FROM books 
-                WHERE (title LIKE ? OR author LIKE ? OR isbn LIKE ?) 
-                AND stock_quantity > 0
-                ORDER BY title
-            ''', (f"%{search_product}%", f"%{search_product}%", f"%{search_product}%"))
+            search_results = BookRepository(db_manager).search(search_product, limit=20, in_stock_only=True)
             
             if search_results:
                 for book in search_results:
                     col_book, col_qty, col_btn = st.columns([3, 1, 1])
                     
                     with col_book:
-                        st.write(f"**{book['title']}** - {book['author']}")
-                        st.write(f"Precio: ${book['sale_price']:.2f} | Stock: {book['stock_quantity']}")
+                        st.write(f"**{book.title}** - {book.author}")
+                        st.write(f"Precio: {format_money(book.sale_price)} | Stock: {book.stock_quantity}")
                     
                     with col_qty:
-                        qty_key = f"qty_{book['id']}"
-                        quantity = st.number_input("Cant.", min_value=1, max_value=book['stock_quantity'], 
+                        qty_key = f"qty_{book.id}"
+                        quantity = st.number_input("Cant.", min_value=1, max_value=book.stock_quantity, 
                                                  key=qty_key, value=1)
                     
                     with col_btn:
-                        if st.button(f"➕", key=f"add_{book['id']}"):
-                            # Verificar si el libro ya está en el carrito
-                            existing_item = next((item for item in st.session_state.cart 
-                                                if item['book_id'] == book['id']), None)
-                            
-                            if existing_item:
-                                existing_item['quantity'] += quantity
-                                existing_item['subtotal'] = existing_item['quantity'] * existing_item['unit_price']
+                        if st.button(f"➕", key=f"add_{book.id}"):
+                            max_items = db_manager.get_system_config("max_items_per_sale")
+                            if book.id not in cart and len(cart) >= max_items:
+                                st.warning(f"⚠️ Una venta admite hasta {max_items} libros distintos")
                             else:
-                                st.session_state.cart.append({
-                                    'book_id': book['id'],
-                                    'title': book['title'],
-                                    'author': book['author'],
-                                    'unit_price': book['sale_price'],
-                                    'quantity': quantity,
-                                    'subtotal': book['sale_price'] * quantity
-                                })
-                            
-                            st.success(f"✅ {book['title']} agregado al carrito")
-                            st.rerun()
+                                # Si el libro ya está en el carrito se suma a su línea
+                                cart.add_item(book.id, quantity, book.sale_price,
+                                              title=book.title, author=book.author)
+                                st.success(f"✅ {book.title} agregado al carrito")
+                                st.rerun()
             else:
                 st.warning("No se encontraron libros disponibles")
         
         # Mostrar carrito
         st.markdown("#### 🛒 Carrito de Compras")
         
-        if st.session_state.cart:
-            total_cart = 0
-            items_to_remove = []
+        if cart:
+            remove_book = None
             
-            for i, item in enumerate(st.session_state.cart):
+            for book_id, item in list(cart.items.items()):
                 col_item, col_qty, col_price, col_remove = st.columns([3, 1, 1, 1])
                 
                 with col_item:
-                    st.write(f"**{item['title']}**")
-                    st.write(f"por {item['author']}")
+                    st.write(f"**{item.title}**")
+                    st.write(f"por {item.author}")
                 
                 with col_qty:
-                    new_qty = st.number_input("Cantidad", min_value=1, value=item['quantity'], key=f"cart_qty_{i}")
-                    if new_qty != item['quantity']:
-                        item['quantity'] = new_qty
-                        item['subtotal'] = item['unit_price'] * new_qty
+                    # La clave incluye la cantidad para que el campo refleje lo agregado después
+                    new_qty = st.number_input("Cantidad", min_value=1, value=item.quantity,
+                                              key=f"cart_qty_{book_id}_{item.quantity}")
+                    if new_qty != item.quantity:
+                        cart.update_item_quantity(book_id, new_qty)
                 
                 with col_price:
-                    st.write(f"${item['unit_price']:.2f}")
-                    st.write(f"**${item['subtotal']:.2f}**")
+                    st.write(format_money(item.unit_price))
+                    st.write(f"**{format_money(item.subtotal)}**")
                 
                 with col_remove:
-                    if st.button("🗑️", key=f"remove_{i}"):
-                        items_to_remove.append(i)
-                
-                total_cart += item['subtotal']
+                    if st.button("🗑️", key=f"remove_{book_id}"):
+                        remove_book = book_id
             
-            # Remover items marcados
-            for i in reversed(items_to_remove):
-                st.session_state.cart.pop(i)
+            # Remover el item marcado
+            if remove_book is not None:
+                cart.remove_item(remove_book)
                 st.rerun()
             
             st.markdown("---")
-            st.markdown(f"#### 💰 Total: ${total_cart:.2f}")
+            st.markdown(f"#### 💰 Total: {format_money(cart.subtotal)}")
+            
+            # Traspaso a otra terminal: el carrito en el formato binario del POS
+            st.download_button("📤 Exportar carrito", data=encode_sales([cart]),
+                               file_name="carrito.posb", mime="application/octet-stream")
             
         else:
             st.info("El carrito está vacío. Busca y agrega libros para vender.")
+            show_cart_import()
     
     with col2:
         st.markdown("#### 💳 Finalizar Venta")
         
-        if st.session_state.cart:
+        if cart:
             with st.form("complete_sale"):
                 customer_name = st.text_input("Nombre del Cliente (opcional)")
                 customer_phone = st.text_input("Teléfono del Cliente (opcional)")
@@ -161,20 +158,24 @@ def show_new_sale():
                 
                 notes = st.text_area("Notas adicionales")
                 
-                # Calcular totales
-                subtotal = sum(item['subtotal'] for item in st.session_state.cart)
-                
-                # Aplicar descuento (asegurar que no sea mayor al subtotal)
-                actual_discount = min(discount_amount, subtotal)
-                total_amount = subtotal - actual_discount
+                # Aplicar descuento (asegurar que no sea mayor al subtotal) e
+                # IVA configurado en system_config (0% en comercio informal)
+                tax_rate = db_manager.get_system_config("tax_rate", 0.0)
+                cart.set_adjustments(discount=min(to_cents(discount_amount), cart.subtotal), tax=tax_rate)
+                actual_discount = cart.discount_amount
+                tax_amount = cart.tax_amount
+                total_amount = cart.total_amount
                 
                 st.markdown("#### 📋 Resumen:")
-                st.write(f"Subtotal: ${subtotal:.2f}")
+                st.write(f"Subtotal: {format_money(cart.subtotal)}")
                 
                 if actual_discount > 0:
-                    st.write(f"Descuento: -${actual_discount:.2f}")
+                    st.write(f"Descuento: -{format_money(actual_discount)}")
+                
+                if tax_amount > 0:
+                    st.write(f"IVA ({tax_rate:g}%): {format_money(tax_amount)}")
                 
-                st.write(f"**Total: ${total_amount:.2f}**")
+                st.write(f"**Total: {format_money(total_amount)}**")
                 
                 if st.form_submit_button("🎯 Completar Venta", use_container_width=True):
                     try:
@@ -183,50 +184,26 @@ def show_new_sale():
                         
                         # Agregar información del descuento a las notas
                         if actual_discount > 0:
-                            sale_notes += f" | Descuento aplicado: ${actual_discount:.2f}"
+                            sale_notes += f" | Descuento aplicado: {format_money(actual_discount)}"
                         
-                        sale_id = db_manager.execute_update('''
-                            INSERT INTO sales (total_amount, payment_method, customer_name,
-                                             customer_phone, discount, tax, notes)
-                            VALUES (?, ?, ?, ?, ?, ?, ?)
-                        ''', (
-                            total_amount, payment_method, customer_name if customer_name else None,
-                            customer_phone if customer_phone else None, actual_discount, 0.0,
-                            sale_notes
-                        ))
+                        cart.payment_method = payment_method
+                        cart.customer_name = customer_name if customer_name else None
+                        cart.customer_phone = customer_phone if customer_phone else None
+                        cart.notes = sale_notes
                         
-                        # Agregar items de la venta
-                        for item in st.session_state.cart:
-                            db_manager.execute_update('''
-                                INSERT INTO sale_items (sale_id, book_id, quantity, unit_price, subtotal)
-                                VALUES (?, ?, ?, ?, ?)
-                            ''', (sale_id, item['book_id'], item['quantity'], 
-                                  item['unit_price'], item['subtotal']))
-                            
-                            # Actualizar stock del libro
-                            db_manager.execute_update('''
-                                UPDATE books SET stock_quantity = stock_quantity - ?
-                                WHERE id = ?
-                            ''', (item['quantity'], item['book_id']))
-                            
-                            # Registrar movimiento de inventario
-                            db_manager.execute_update('''
-                                INSERT INTO inventory_movements 
-                                (book_id, movement_type, quantity, reason, reference_id)
-                                VALUES (?, ?, ?, ?, ?)
-                            ''', (item['book_id'], 'OUT', item['quantity'], 
-                                  f'Venta #{sale_id}', sale_id))
+                        # Registrar venta, items, stock y movimientos en una sola transacción
+                        sale_id = SaleRepository(db_manager).add(cart)
                         
                         st.success(f"🎉 ¡Venta completada exitosamente! ID: {sale_id}")
                         st.balloons()
                         
-                        # Limpiar carrito
-                        st.session_state.cart = []
+                        # Nuevo carrito vacío
+                        st.session_state.cart = Sale()
                         
                         # Mostrar resumen de la venta
                         st.markdown("#### 📋 Resumen de la Venta:")
                         st.write(f"**ID de Venta:** {sale_id}")
-                        st.write(f"**Total:** ${total_amount:.2f}")
+                        st.write(f"**Total:** {format_money(total_amount)}")
                         st.write(f"**Método de Pago:** {payment_method}")
                         if customer_name:
                             st.write(f"**Cliente:** {customer_name}")
@@ -238,8 +215,28 @@ def show_new_sale():
         else:
             st.info("Agrega productos al carrito para completar una venta")
 
+def show_cart_import():
+    """Carga un carrito exportado desde otra terminal"""
+    uploaded_file = st.file_uploader("Carrito de otra terminal", type=["posb"], key="import_cart")
+    
+    if uploaded_file is not None and st.button("📥 Cargar carrito"):
+        try:
+            sales = decode_sales(uploaded_file.getvalue())
+        except ValueError as e:
+            st.error(f"❌ No se pudo leer el carrito: {str(e)}")
+            return
+        
+        if len(sales) != 1 or not sales[0]:
+            st.error("❌ El archivo no contiene un carrito con libros")
+            return
+        
+        # Los precios son los del carrito original; el stock se revisa al registrar la venta
+        st.session_state.cart = sales[0]
+        st.rerun()
+
 def show_sales_history():
     """Muestra el historial de ventas"""
+    db_manager = current_db()
     st.subheader("📋 Historial de Ventas")
     
     # Filtros de fecha
@@ -250,43 +247,55 @@ def show_sales_history():
         end_date = st.date_input("Fecha de Fin", value=date.today())
     
     if start_date <= end_date:
-        # Obtener ventas del período
-        sales = db_manager.execute_query('''
-            SELECT s.*, COUNT(si.id) as total_items
-            FROM sales s
-            LEFT JOIN sale_items si ON s.id = si.sale_id
-            WHERE DATE(s.sale_date) BETWEEN ? AND ?
-            GROUP BY s.id
-            ORDER BY s.sale_date DESC
-        ''', (start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d')))
+        # Métricas del período calculadas en la base de datos
+        summary = db_manager.execute_query('''
+            SELECT COUNT(*) as total_sales,
+                   COALESCE(SUM(total_amount), 0) as total_revenue,
+                   (SELECT COUNT(*) FROM sale_items si
+                    JOIN sales s ON s.id = si.sale_id
+                    WHERE s.sale_day >= ? AND s.sale_day < ?) as total_items
+            FROM sales
+            WHERE sale_day >= ? AND sale_day < ?
+        ''', day_range(start_date, end_date) * 2)[0]
         
-        if sales:
+        if summary['total_sales']:
             # Mostrar métricas
             col1, col2, col3, col4 = st.columns(4)
             
-            total_sales = len(sales)
-            total_revenue = sum(sale['total_amount'] for sale in sales)
-            avg_sale = total_revenue / total_sales if total_sales > 0 else 0
-            total_items = sum(sale['total_items'] for sale in sales)
+            total_sales = summary['total_sales']
+            total_revenue = summary['total_revenue']
+            avg_sale = total_revenue // total_sales if total_sales > 0 else 0
+            total_items = summary['total_items']
             
             with col1:
                 st.metric("🛒 Total Ventas", total_sales)
             
             with col2:
-                st.metric("💰 Ingresos", f"${total_revenue:,.2f}")
+                st.metric("💰 Ingresos", format_money(total_revenue))
             
             with col3:
-                st.metric("📊 Venta Promedio", f"${avg_sale:.2f}")
+                st.metric("📊 Venta Promedio", format_money(avg_sale))
             
             with col4:
                 st.metric("📦 Total Items", total_items)
             
             st.markdown("---")
             
-            # Tabla de ventas
-            df = pd.DataFrame(sales)
+            # Tabla de ventas por páginas: solo la página visible pasa a memoria
+            pages = max(1, -(-total_sales // HISTORY_PAGE_SIZE))
+            page = st.number_input(f"Página (de {pages}, {HISTORY_PAGE_SIZE} ventas por página)",
+                                   min_value=1, max_value=pages, value=1) if pages > 1 else 1
+            
+            df = pd.DataFrame(db_manager.execute_query('''
+                SELECT s.id, s.sale_date, s.total_amount, s.payment_method, s.customer_name,
+                       (SELECT COUNT(*) FROM sale_items si WHERE si.sale_id = s.id) as total_items
+                FROM sales s
+                WHERE s.sale_day >= ? AND s.sale_day < ?
+                ORDER BY s.sale_date DESC, s.id DESC
+                LIMIT ? OFFSET ?
+            ''', day_range(start_date, end_date) + (HISTORY_PAGE_SIZE, (page - 1) * HISTORY_PAGE_SIZE)))
             display_columns = ['id', 'sale_date', 'total_amount', 'payment_method', 'customer_name', 'total_items']
-            display_df = df[display_columns].copy()
+            display_df = frame_to_units(df[display_columns], ['total_amount'])
             display_df.columns = ['ID', 'Fecha', 'Total', 'Método de Pago', 'Cliente', 'Items']
             display_df['Fecha'] = pd.to_datetime(display_df['Fecha']).dt.strftime('%Y-%m-%d %H:%M')
             display_df = display_df.fillna('-')
@@ -295,23 +304,22 @@ def show_sales_history():
             
             # Botón para ver detalles
             selected_sale = st.selectbox("Seleccionar venta para ver detalles:", 
-                                       [f"Venta #{sale['id']} - ${sale['total_amount']:.2f}" for sale in sales])
+                                       [f"Venta #{sale_id} - {format_money(total)}" for sale_id, total in zip(df['id'], df['total_amount'])])
             
             if selected_sale:
                 sale_id = int(selected_sale.split('#')[1].split(' ')[0])
                 
-                # Obtener detalles de la venta
-                sale_details = db_manager.execute_query('''
-                    SELECT si.*, b.title, b.author
-                    FROM sale_items si
-                    JOIN books b ON si.book_id = b.id
-                    WHERE si.sale_id = ?
-                ''', (sale_id,))
+                # Obtener la venta con sus items, con título y autor de cada libro
+                sale = SaleRepository(db_manager, books=BookRepository(db_manager)).get(sale_id)
                 
-                if sale_details:
+                if sale is not None and sale.items:
                     st.markdown("#### 📋 Detalles de la Venta")
-                    details_df = pd.DataFrame(sale_details)
-                    display_details = details_df[['title', 'author', 'quantity', 'unit_price', 'subtotal']].copy()
+                    details_df = pd.DataFrame(
+                        [(item.title, item.author, item.quantity, item.unit_price, item.subtotal)
+                         for item in sale.items.values()],
+                        columns=['title', 'author', 'quantity', 'unit_price', 'subtotal']
+                    )
+                    display_details = frame_to_units(details_df, ['unit_price', 'subtotal'])
                     display_details.columns = ['Título', 'Autor', 'Cantidad', 'Precio Unit.', 'Subtotal']
                     
                     st.dataframe(display_details, use_container_width=True)
@@ -323,6 +331,7 @@ def show_sales_history():
 
 def show_sales_stats():
     """Muestra estadísticas de ventas"""
+    db_manager = current_db()
     st.subheader("📊 Estadísticas de Ventas")
     
     # Filtros de fecha
@@ -337,10 +346,10 @@ def show_sales_stats():
         summary = db_manager.execute_query('''
             SELECT COUNT(*) as total_sales, 
                    COALESCE(SUM(total_amount), 0) as total_revenue,
-                   COALESCE(AVG(total_amount), 0) as avg_sale
+                   COALESCE(SUM(total_amount) / COUNT(*), 0) as avg_sale
             FROM sales 
-            WHERE DATE(sale_date) BETWEEN ? AND ?
-        ''', (start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d')))
+            WHERE sale_day >= ? AND sale_day < ?
+        ''', day_range(start_date, end_date))
         
         if summary:
             summary_data = summary[0]
@@ -349,13 +358,13 @@ def show_sales_stats():
             col1, col2, col3 = st.columns(3)
             
             with col1:
-                st.metric("💰 Ingresos Totales", f"${summary_data['total_revenue']:,.2f}")
+                st.metric("💰 Ingresos Totales", format_money(summary_data['total_revenue']))
             
             with col2:
                 st.metric("🛒 Total de Ventas", summary_data['total_sales'])
             
             with col3:
-                st.metric("📊 Venta Promedio", f"${summary_data['avg_sale']:,.2f}")
+                st.metric("📊 Venta Promedio", format_money(summary_data['avg_sale']))
             
             # Libros más vendidos
             top_books = db_manager.execute_query('''
@@ -363,11 +372,11 @@ def show_sales_stats():
                 FROM sale_items si
                 JOIN books b ON si.book_id = b.id
                 JOIN sales s ON si.sale_id = s.id
-                WHERE DATE(s.sale_date) BETWEEN ? AND ?
+                WHERE s.sale_day >= ? AND s.sale_day < ?
                 GROUP BY b.id
                 ORDER BY total_sold DESC
                 LIMIT 10
-            ''', (start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d')))
+            ''', day_range(start_date, end_date))
             
             if top_books:
                 st.markdown("#### 📚 Libros Más Vendidos")
@@ -382,19 +391,19 @@ def show_sales_stats():
             
             # Ventas por día
             daily_sales = db_manager.execute_query('''
-                SELECT DATE(sale_date) as sale_date, 
+                SELECT DATE(MIN(sale_date)) as sale_date, 
                        COUNT(*) as sales_count,
                        SUM(total_amount) as daily_revenue
                 FROM sales 
-                WHERE DATE(sale_date) BETWEEN ? AND ?
-                GROUP BY DATE(sale_date)
-                ORDER BY sale_date
-            ''', (start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d')))
+                WHERE sale_day >= ? AND sale_day < ?
+                GROUP BY sale_day
+                ORDER BY sale_day
+            ''', day_range(start_date, end_date))
             
             if daily_sales:
                 st.markdown("#### 📈 Ventas por Día")
                 
-                df_daily = pd.DataFrame(daily_sales)
+                df_daily = frame_to_units(pd.DataFrame(daily_sales), ['daily_revenue'])
                 df_daily['sale_date'] = pd.to_datetime(df_daily['sale_date'])
                 
                 col1, col2 = st.columns(2)
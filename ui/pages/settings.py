@@ -0,0 +1,196 @@
+"""
+Página de configuración y diagnóstico del sistema
+"""
+
+import streamlit as st
+import pandas as pd
+import sys
+from pathlib import Path
+
+# Agregar el directorio src al path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from ui.components.stores import current_db
+from src.config import DATABASE_CONFIG
+
+def show_settings_page():
+    """Muestra la página de configuración del sistema"""
+    
+    st.header("⚙️ Configuración del Sistema")
+    st.markdown("---")
+    
+    tab1, tab2, tab3, tab4 = st.tabs([
+        "🏪 Negocio",
+        "⏱️ Rendimiento de Consultas",
+        "🐢 Consultas Lentas",
+        "🗄️ Base de Datos"
+    ])
+    
+    with tab1:
+        show_business_config()
+    
+    with tab2:
+        show_query_stats()
+    
+    with tab3:
+        show_slow_queries()
+    
+    with tab4:
+        show_database_info()
+
+def show_business_config():
+    """Permite editar la configuración de negocio guardada en system_config"""
+    db_manager = current_db()
+    st.subheader("🏪 Configuración del Negocio")
+    
+    config = db_manager.system_config()
+    with st.form("business_config"):
+        col1, col2 = st.columns(2)
+        with col1:
+            currency = st.text_input("Moneda", value=config["currency"])
+            currency_symbol = st.text_input("Símbolo de moneda", value=config["currency_symbol"])
+            tax_rate = st.number_input("IVA (%)", min_value=0.0, max_value=100.0,
+                                       value=float(config["tax_rate"]), step=1.0)
+        with col2:
+            min_stock_alert = st.number_input("Stock mínimo para alertas", min_value=0,
+                                              value=int(config["min_stock_alert"]))
+            max_items_per_sale = st.number_input("Libros distintos por venta", min_value=1,
+                                                 value=int(config["max_items_per_sale"]))
+        
+        if st.form_submit_button("💾 Guardar", use_container_width=True):
+            values = {
+                "currency": currency,
+                "currency_symbol": currency_symbol,
+                "tax_rate": tax_rate,
+                "min_stock_alert": min_stock_alert,
+                "max_items_per_sale": max_items_per_sale
+            }
+            for key, value in values.items():
+                if value != config[key]:
+                    db_manager.set_system_config(key, value)
+            st.success("✅ Configuración guardada")
+
+def show_query_stats():
+    """Muestra el tiempo acumulado, filas y llamadas de cada sentencia"""
+    db_manager = current_db()
+    st.subheader("⏱️ Rendimiento de Consultas")
+    
+    profiling = st.checkbox("Perfilar consultas", value=db_manager.profiling,
+                            help="Mide cada sentencia y guarda su plan; agrega trabajo a cada consulta")
+    if profiling != db_manager.profiling:
+        db_manager.set_profiling(profiling)
+    
+    stats = db_manager.profiler_stats()
+    if not stats:
+        st.info("📭 Aún no hay consultas registradas (o el perfilado está desactivado)")
+        return
+    
+    df_stats = pd.DataFrame(stats)
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("🔢 Sentencias Distintas", len(df_stats))
+    with col2:
+        st.metric("📞 Ejecuciones", int(df_stats['calls'].sum()))
+    with col3:
+        st.metric("🔍 Con Escaneo Completo", int(df_stats['full_scan'].sum()))
+    
+    display_df = df_stats[[
+        'sql', 'calls', 'total_ms', 'avg_ms', 'max_ms', 'rows', 'slow_calls', 'full_scan'
+    ]].rename(columns={
+        'sql': 'Sentencia',
+        'calls': 'Llamadas',
+        'total_ms': 'Total (ms)',
+        'avg_ms': 'Promedio (ms)',
+        'max_ms': 'Máximo (ms)',
+        'rows': 'Filas',
+        'slow_calls': 'Lentas',
+        'full_scan': 'Escaneo Completo'
+    }).round(2)
+    st.dataframe(display_df, use_container_width=True)
+    
+    cache = db_manager.cache_stats()
+    if cache:
+        st.caption(
+            f"Caché de consultas: {cache['entries']}/{cache['max_entries']} entradas, "
+            f"{cache['hit_rate']:.0%} de aciertos ({cache['hits']} aciertos, {cache['misses']} fallos)"
+        )
+    
+    if st.button("🧹 Reiniciar Estadísticas"):
+        db_manager.reset_profiler()
+        st.rerun()
+
+def show_slow_queries():
+    """Muestra las consultas que superaron el umbral con su plan de ejecución"""
+    db_manager = current_db()
+    st.subheader("🐢 Consultas Lentas")
+    st.caption(f"Umbral: {DATABASE_CONFIG.get('slow_query_ms', 100)} ms")
+    
+    slow = db_manager.slow_queries()
+    if not slow:
+        st.success("✅ No se han registrado consultas lentas")
+        return
+    
+    for entry in slow:
+        icon = "🔴" if entry['full_scan'] else "🟡"
+        title = f"{icon} {entry['time_ms']:.1f} ms · {entry['rows']} filas · {entry['timestamp'].strftime('%H:%M:%S')}"
+        with st.expander(title):
+            st.code(entry['sql'], language="sql")
+            if entry['params']:
+                st.write(f"**Parámetros:** {entry['params']}")
+            if entry['plan']:
+                st.write("**EXPLAIN QUERY PLAN:**")
+                st.code("\n".join(entry['plan']))
+
+def show_database_info():
+    """Muestra el tamaño y número de registros de la base de datos"""
+    db_manager = current_db()
+    st.subheader("🗄️ Base de Datos")
+    
+    info = db_manager.get_database_info()
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        st.write(f"**Archivo:** {info['path']}")
+        st.write(f"**Tamaño:** {info['size'] / 1024:.1f} KB")
+    with col2:
+        st.write(f"**Libros:** {info.get('books_count', 0)}")
+        st.write(f"**Ventas:** {info.get('sales_count', 0)}")
+        st.write(f"**Items vendidos:** {info.get('sale_items_count', 0)}")
+        st.write(f"**Movimientos:** {info.get('inventory_movements_count', 0)}")
+    
+    show_archives()
+
+def show_archives():
+    """Lista los archivos por año y permite archivar los años cerrados"""
+    db_manager = current_db()
+    st.markdown("### 🗃️ Archivo Histórico")
+    st.caption("Los años cerrados se mueven a archive_AAAA.db; los reportes los siguen incluyendo")
+    
+    archives = db_manager.archived_years()
+    if archives:
+        df_archives = pd.DataFrame(archives)
+        df_archives['size'] = df_archives['size'] / 1024
+        st.dataframe(df_archives.rename(columns={
+            'year': 'Año',
+            'path': 'Archivo',
+            'size': 'Tamaño (KB)'
+        }), use_container_width=True, hide_index=True)
+    else:
+        st.info("📭 Aún no hay años archivados")
+    
+    years = db_manager.archivable_years()
+    if not years:
+        st.caption("No hay años cerrados pendientes de archivar")
+        return
+    
+    col1, col2 = st.columns([1, 2])
+    with col1:
+        year = st.selectbox("Año a archivar", years, key="archive_year")
+    with col2:
+        st.write("")
+        if st.button("🗃️ Archivar año", use_container_width=True):
+            with st.spinner(f"Archivando {year}..."):
+                moved = db_manager.archive_year(year)
+            st.success(f"✅ {year} archivado: {moved['sales']} ventas, "
+                       f"{moved['inventory_movements']} movimientos")
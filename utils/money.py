@@ -0,0 +1,86 @@
+"""
+Importes en centavos
+Todo el dinero se guarda y se suma como enteros; solo se convierte a pesos al mostrarlo
+"""
+
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+from typing import Iterable, Optional, Union
+
+# Centavos por peso
+CENTS = 100
+
+Amount = Union[int, float, str, Decimal]
+
+def to_cents(amount: Optional[Amount]) -> int:
+    """
+    Convierte un importe en pesos a centavos, redondeando al centavo más cercano
+    
+    Se pasa por Decimal(str()) para que 19.99 sea 1999 y no 1998.
+    
+    Args:
+        amount: Importe en pesos (número o texto); None cuenta como 0
+    
+    Returns:
+        int: Importe en centavos
+    
+    Raises:
+        ValueError: Si el texto no es un número
+    """
+    if amount is None or amount == "":
+        return 0
+    try:
+        value = Decimal(str(amount).strip()) * CENTS
+    except InvalidOperation:
+        raise ValueError(f"Importe inválido: {amount!r}")
+    return int(value.quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+def from_cents(cents: Optional[int]) -> float:
+    """Importe en pesos para mostrar o para un campo de entrada; None cuenta como 0"""
+    return (cents or 0) / CENTS
+
+def format_money(cents: Optional[int], symbol: str = "$", decimals: int = 2) -> str:
+    """
+    Formatea un importe en centavos para mostrarlo
+    
+    Args:
+        cents (int): Importe en centavos
+        symbol (str): Símbolo de la moneda
+        decimals (int): Decimales a mostrar
+    
+    Returns:
+        str: Por ejemplo "$1,234.50" o "-$20.00"
+    """
+    cents = int(cents or 0)
+    sign = "-" if cents < 0 else ""
+    return f"{sign}{symbol}{abs(cents) / CENTS:,.{decimals}f}"
+
+def percent_of(cents: int, percent: float) -> int:
+    """
+    Porcentaje de un importe en centavos, redondeado al centavo más cercano
+    
+    Args:
+        cents (int): Importe base en centavos
+        percent (float): Porcentaje (16 = 16%)
+    
+    Returns:
+        int: Importe resultante en centavos
+    """
+    value = Decimal(cents) * Decimal(str(percent)) / 100
+    return int(value.quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+def frame_to_units(frame, columns: Iterable[str]):
+    """
+    Copia de un DataFrame con las columnas indicadas pasadas de centavos a pesos
+    
+    Args:
+        frame (pd.DataFrame): Datos con importes en centavos
+        columns (Iterable[str]): Columnas de dinero presentes en el DataFrame
+    
+    Returns:
+        pd.DataFrame: Copia lista para mostrar o graficar
+    """
+    frame = frame.copy()
+    for column in columns:
+        if column in frame.columns:
+            frame[column] = frame[column].astype("float64") / CENTS
+    return frame